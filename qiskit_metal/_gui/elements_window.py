@@ -21,6 +21,7 @@ from PySide2.QtCore import QAbstractTableModel, QModelIndex
 from PySide2.QtWidgets import QMainWindow
 
 from .elements_ui import Ui_ElementsWindow
+from .utility._design_events_qt import DesignEventQueue
 
 if TYPE_CHECKING:
     # https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
@@ -105,7 +106,6 @@ class ElementTableModel(QAbstractTableModel):
             index = model.index(1,0)
             model.data(index)
     """
-    __timer_interval = 500  # ms
 
     def __init__(self, gui, parent=None, element_type='poly'):
         super().__init__(parent=parent)
@@ -118,9 +118,12 @@ class ElementTableModel(QAbstractTableModel):
         self.logger = gui.logger
         self.gui = gui
         self._row_count = -1
+        self._column_count = -1
         self.type = element_type
 
-        self._create_timer()
+        self._events = DesignEventQueue(
+            ['rows_inserted', 'rows_removed', 'tables_cleared'],
+            self._on_design_events, self)
 
     @property
     def design(self):
@@ -145,12 +148,6 @@ class ElementTableModel(QAbstractTableModel):
         if self.design:
             return self.design.qgeometry.tables[self.type]
 
-    def _create_timer(self):
-        """Refresh the model number of rows, etc."""
-        self._timer = QtCore.QTimer(self)
-        self._timer.start(self.__timer_interval)
-        self._timer.timeout.connect(self.refresh_auto)
-
     def set_type(self, element_type: str):
         """Set the type.
 
@@ -163,26 +160,37 @@ class ElementTableModel(QAbstractTableModel):
     def refresh(self):
         """Force refresh.
 
-        Completly rebuild the model.
+        Completly rebuild the model, and follow the changes of the current
+        design.
         """
-        self.modelReset.emit()
+        self._events.set_design(self.design)
+        self.beginResetModel()
+        self._row_count = self.rowCount()
+        self._column_count = self.columnCount()
+        self.endResetModel()
 
-    def refresh_auto(self):
-        """Update row count etc."""
-        new_count = self.rowCount()
+    def _on_design_events(self, events: list):
+        """Update the rows for the qgeometry changes of the design.
 
-        # if the number of rows have changed
-        if self._row_count != new_count:
-            #self.logger.info('Number of components changed')
+        Rows added at the end of the table are inserted in the view. Any other
+        change of the table resets the model.
 
-            # When a model is reset it should be considered that all
-            # information previously retrieved from it is invalid.
-            # This includes but is not limited to the rowCount() and
-            # columnCount(), flags(), data retrieved through data(), and roleNames().
-            # This will loose the current selection.
-            self.modelReset.emit()
+        Args:
+            events (list): The (name, kwargs) of the events.
+        """
+        names = set(name for name, kwargs in events
+                    if kwargs.get('table_name', self.type) == self.type)
+        if not names:
+            return
 
+        new_count = self.rowCount()
+        if (names != {'rows_inserted'} or new_count < self._row_count or
+                self.columnCount() != self._column_count):
+            self.refresh()
+        elif new_count > self._row_count:
+            self.beginInsertRows(QModelIndex(), self._row_count, new_count - 1)
             self._row_count = new_count
+            self.endInsertRows()
 
     def rowCount(self, parent: QModelIndex = None):
         """Counts all the rows.
@@ -34,6 +34,7 @@ from qiskit_metal._gui.widgets.qlibrary_display.proxy_model_qlibrary import \
 from .. import config, qlibrary
 from ..designs.design_base import QDesign
 from .elements_window import ElementsWindow
+from .rebuild_worker import RebuildWorker
 from .main_window_base import (QMainWindowBaseHandler, QMainWindowExtensionBase,
                                kick_start_qApp)
 from .main_window_ui import Ui_MainWindow
@@ -238,11 +239,13 @@ class QMainWindowExtension(QMainWindowExtensionBase):
         """
 
         if self.force_close:
+            self.gui.wait_for_rebuild(cancel=True)
             super().closeEvent(event)
             return
 
         will_close = self.ok_to_close()
         if will_close:
+            self.gui.wait_for_rebuild(cancel=True)
             self.save_window_settings()
             super().closeEvent(event)
         else:
@@ -315,6 +318,7 @@ class MetalGUI(QMainWindowBaseHandler):
         self.variables_window = PropertyTableWidget(self, gui=self)
 
         self.build_log_window = None
+        self.rebuild_worker = RebuildWorker(self)
 
         self._setup_component_widget()
         self._setup_plot_widget()
@@ -378,6 +382,7 @@ class MetalGUI(QMainWindowBaseHandler):
             design (QDesign): A qiskit metal design, such as a planar one.
                 The design contains all components and elements
         """
+        self.wait_for_rebuild(cancel=True)
         self.design = design
 
         self._set_enabled_design_widgets(True)
@@ -692,22 +697,43 @@ class MetalGUI(QMainWindowBaseHandler):
         return self.plot_win.canvas
 
     def rebuild(self, autoscale: bool = False):
+        """Rebuild the components of the design that changed, in a worker
+        thread, and redraw them once done. Returns right away; the GUI stays
+        interactive meanwhile. Calling it again while a rebuild runs stops
+        that one and starts over. See `wait_for_rebuild`.
+
+        Args:
+            autoscale (bool): Autoscale the plot once done.  Defaults to False.
         """
-        Rebuild all components in the design from scratch and refresh the gui.
-        """
+        self.rebuild_worker.request(autoscale=autoscale)
 
-        self.design.rebuild()
-        self.refresh()
-        if autoscale:
-            self.autoscale()
+    def wait_for_rebuild(self,
+                         cancel: bool = False,
+                         timeout: int = None) -> bool:
+        """Block until the rebuild started by `rebuild` is done and drawn.
+
+        Args:
+            cancel (bool): Stop the rebuild before the next component rather
+                than finishing it.  Defaults to False.
+            timeout (int): Give up after this many milliseconds.
+                Defaults to None, to wait for as long as needed.
+
+        Returns:
+            bool: True if no rebuild is running anymore.
+        """
+        return self.rebuild_worker.wait(cancel=cancel, timeout=timeout)
 
-    def refresh(self):
+    def refresh(self, changed_only: bool = False):
         """Refreshes everything. Overkill in general.
 
             * Refreshes the design names in the gui
             * Refreshes the table models
             * Replots everything
 
+        Args:
+            changed_only (bool): Only redraw the components that were rebuilt,
+                added or deleted since the last plot. Defaults to False.
+
         Warning:
             This does *not* rebuild the components.
             For that, call rebuild.
@@ -718,18 +744,34 @@ class MetalGUI(QMainWindowBaseHandler):
 
         # Table models
         self.ui.tableComponents.model().refresh()
+        self.variables_window.model.refresh()
 
         # Redraw plots
-        self.refresh_plot()
+        self.refresh_plot(changed_only=changed_only)
+
+    def refresh_plot(self, changed_only: bool = False):
+        """Redraw only the plot window contents.
 
-    def refresh_plot(self):
-        """Redraw only the plot window contents."""
-        self.plot_win.replot()
+        Args:
+            changed_only (bool): Only redraw the components that were rebuilt,
+                added or deleted since the last plot. Defaults to False.
+        """
+        if changed_only:
+            self.canvas.update_plot()
+        else:
+            self.plot_win.replot()
 
     def autoscale(self):
-        """Shortcut to autoscale all views."""
+        """Shortcut to autoscale all views, once the running rebuild is
+        done."""
+        self.wait_for_rebuild()
         self.plot_win.auto_scale()
 
+    def screenshot(self, name='shot', type_='png', display=True, disp_ops=None):
+        """Alias for get_screenshot(), once the running rebuild is done."""
+        self.wait_for_rebuild()
+        super().screenshot(name, type_, display, disp_ops)
+
     #########################################################
     # COMPONENT FUNCTIONS
     def edit_component(self, name: str):
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2017, 2021.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+"""Rebuilds the design of the GUI in a worker thread, so that the GUI stays
+interactive while the components are made."""
+
+import threading
+from functools import partial
+from typing import TYPE_CHECKING
+
+from PySide2.QtCore import QObject, QThread, Signal
+
+if TYPE_CHECKING:
+    from ..designs.design_base import QDesign
+    from .main_window import MetalGUI
+
+
+class _RebuildThread(QThread):
+    """Runs `QDesign.rebuild` once."""
+
+    def __init__(self, design: 'QDesign', cancel: threading.Event,
+                 parent: QObject):
+        super().__init__(parent)
+        self.design = design
+        self.cancel = cancel
+
+    def run(self):
+        try:
+            self.design.rebuild(cancel=self.cancel)
+        except Exception:  # pylint: disable=broad-except
+            pass  # logged with the build logs by QComponent.rebuild
+
+
+class RebuildWorker(QObject):
+    """Rebuild the changed components of the design of the GUI in a worker
+    thread, then redraw them on the canvas.
+
+    The rows of each component are swapped into the qgeometry tables in one
+    step as soon as it is made (see `QGeometryTables.deferred`), and the
+    tables of the GUI follow through the events of the design. A new request
+    while a rebuild runs, for example after another edit of the options,
+    stops it before the next component and starts again once it has stopped.
+
+    Access:
+        gui.rebuild_worker
+    """
+
+    finished = Signal()
+
+    def __init__(self, gui: 'MetalGUI'):
+        """
+        Args:
+            gui (MetalGUI): The GUI.
+        """
+        super().__init__()
+        self.gui = gui
+        self._thread = None  # type: _RebuildThread
+        self._pending = False
+        self._autoscale = False
+
+    @property
+    def is_running(self) -> bool:
+        """True while a rebuild runs."""
+        return self._thread is not None
+
+    def request(self, autoscale: bool = False):
+        """Rebuild the changed components. Cancels the running rebuild, if
+        any, and starts again when it has stopped.
+
+        Args:
+            autoscale (bool): Autoscale the plot once done.  Defaults to False.
+        """
+        if self.gui.design is None:
+            return
+        self._autoscale = self._autoscale or autoscale
+        if self.is_running:
+            self._thread.cancel.set()
+            self._pending = True
+        else:
+            self._start()
+
+    def _start(self):
+        """Start the worker thread on the design of the GUI."""
+        self._pending = False
+        self._thread = _RebuildThread(self.gui.design, threading.Event(), self)
+        self._thread.finished.connect(partial(self._on_finished, self._thread))
+        self._thread.start()
+
+    def _on_finished(self, thread: _RebuildThread):
+        """Start the pending rebuild, or redraw the rebuilt components.
+
+        Args:
+            thread (_RebuildThread): The thread that finished.
+        """
+        if thread is not self._thread:  # already handled by wait
+            return
+        thread.wait()
+        self._thread = None
+        thread.deleteLater()
+
+        if self._pending:
+            self._start()
+            return
+
+        self.gui.refresh_plot(changed_only=True)
+        if self._autoscale:
+            self._autoscale = False
+            self.gui.autoscale()
+        self.finished.emit()
+
+    def wait(self, cancel: bool = False, timeout: int = None) -> bool:
+        """Block until the rebuild, and any pending one, is done, then redraw
+        the rebuilt components.
+
+        Args:
+            cancel (bool): Stop the rebuild before the next component rather
+                than finishing it, and drop the pending one.
+                Defaults to False.
+            timeout (int): Give up after this many milliseconds.
+                Defaults to None, to wait for as long as needed.
+
+        Returns:
+            bool: True if no rebuild is running anymore.
+        """
+        while self.is_running:
+            thread = self._thread
+            if cancel:
+                self._pending = False
+                thread.cancel.set()
+            if timeout is None:
+                thread.wait()
+            elif not thread.wait(timeout):
+                return False
+            self._on_finished(thread)
+        return True
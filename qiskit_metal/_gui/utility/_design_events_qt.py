@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2017, 2021.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+"""Brings the events of a design into the Qt event loop, so that the models
+of the GUI update only what changed."""
+
+import threading
+from functools import partial
+from typing import Callable, Iterable, List, Tuple
+
+from PySide2.QtCore import QObject, Qt, Signal
+
+__all__ = ['DesignEventQueue']
+
+
+class DesignEventQueue(QObject):
+    """Subscribe to some events of a design and pass them to a callback, in
+    batches, from the Qt event loop.
+
+    The events emitted while the GUI is busy, for example by a script that
+    adds a hundred components, are handled together, once. Events may come
+    from any thread.
+
+    .. code-block:: python
+
+        queue = DesignEventQueue(['component_added'], self._on_events, self)
+        queue.set_design(design)
+
+        def _on_events(self, events: List[Tuple[str, dict]]):
+            ...
+    """
+
+    _pending_signal = Signal()
+
+    def __init__(self,
+                 event_names: Iterable[str],
+                 callback: Callable,
+                 parent: QObject = None):
+        """
+        Args:
+            event_names (Iterable[str]): Names of the events to follow.
+            callback (Callable): Called with the list of (name, kwargs) of
+                the events since the last call.
+            parent (QObject): Parent object.  Defaults to None.
+        """
+        super().__init__(parent)
+        self.event_names = list(event_names)
+        self.callback = callback
+        self._design = None
+        self._handlers = {
+            name: partial(self._on_event, name) for name in self.event_names
+        }
+        self._pending = []  # type: List[Tuple[str, dict]]
+        self._lock = threading.Lock()
+        self._pending_signal.connect(self._flush, Qt.QueuedConnection)
+
+    def set_design(self, design: 'QDesign'):
+        """Follow the events of design instead of those of the previous one.
+        The pending events of the previous design are dropped.
+
+        Args:
+            design (QDesign): The design.  Can be None.
+        """
+        if self._design is not None:
+            for name, handler in self._handlers.items():
+                self._design.events.unsubscribe(name, handler)
+        with self._lock:
+            self._pending.clear()
+
+        self._design = design
+        if design is not None:
+            for name, handler in self._handlers.items():
+                design.events.subscribe(name, handler)
+
+    def _on_event(self, name: str, **kwargs):
+        """Record the event and schedule a flush, unless one is pending."""
+        with self._lock:
+            self._pending.append((name, kwargs))
+            schedule = len(self._pending) == 1
+        if schedule:
+            self._pending_signal.emit()
+
+    def _flush(self):
+        """Pass the recorded events to the callback."""
+        with self._lock:
+            events, self._pending = self._pending, []
+        if events:
+            self.callback(events)
@@ -18,6 +18,7 @@ from PySide2.QtCore import QAbstractTableModel, QModelIndex, Qt
 from PySide2.QtGui import QBrush, QColor, QFont, QIcon, QPixmap
 from PySide2.QtWidgets import QTableView
 
+from ...utility._design_events_qt import DesignEventQueue
 from ...utility._handle_qt_messages import slot_catch_error
 from ...utility._toolbox_qt import blend_colors
 from typing import TYPE_CHECKING
@@ -41,7 +42,6 @@ class QTableModel_AllComponents(QAbstractTableModel):
         index = model.index(1,0)
         model.data(index)
     """
-    __timer_interval = 500  # ms
 
     def __init__(self,
                  gui,
@@ -63,51 +63,83 @@ class QTableModel_AllComponents(QAbstractTableModel):
             'Name', 'QComponent class', 'QComponent module', 'Build status',
             'id'
         ]
-        self._row_count = -1
+        self._ids = []  # ids of the components, in the order of the rows
 
-        self._create_timer()
+        self._events = DesignEventQueue([
+            'component_added', 'component_removed', 'component_renamed',
+            'component_rebuilt'
+        ], self._on_design_events, self)
 
     @property
     def design(self):
         """Returns the design."""
         return self.gui.design
 
-    def _create_timer(self):
-        """Refresh the model number of rows, etc.
-
-        there must be a smarter way?
-        """
-        self._timer = QtCore.QTimer(self)
-        self._timer.start(self.__timer_interval)
-        self._timer.timeout.connect(self.refresh_auto)
-
     def refresh(self):
         """Force refresh.
 
-        Completly rebuild the model.
+        Completly rebuild the model, and follow the changes of the current
+        design.
         """
-        self.modelReset.emit()
-
-    def refresh_auto(self):
-        """Automatic refresh, update row count, view, etc."""
-        # We could not do if the widget is hidden
-        new_count = self.rowCount()
+        self._events.set_design(self.design)
 
-        # if the number of rows have changed
-        if self._row_count != new_count:
-            #self.logger.info('Number of components changed')
-
-            # When a model is reset it should be considered that all
-            # information previously retrieved from it is invalid.
-            # This includes but is not limited to the rowCount() and
-            # columnCount(), flags(), data retrieved through data(), and roleNames().
-            # This will loose the current selection.
-            self.modelReset.emit()
+        # When a model is reset it should be considered that all
+        # information previously retrieved from it is invalid.
+        # This will loose the current selection.
+        self.beginResetModel()
+        # pylint: disable=protected-access
+        self._ids = list(self.design._components) if self.design else []
+        self.endResetModel()
 
+        if self._tableView:
             # for some reason the horizontal header is hidden even if i call this in init
             self._tableView.horizontalHeader().show()
+        self.update_view()
+
+    def _on_design_events(self, events: list):
+        """Update only the rows of the components that were removed, added,
+        renamed or rebuilt, keeping the selection of the others.
 
-            self._row_count = new_count
+        Args:
+            events (list): The (name, kwargs) of the events.
+        """
+        if not self.design:
+            return
+        # pylint: disable=protected-access
+        components = self.design._components
+
+        removed = [
+            row for row, component_id in enumerate(self._ids)
+            if component_id not in components
+        ]
+        for row in reversed(removed):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._ids[row]
+            self.endRemoveRows()
+
+        known = set(self._ids)
+        added = [
+            component_id for component_id in components
+            if component_id not in known
+        ]
+        if added:
+            first = len(self._ids)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            self._ids.extend(added)
+            self.endInsertRows()
+
+        changed = {
+            kwargs['component_id']
+            for name, kwargs in events
+            if name in ('component_renamed', 'component_rebuilt')
+        }
+        last_column = self.columnCount() - 1
+        for row, component_id in enumerate(self._ids):
+            if component_id in changed:
+                self.dataChanged.emit(self.index(row, 0),
+                                      self.index(row, last_column))
+
+        if removed or added or changed:
             self.update_view()
 
     def update_view(self):
@@ -125,7 +157,7 @@ class QTableModel_AllComponents(QAbstractTableModel):
             int: The number of rows
         """
         if self.design:  # should we just enforce this
-            num = int(len(self.design.components))
+            num = len(self._ids)
             if num == 0:
                 self._tableView.show_placeholder_text()
             else:
@@ -203,22 +235,23 @@ class QTableModel_AllComponents(QAbstractTableModel):
         if not index.isValid() or not self.design:
             return
 
-        component_name = list(self.design.components.keys())[index.row()]
+        # pylint: disable=protected-access
+        component = self.design._components.get(self._ids[index.row()])
+        if component is None:  # deleted, the row is removed on the next event
+            return
 
         if role == Qt.DisplayRole:
 
             if index.column() == 0:
-                return str(component_name)
+                return str(component.name)
             elif index.column() == 1:
-                return str(
-                    self.design.components[component_name].__class__.__name__)
+                return str(component.__class__.__name__)
             elif index.column() == 2:
-                return str(
-                    self.design.components[component_name].__class__.__module__)
+                return str(component.__class__.__module__)
             elif index.column() == 3:
-                return str(self.design.components[component_name].status)
+                return str(component.status)
             elif index.column() == 4:
-                return str(self.design.components[component_name].id)
+                return str(component.id)
 
         # The font used for items rendered with the default delegate. (QFont)
         elif role == Qt.FontRole:
@@ -229,7 +262,6 @@ class QTableModel_AllComponents(QAbstractTableModel):
 
         elif role == Qt.BackgroundRole:
 
-            component = self.design.components[component_name]
             if component.status != 'good':  # Did the component fail the build
                 #    and index.column()==0:
                 if not self._tableView:
@@ -242,11 +274,9 @@ class QTableModel_AllComponents(QAbstractTableModel):
         elif role == Qt.DecorationRole:
 
             if index.column() == 0:
-                component = self.design.components[component_name]
                 if component.status != 'good':  # Did the component fail the build
                     return QIcon(":/sample_shapes/warning")
 
         elif role == Qt.ToolTipRole or role == Qt.StatusTipRole:
-            component = self.design.components[component_name]
             text = f"""Component name= "{component.name}" instance of class "{component.__class__.__name__}" from module "{component.__class__.__module__}" """
             return text
@@ -154,9 +154,11 @@ class QTableView_AllComponents(QTableView, QWidget_PlaceholderText):
             name (str): Name of the component to delete
         """
         self.logger.info(f'Deleting {name}')
+        # Stop the rebuild that could be making the component
+        self.gui.wait_for_rebuild(cancel=True)
         self.design.delete_component(name)
-        # replot
-        self.gui.plot_win.replot()
+        # finish the rebuild and replot
+        self.gui.rebuild()
 
     def do_menu_rename(self, event):
         """Called when the user clicks the context menu rename.
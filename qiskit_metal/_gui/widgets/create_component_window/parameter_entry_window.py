@@ -372,10 +372,14 @@ class ParameterEntryWindow(QMainWindow):
 
         self.traverse_model_to_create_dictionary()
 
-        self.qcomp_class(self._design, **self.current_dict)
-        if self._gui is not None:  # for the sake of testing, we won't have gui
-            self._gui.refresh()
-            self._gui.autoscale()
+        if self._gui is None:  # for the sake of testing, we won't have gui
+            self.qcomp_class(self._design, **self.current_dict)
+        else:
+            # made by the rebuild of the gui, in a worker thread, but the
+            # components it connects to must be built first
+            self._gui.wait_for_rebuild()
+            self.qcomp_class(self._design, make=False, **self.current_dict)
+            self._gui.rebuild(autoscale=True)
         self.close()
 
     @QComponentParameterEntryExceptionDecorators.entry_exception_pop_up_warning
@@ -261,8 +261,7 @@ class QTableModel_Options(QAbstractTableModel):
                             f'; Used ast={used_ast}')
                         data[key] = processed_value
 
-                    self.component.rebuild()
-                    self.gui.refresh()
+                    self.gui.rebuild()
 
                 # except and finally restore the value
                 return True
@@ -24,7 +24,7 @@ import random
 from pathlib import Path
 
 from PySide2 import QtGui
-from PySide2.QtCore import Qt
+from PySide2.QtCore import Qt, Signal
 from PySide2.QtWidgets import QAction, QDockWidget, QTextEdit
 
 from .... import Dict, __version__, config
@@ -45,6 +45,10 @@ class QTextEditLogger(QTextEdit):
     timestamp_len = 19
     _logo = 'metal_logo.png'
 
+    # Records logged by other threads, such as the rebuild worker, are
+    # queued to the thread of the widget
+    _message_logged = Signal(str, str)
+
     def __init__(self, img_path='/', dock_window: QDockWidget = None):
         """Widget to handle logging. Based on QTextEdit, an advanced WYSIWYG
         viewer/editor supporting rich text formatting using HTML-style tags. It
@@ -62,6 +66,7 @@ class QTextEditLogger(QTextEdit):
 
         self.img_path = img_path
         self.dock_window = dock_window
+        self._message_logged.connect(self.log_message_to)
 
         # handles the loggers
         # dict for what loggers we track and if we should show or not
@@ -432,7 +437,8 @@ class LogHandler_for_QTextLog(logging.Handler):
         html_log_message = '<span class="%s"><pre>%s</pre></span>' % (
             record.levelname, html_record)
         try:
-            self.log_qtextedit.log_message_to(self.name, html_log_message)
+            # pylint: disable=protected-access
+            self.log_qtextedit._message_logged.emit(self.name, html_log_message)
         except RuntimeError as e:
             # trying to catch
             #  RuntimeError('wrapped C/C++ object of type QTextEditLogger has been deleted',)
@@ -12,11 +12,11 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-from PySide2 import QtCore
 from PySide2.QtCore import QAbstractTableModel, QModelIndex, Qt
 from PySide2.QtGui import QFont
 
 from .... import config
+from ...utility._design_events_qt import DesignEventQueue
 
 
 class PropValTable(QAbstractTableModel):
@@ -29,8 +29,6 @@ class PropValTable(QAbstractTableModel):
         gui.variables_window.model
     """
 
-    __refreshtime = 500  # 0.5 second refresh time
-
     def __init__(self, design=None, gui=None, view: 'RightClickView' = None):
         """
         Args:
@@ -42,8 +40,9 @@ class PropValTable(QAbstractTableModel):
         self._design = design
         self._gui = gui
         self._view = view
-        self._rowCount = -1
-        self._start_timer()
+        self._events = DesignEventQueue(['variables_changed'],
+                                        self._on_design_events, self)
+        self._events.set_design(design)
 
     def set_design(self, design):
         """Set the design.
@@ -52,8 +51,27 @@ class PropValTable(QAbstractTableModel):
             design (QDesign): The design
         """
         self._design = design
-        self.modelReset.emit()
-        # refresh table or something if needed
+        self._events.set_design(design)
+        self.refresh()
+
+    def refresh(self):
+        """Force refresh.
+
+        Completly rebuild the model, for example after the variables of the
+        design were changed from a script.
+        """
+        self.beginResetModel()
+        self.endResetModel()
+        if self._view:
+            self._view.resizeColumnsToContents()
+
+    def _on_design_events(self, events: list):
+        """Rebuild the model when the design renames variables.
+
+        Args:
+            events (list): The (name, kwargs) of the events.
+        """
+        self.refresh()
 
     @property
     def design(self):
@@ -66,22 +84,6 @@ class PropValTable(QAbstractTableModel):
         if self._design:
             return self._design.variables
 
-    def _start_timer(self):
-        """Start and continuously refresh timer in background to keep the total
-        number of rows up to date."""
-        self.timer = QtCore.QTimer(self)
-        self.timer.start(self.__refreshtime)
-        self.timer.timeout.connect(self.auto_refresh)
-
-    def auto_refresh(self):
-        """Do an automatic refresh."""
-        newRowCount = self.rowCount(self)
-        if self._rowCount != newRowCount:
-            self.modelReset.emit()
-            self._rowCount = newRowCount
-            if self._view:
-                self._view.resizeColumnsToContents()
-
     def rowCount(self, index: QModelIndex) -> int:
         """Count the number of rows.
 
@@ -170,6 +172,7 @@ class PropValTable(QAbstractTableModel):
 
             elif c == 1:
                 self._data[list(self._data.keys())[r]] = value
+                self.dataChanged.emit(index, self.index(r, 2))
                 self._gui.rebuild()
                 return True
 
@@ -237,5 +240,13 @@ class PropValTable(QAbstractTableModel):
             key (str): The key
             val (str): The value
         """
-        self._data[key] = val
+        if key in self._data:
+            self._data[key] = val
+            row = list(self._data.keys()).index(key)
+            self.dataChanged.emit(self.index(row, 0), self.index(row, 2))
+        else:
+            row = len(self._data)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._data[key] = val
+            self.endInsertRows()
         self._view.resizeColumnsToContents()
@@ -31,6 +31,7 @@ Analysis Core
 
     QAnalysis
     QSimulation
+    SimulationCache
 
 Hamiltonian
 -----------
@@ -59,6 +60,9 @@ Sweeping Options
     :toctree:
 
     Sweeper
+    SweepScheduler
+    QAnalysisBackend
+    MockSolverBackend
 
 Quantization
 ------------
@@ -86,6 +90,7 @@ from .. import config
 
 from .core import QAnalysis
 from .core import QSimulation
+from .core import SimulationCache
 from .em import cpw_calculations
 from .em import kappa_calculation
 from .quantization import lumped_capacitive
@@ -99,3 +104,6 @@ from .hamiltonian import HO_wavefunctions
 from .hamiltonian import transmon_analytics
 from .hamiltonian.transmon_CPB_analytic import Hcpb_analytic
 from .sweep_and_optimize.sweeper import Sweeper
+from .sweep_and_optimize.sweep_scheduler import SweepScheduler
+from .sweep_and_optimize.sweep_scheduler import QAnalysisBackend
+from .sweep_and_optimize.sweep_scheduler import MockSolverBackend
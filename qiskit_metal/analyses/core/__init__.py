@@ -24,3 +24,4 @@ Module containing base classes and interfaces to be inherited by analyses classe
 
 from .base import QAnalysis
 from .simulation import QSimulation
+from .result_cache import SimulationCache
@@ -103,6 +103,25 @@ class QAnalysis(ABC):
         all_sweep, return_code = self._sweeper.run_sweep(*args, **kwargs)
         return all_sweep, return_code
 
+    def run_sweep_points(self, *args, **kwargs):
+        """User requests a sweep of several options at once, based on
+        arguments from Sweeper.run_sweep_points().
+        """
+        if not self._sweeper:
+            self._initialize_sweep()
+
+        return self._sweeper.run_sweep_points(*args, **kwargs)
+
+    def run_adaptive_sweep(self, *args, **kwargs):
+        """User requests a sweep of an option over a range, refined where a
+        target changes fastest, based on arguments from
+        Sweeper.run_adaptive_sweep().
+        """
+        if not self._sweeper:
+            self._initialize_sweep()
+
+        return self._sweeper.run_adaptive_sweep(*args, **kwargs)
+
     def save_run_args(self, **kwargs):
         """Intended to be used to store the kwargs passed to the run() method,
         for repeatability and for later identification of the QAnalysis instance.
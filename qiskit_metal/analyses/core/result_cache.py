@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2017, 2021.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+"""Persistent store for the results of a QSimulation, keyed on a hash of
+everything that goes into the renderer: the qgeometry rows of the rendered
+components, the chip settings, the renderer options and the setup.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable, Union
+
+from qiskit_metal import Dict
+from qiskit_metal.designs import QDesign  # pylint: disable=unused-import
+
+
+def canonical_repr(value: Any) -> str:
+    """Text of a value that does not depend on the insertion order of
+    dictionaries, so that equal setups and options give equal hashes.
+
+    Args:
+        value (Any): Nested dicts, lists, tuples and scalars.
+
+    Returns:
+        str: Canonical text of the value.
+    """
+    if isinstance(value, dict):
+        items = sorted(
+            (repr(key), canonical_repr(val)) for key, val in value.items())
+        return '{' + ', '.join(f'{key}: {val}' for key, val in items) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(canonical_repr(val) for val in value) + ']'
+    return repr(value)
+
+
+def hash_qgeometry(design: 'QDesign', names: Iterable[str], digest=None):
+    """Feed the qgeometry rows of the given components into a hash.
+
+    Components are visited by name and the component id column is left out,
+    so the hash does not change when the same design is rebuilt in another
+    session. Geometries are hashed through their WKB representation.
+
+    Args:
+        design (QDesign): The design holding the qgeometry tables.
+        names (Iterable[str]): Names of the components to hash.
+        digest (hashlib hash, optional): Hash to update. Defaults to a new
+            sha256.
+
+    Returns:
+        hashlib hash: The updated hash.
+    """
+    digest = hashlib.sha256() if digest is None else digest
+    qgeometry = design.qgeometry
+    for table_name in qgeometry.get_element_types():
+        for name in sorted(names):
+            rows = qgeometry._get_component_rows(  # pylint: disable=protected-access
+                table_name, design.name_to_id[name])
+            if rows.empty:
+                continue
+            others = rows.drop(columns=['component', 'geometry'])
+            digest.update(
+                f'{table_name}|{name}|{list(others.columns)}'.encode())
+            digest.update(repr(others.values.tolist()).encode())
+            for geom in rows['geometry']:
+                digest.update(geom.wkb)
+    return digest
+
+
+class SimulationCache():
+    """Results of simulations stored on disk, one pickle file per key.
+
+    The cache is shared by every QSimulation that points to the same
+    directory, and survives between sessions.
+
+    .. code-block:: python
+
+        sim = LumpedElementsSim(design, 'q3d')
+        sim.result_cache = './sim_cache'
+        sim.run(components=['Q1'])  # renders and solves
+        sim.run(components=['Q1'])  # returns the stored capacitance matrix
+    """
+
+    suffix = '.pkl'
+
+    def __init__(self, path: Union[str, Path] = None):
+        """
+        Args:
+            path (Union[str, Path], optional): Directory of the cache. Created
+                if missing. Defaults to ~/.qiskit_metal/sim_cache.
+        """
+        if path is None:
+            path = Path.home() / '.qiskit_metal' / 'sim_cache'
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, key: str) -> Path:
+        return self.path / (key + self.suffix)
+
+    def __contains__(self, key: str) -> bool:
+        return self._file(key).is_file()
+
+    def __len__(self) -> int:
+        return len(list(self.path.glob('*' + self.suffix)))
+
+    def get(self, key: str) -> Union[Dict, None]:
+        """Return the result stored under key.
+
+        Args:
+            key (str): Hash of the simulation inputs.
+
+        Returns:
+            Union[Dict, None]: The stored result, or None when missing or
+            unreadable.
+        """
+        try:
+            with open(self._file(key), 'rb') as file:
+                return pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, key: str, result: Dict):
+        """Store a result under key. The file is written next to its final
+        location and moved in place, so readers never see a partial entry.
+
+        Args:
+            key (str): Hash of the simulation inputs.
+            result (Dict): Result to store. Must be picklable.
+        """
+        handle, tmp_name = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                pickle.dump(result, file)
+            os.replace(tmp_name, self._file(key))
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+    def delete(self, key: str):
+        """Remove the result stored under key, if any.
+
+        Args:
+            key (str): Hash of the simulation inputs.
+        """
+        try:
+            self._file(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Remove every stored result."""
+        for file in self.path.glob('*' + self.suffix):
+            file.unlink()
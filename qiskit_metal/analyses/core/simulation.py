@@ -13,11 +13,14 @@
 # that they have been altered from the originals.
 
 from abc import abstractmethod
+from pathlib import Path
+from typing import Union
 from qiskit_metal.designs import QDesign  # pylint: disable=unused-import
 from qiskit_metal import Dict
 from qiskit_metal import config
 
 from . import QAnalysis
+from .result_cache import SimulationCache, canonical_repr, hash_qgeometry
 import importlib
 
 
@@ -71,6 +74,8 @@ class QSimulation(QAnalysis):
         else:
             self.renderer = self.select_renderer(renderer_name)
 
+        self._result_cache = None
+
     def select_renderer(self, renderer_name: str):
         """Makes sure the renderer exists in qiskit-metal. If yes it sets the analysis 
         class variables to be able to reach it easily. Else it throws an error.
@@ -130,6 +135,96 @@ class QSimulation(QAnalysis):
             return None
         return renderer
 
+    @property
+    def result_cache(self) -> Union[SimulationCache, None]:
+        """Persistent cache of the results of run_sim(). When set, a run whose
+        rendered geometry, chip settings, renderer options and setup match a
+        previous run returns the stored results without rendering or solving.
+        The renderer then still holds whatever it solved last, so analyses that
+        read the solution from the renderer, like EPRanalysis, do not use it.
+        Disabled (None) by default.
+        """
+        return self._result_cache
+
+    @result_cache.setter
+    def result_cache(self, cache: Union[SimulationCache, str, Path, None]):
+        """Setter
+
+        Args:
+            cache (Union[SimulationCache, str, Path, None]): A cache, the
+                directory of a cache, or None to disable caching.
+        """
+        if isinstance(cache, (str, Path)):
+            cache = SimulationCache(cache)
+        self._result_cache = cache
+
+    def _result_key(self, solution_type: str, selection: Union[list, None],
+                    **render_args) -> Union[str, None]:
+        """Hash of the inputs of a run: the qgeometry rows of the selected
+        components, the chip settings, the renderer options, the setup and
+        the render arguments.
+
+        Args:
+            solution_type (str): The type of simulation solution to apply.
+            selection (Union[list, None]): Components to render. Empty list
+                means the whole design.
+            render_args (dict): The other arguments passed to the renderer,
+                such as open_pins or port_list.
+
+        Returns:
+            Union[str, None]: The hash, or None if the run cannot be cached:
+            no cache, no design, or no selection (the renderer re-uses the
+            design it already has, which Metal cannot see).
+        """
+        if self.result_cache is None or self.design is None or selection is None:
+            return None
+        names = set(selection) if selection else set(self.design.name_to_id)
+        if not names.issubset(self.design.name_to_id):
+            return None
+
+        # the run arguments saved in the setup are covered by render_args
+        setup = {key: val for key, val in self.setup.items() if key != 'run'}
+        digest = hash_qgeometry(self.design, names)
+        digest.update(
+            canonical_repr([
+                type(self).__name__, self.renderer_name, solution_type,
+                sorted(names), render_args, self.design.chips,
+                self.renderer.options, setup
+            ]).encode())
+        return digest.hexdigest()
+
+    def _load_result(self, key: Union[str, None]) -> Union[str, None]:
+        """Restore the data of a previous run from the result cache.
+
+        Args:
+            key (Union[str, None]): Hash from _result_key().
+
+        Returns:
+            Union[str, None]: Name of the renderer design the results were
+            computed in, or None if there is no stored result.
+        """
+        if key is None:
+            return None
+        result = self.result_cache.get(key)
+        if result is None:
+            return None
+        self.logger.info('Found the results of this run in the result cache; '
+                         'skipping rendering and analysis.')
+        self._variables = Dict(result['data'])
+        return result['design_name']
+
+    def _save_result(self, key: Union[str, None], design_name: str):
+        """Store the data of the run that just finished in the result cache.
+
+        Args:
+            key (Union[str, None]): Hash from _result_key().
+            design_name (str): Name of the renderer design used by the run.
+        """
+        if key is None:
+            return
+        self.result_cache.put(
+            key, Dict(data=self.get_data(), design_name=design_name))
+
     def start(self):
         """Starts the renderer by executing the routine of the selected renderer.
         """
@@ -26,8 +26,20 @@ https://aip.scitation.org/doi/abs/10.1063/1.3010859?journalCode=jap
 
 Mohebbi and Majedi, Superconducting Science and Technology 22, 125028 (2009)
 https://iopscience.iop.org/article/10.1088/0953-2048/22/12/125028/meta
+
+All functions accept NumPy arrays (or lists) for any of their arguments, and
+broadcast them against each other. For example, passing the frequencies as a
+column and the line widths as a row gives a frequency by width map in one call:
+
+.. code-block:: python
+
+    freq = np.linspace(4e9, 8e9, 41)[:, None]
+    width = np.linspace(5e-6, 20e-6, 151)
+    lambdaG, etfSqrt, q = guided_wavelength(freq, width, 6e-6, 760e-6, 200e-9)
 """
 
+from functools import lru_cache
+
 import numpy as np
 from scipy.special import ellipk
 
@@ -41,6 +53,14 @@ __all__ = [
 ]
 
 
+def _as_arrays(*args):
+    """Turn list and tuple arguments into arrays, so that they broadcast.
+    Scalars and arrays are returned as they are."""
+    return tuple(
+        np.asarray(arg) if isinstance(arg, (list, tuple)) else arg
+        for arg in args)
+
+
 def guided_wavelength(freq,
                       line_width,
                       line_gap,
@@ -52,12 +72,12 @@ def guided_wavelength(freq,
     Assumes package grounds are far away.
 
     Args:
-        freq (float): The frequency of interest, in Hz (eg. 5*10**9).
-        line_width (float): The width of the CPW trace (center) line, in meters (eg. 10*10**-6).
-        line_gap (float): The width of the CPW gap (dielectric space), in meters (eg. 6*10**-6).
-        substrate_thickness (float): Thickness of the dielectric substrate, in meters (eg. 760*10**-6).
-        film_thickness (float): Thickness of the thin film, in meters (eg. 200*10**-9).
-        dielectric_constant (float): The relative permittivity of the substrate.
+        freq (float or array): The frequency of interest, in Hz (eg. 5*10**9).
+        line_width (float or array): The width of the CPW trace (center) line, in meters (eg. 10*10**-6).
+        line_gap (float or array): The width of the CPW gap (dielectric space), in meters (eg. 6*10**-6).
+        substrate_thickness (float or array): Thickness of the dielectric substrate, in meters (eg. 760*10**-6).
+        film_thickness (float or array): Thickness of the thin film, in meters (eg. 200*10**-9).
+        dielectric_constant (float or array): The relative permittivity of the substrate.
             Defaults to 11.45, the value for Silicon at cryogenic temperatures.
 
     Returns:
@@ -70,11 +90,9 @@ def guided_wavelength(freq,
         * q: Filling factor
     """
 
-    s = line_width
-    w = line_gap
-    h = substrate_thickness
-    t = film_thickness
-    eRD = dielectric_constant
+    freq, s, w, h, t, eRD = _as_arrays(freq, line_width, line_gap,
+                                       substrate_thickness, film_thickness,
+                                       dielectric_constant)
 
     #elliptic integrals
     Kk0, Kk01, Kk1, Kk11 = elliptic_int_constants(s, w, h)
@@ -103,16 +121,16 @@ def lumped_cpw(freq,
     geometric series inductance is ignored.
 
     Args:
-        freq (float): The frequency of interest, in Hz (eg. 5*10**9).
-        line_width (float): The width of the CPW trace (center) line, in meters (eg. 10*10**-6).
-        line_gap (float): The width of the CPW gap (dielectric space), in meters (eg. 6*10**-6).
-        substrate_thickness (float): Thickness of the dielectric substrate, in meters (eg. 760*10**-6).
-        film_thickness (float): Thickness of the thin film, in meters (eg. 200*10**-9).
-        dielectric_constant (float, optional): The relative permittivity of the substrate.
+        freq (float or array): The frequency of interest, in Hz (eg. 5*10**9).
+        line_width (float or array): The width of the CPW trace (center) line, in meters (eg. 10*10**-6).
+        line_gap (float or array): The width of the CPW gap (dielectric space), in meters (eg. 6*10**-6).
+        substrate_thickness (float or array): Thickness of the dielectric substrate, in meters (eg. 760*10**-6).
+        film_thickness (float or array): Thickness of the thin film, in meters (eg. 200*10**-9).
+        dielectric_constant (float or array, optional): The relative permittivity of the substrate.
             Defaults to 11.45, the value for silicon at cryogenic temperatures.
-        loss_tangent (float, optional): The loss tangent of the dielectric.
+        loss_tangent (float or array, optional): The loss tangent of the dielectric.
             Defaults to 10**-6, reasonable quality silicon.
-        london_penetration_depth (float, optional): The superconducting london penetration depth, in meters.
+        london_penetration_depth (float or array, optional): The superconducting london penetration depth, in meters.
             It is advised to use the temperature and film thickness dependent value. If circuit
             geometries are on the scale of the Pearl Length, the kinetic inductance formulas
             breakdown.
@@ -122,11 +140,11 @@ def lumped_cpw(freq,
         tuple: Contents outlined below
 
     Tuple contents:
-        * Lk (float): The series kinetic inductance, in Henries.
-        * Lext (float): The series geometric external inductance, in Henries.
-        * C (float): The shunt capacitance, in Farads.
-        * G (float): The shunt admittance, in Siemens. #NOTE:double check if right units
-        * Z0 (float): sqrt(L / C)
+        * Lk (float or array): The series kinetic inductance, in Henries.
+        * Lext (float or array): The series geometric external inductance, in Henries.
+        * C (float or array): The shunt capacitance, in Farads.
+        * G (float or array): The shunt admittance, in Siemens. #NOTE:double check if right units
+        * Z0 (float or array): sqrt(L / C)
         * etfSqrt**2: Effective Dielectric Constant
         * Cstar: External Inductance
 
@@ -138,13 +156,9 @@ def lumped_cpw(freq,
                         |   |
         ----------------+---+---
     """
-    s = line_width
-    w = line_gap
-    h = substrate_thickness
-    t = film_thickness
-    eRD = dielectric_constant
-    tanD = loss_tangent
-    lambdaLT = london_penetration_depth
+    freq, s, w, h, t, eRD, tanD, lambdaLT = _as_arrays(
+        freq, line_width, line_gap, substrate_thickness, film_thickness,
+        dielectric_constant, loss_tangent, london_penetration_depth)
     wfreq = freq * 2 * np.pi
 
     Kk0, Kk01, Kk1, Kk11 = elliptic_int_constants(s, w, h)
@@ -188,21 +202,24 @@ def effective_dielectric_constant(freq, s, w, h, t, q, Kk0, Kk01, eRD=11.45):
     ignored.
 
     Args:
-        freq (float): The frequency of interest (eg. 5*10**9)
-        s (float): The width of the CPW trace (center) line, in meters (eg. 10*10**-6).
-        w (float): The width of the CPW gap (dielectric space), in meters (eg. 6*10**-6).
-        h (float): Thickness of the dielectric substrate, in meters (eg. 760*10**-6).
-        t (float): Thickness of the thin film, in meters (eg. 200*10**-9).
-        q (float): Filling factor of the CPW in question
-        Kk0 (float): The complete elliptic integral for k0
-        Kk01 (float): The complete elliptic integral for k01
-        eRD (float, optional): The relative permittivity of the substrate. Defaults to 11.45.
+        freq (float or array): The frequency of interest (eg. 5*10**9)
+        s (float or array): The width of the CPW trace (center) line, in meters (eg. 10*10**-6).
+        w (float or array): The width of the CPW gap (dielectric space), in meters (eg. 6*10**-6).
+        h (float or array): Thickness of the dielectric substrate, in meters (eg. 760*10**-6).
+        t (float or array): Thickness of the thin film, in meters (eg. 200*10**-9).
+        q (float or array): Filling factor of the CPW in question
+        Kk0 (float or array): The complete elliptic integral for k0
+        Kk01 (float or array): The complete elliptic integral for k01
+        eRD (float or array, optional): The relative permittivity of the substrate. Defaults to 11.45.
 
     Returns:
         float: etfSqrt is the effective permittivity for a CPW transmission line, considering
         film and substrate thickness.
     """
 
+    freq, s, w, h, t, q, Kk0, Kk01, eRD = _as_arrays(freq, s, w, h, t, q, Kk0,
+                                                     Kk01, eRD)
+
     #Effective Dielectric Constant
     e00 = 1 + q * (eRD - 1)
     et0 = e00 - (0.7 * (e00 - 1) * t / w) / ((Kk0 / Kk01) + 0.7 * t / w)
@@ -224,19 +241,27 @@ def elliptic_int_constants(s, w, h):
     lumped element equivalent circuit calculations.
 
     Args:
-        s (float): The width of the CPW trace (center) line, in meters (eg. 10*10**-6).
-        w (float): The width of the CPW gap (dielectric space), in meters (eg. 6*10**-6).
-        h (float): Thickness of the dielectric substrate, in meters (eg. 760*10**-6).
+        s (float or array): The width of the CPW trace (center) line, in meters (eg. 10*10**-6).
+        w (float or array): The width of the CPW gap (dielectric space), in meters (eg. 6*10**-6).
+        h (float or array): Thickness of the dielectric substrate, in meters (eg. 760*10**-6).
 
     Returns:
         tuple: Contents outlined below
 
     Tuple contents:
-        * ellipk(k0) (float): The complete elliptic integral for k0
-        * ellipk(k01) (float): The complete elliptic integral for k01
-        * ellipk(k1) (float): The complete elliptic integral for k1
-        * ellipk(k11) (float): The complete elliptic integral for k11
+        * ellipk(k0) (float or array): The complete elliptic integral for k0
+        * ellipk(k01) (float or array): The complete elliptic integral for k01
+        * ellipk(k1) (float or array): The complete elliptic integral for k1
+        * ellipk(k11) (float or array): The complete elliptic integral for k11
     """
+    s, w, h = _as_arrays(s, w, h)
+    if np.isscalar(s) and np.isscalar(w) and np.isscalar(h):
+        # a single cross-section, as in loops over lengths; often the same one
+        return _elliptic_int_constants_cached(s, w, h)
+    return _elliptic_int_constants(s, w, h)
+
+
+def _elliptic_int_constants(s, w, h):
     #elliptical integral constants
     k0 = s / (s + 2 * w)
     k01 = np.sqrt(1 - k0**2)
@@ -245,3 +270,8 @@ def elliptic_int_constants(s, w, h):
     k11 = np.sqrt(1 - k1**2)
 
     return ellipk(k0**2.0), ellipk(k01**2.0), ellipk(k1**2.0), ellipk(k11**2.0)
+
+
+@lru_cache(maxsize=1024)
+def _elliptic_int_constants_cached(s, w, h):
+    return _elliptic_int_constants(s, w, h)
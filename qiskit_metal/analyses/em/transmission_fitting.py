@@ -27,7 +27,10 @@ https://web.physics.ucsb.edu/~bmazin/Papers/2008/Gao/Caltech%20Thesis%202008%20G
 Circle Fitting adapted from http://www.cs.bsu.edu/homepages/kjones/kjones/circles.pdf
 """
 
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+import pandas as pd
 from scipy.optimize import leastsq
 from scipy.stats import linregress
 from scipy.optimize import curve_fit
@@ -224,33 +227,8 @@ def _fit_lorentzian(freq, s21, amplitude_complex_mag, amplitude_complex_arg, Qr,
     return lorentz_fit_result, lorentz_fit_cov
 
 
-def fit_transmission(freq,
-                     s21,
-                     detrend=True,
-                     detrend_order=True,
-                     detrend_points_init=1,
-                     detrend_points_final=1,
-                     plot=True,
-                     full_output=False):
-    """Fits the S21 data provided to this using the φ-RM method. Returns the fitting parameters and plots the fit.
-
-    Args:
-        freq (array): The frequencies corresponding to the S21
-        s21 (complex array): The complex S21 to be fit
-        detrend (bool): If True, performs a linear detrending of the data before fitting it. Otherwise, uses the data as is. (defaults to True)
-        detrend_order (int): The order of polynomial to use when detrending the magnitude (As of now, only accepts value = 1) (defaults to 1)
-        detrend_points_init (int): Number of points from the beginning of the array to use for detrending. Make sure that the resonance is at some distance from the beginning of the array (defaults to 1)
-        detrend_points_final (int): Number of points from the end of the array to use for detrending. Make sure that the resonance is at some distance from the end of the array (defaults to 1)
-        plot (bool): If True, plots the fits. If not, does not plot the fits (defaults to True)
-        full_output (bool): If False, the function only returns the best fit parameters as a dictionary and the plots. If True, the function returns the fit output with the covariance matrix in the order [amplitude_complex_mag, amplitude_complex_arg, Qr, Qc, fr, phi0, delay] alongside the previous outputs. (defaults to False)
-
-    Returns:
-        dict: Returns a dictionary with the best fit parameters as key-value pairs. The key list is [amplitude_complex, Qr, Qc, fr, phi0, delay]
-        list: Returns a list of figure and axes of the plotted plots (Empty if plot = False)
-        ndarray: (Optional) Returns the best fit parameters as a numpy array in the order described in Args
-        ndarray: (Optional) Returns the covariance matrix associated with the best fit as a numpy array with the rows and columns corresponding to te order described in Args
-    """
-
+def _prepare_transmission(freq, s21, detrend, detrend_order,
+                          detrend_points_init, detrend_points_final):
     del_freq = freq - freq[0]
 
     fit_delay_init, fit_poly_mag = None, None
@@ -261,6 +239,12 @@ def fit_transmission(freq,
     else:
         s21_detrended = s21.copy()
 
+    return del_freq, s21_detrended, fit_delay_init, fit_poly_mag
+
+
+def _initial_guess(freq, s21_detrended, phase_guess=None):
+    # Circle fit and phase fit, to start the Lorentzian fit close to the optimum.
+    # phase_guess is (theta, Qr, fr) to start the phase fit from, if known.
     amplitude_complex = s21_detrended[0]
     s21_new = s21_detrended / amplitude_complex
 
@@ -280,6 +264,9 @@ def fit_transmission(freq,
     theta_init = np.angle(x_center + 1.0j * y_center) - np.arcsin(
         y_center / radius)
 
+    if phase_guess is not None:
+        theta_init, Qr_init, fr_init = phase_guess
+
     theta_init, Qr_init, fr_init = _fit_phase_func(freq, np.angle(s21_new),
                                                    theta_init, Qr_init, fr_init)
 
@@ -287,9 +274,61 @@ def fit_transmission(freq,
 
     phi0_init = np.angle(x_center + 1.0j * y_center) - theta_init
 
+    return Qr_init, Qc_init, fr_init, phi0_init, theta_init
+
+
+def _fit_detrended(freq, s21_detrended, phase_guess=None):
+    # Returns the Lorentzian fit and the (theta, Qr, fr) found by the phase fit
+    amplitude_complex = s21_detrended[0]
+    Qr_init, Qc_init, fr_init, phi0_init, theta_init = _initial_guess(
+        freq, s21_detrended, phase_guess)
+
     lorentz_fit_result, lorentz_fit_cov = _fit_lorentzian(
         freq, s21_detrended, np.abs(amplitude_complex),
         np.angle(amplitude_complex), Qr_init, Qc_init, fr_init, phi0_init, 0.)
+    return lorentz_fit_result, lorentz_fit_cov, (theta_init, Qr_init, fr_init)
+
+
+def _fit_residual(freq, s21_detrended, lorentz_fit_result):
+    # Root mean square distance between the fit and the data, relative to the amplitude
+    fit_s21 = _lorentz_func(np.hstack((freq, freq)), *lorentz_fit_result)
+    fit_s21 = fit_s21[:len(freq)] + 1.0j * fit_s21[len(freq):]
+    return np.sqrt(np.mean(np.square(
+        np.abs(fit_s21 - s21_detrended)))) / lorentz_fit_result[0]
+
+
+def fit_transmission(freq,
+                     s21,
+                     detrend=True,
+                     detrend_order=True,
+                     detrend_points_init=1,
+                     detrend_points_final=1,
+                     plot=True,
+                     full_output=False):
+    """Fits the S21 data provided to this using the φ-RM method. Returns the fitting parameters and plots the fit.
+
+    Args:
+        freq (array): The frequencies corresponding to the S21
+        s21 (complex array): The complex S21 to be fit
+        detrend (bool): If True, performs a linear detrending of the data before fitting it. Otherwise, uses the data as is. (defaults to True)
+        detrend_order (int): The order of polynomial to use when detrending the magnitude (As of now, only accepts value = 1) (defaults to 1)
+        detrend_points_init (int): Number of points from the beginning of the array to use for detrending. Make sure that the resonance is at some distance from the beginning of the array (defaults to 1)
+        detrend_points_final (int): Number of points from the end of the array to use for detrending. Make sure that the resonance is at some distance from the end of the array (defaults to 1)
+        plot (bool): If True, plots the fits. If not, does not plot the fits (defaults to True)
+        full_output (bool): If False, the function only returns the best fit parameters as a dictionary and the plots. If True, the function returns the fit output with the covariance matrix in the order [amplitude_complex_mag, amplitude_complex_arg, Qr, Qc, fr, phi0, delay] alongside the previous outputs. (defaults to False)
+
+    Returns:
+        dict: Returns a dictionary with the best fit parameters as key-value pairs. The key list is [amplitude_complex, Qr, Qc, fr, phi0, delay]
+        list: Returns a list of figure and axes of the plotted plots (Empty if plot = False)
+        ndarray: (Optional) Returns the best fit parameters as a numpy array in the order described in Args
+        ndarray: (Optional) Returns the covariance matrix associated with the best fit as a numpy array with the rows and columns corresponding to te order described in Args
+    """
+
+    del_freq, s21_detrended, fit_delay_init, fit_poly_mag = _prepare_transmission(
+        freq, s21, detrend, detrend_order, detrend_points_init,
+        detrend_points_final)
+
+    lorentz_fit_result, lorentz_fit_cov, _ = _fit_detrended(freq, s21_detrended)
 
     amplitude_complex_mag, amplitude_complex_arg, Qr, Qc, fr, phi0, delay = lorentz_fit_result
 
@@ -340,7 +379,8 @@ def fit_transmission(freq,
     # Returning the results with post-processing
     amplitude_complex = amplitude_complex_mag * np.exp(
         1.0j * amplitude_complex_arg)
-    delay -= (fit_delay_init.slope) / (2. * np.pi)
+    if detrend == True:
+        delay -= (fit_delay_init.slope) / (2. * np.pi)
 
     # amplitude_complex_mag, amplitude_complex_arg, Qr, Qc, fr, phi0, delay
 
@@ -358,4 +398,121 @@ def fit_transmission(freq,
                     delay=delay), plots
 
 
+def _fit_transmission_chunk(freq, s21, options, warm_start):
+    # Fit consecutive traces, each starting from the result of the one before.
+    # Module level, so that it can run in a worker process.
+    rows = []
+    guess, best_residual = None, np.inf
+    for freq_row, s21_row in zip(freq, s21):
+        row = dict(amplitude_complex=np.nan + 0.0j,
+                   Qr=np.nan,
+                   Qc=np.nan,
+                   fr=np.nan,
+                   phi0=np.nan,
+                   delay=np.nan,
+                   residual=np.nan,
+                   error=None)
+        try:
+            _, s21_detrended, fit_delay_init, _ = _prepare_transmission(
+                freq_row, s21_row, **options)
+            result = None
+            if warm_start and guess is not None:
+                try:
+                    result, _, phase_fit = _fit_detrended(
+                        freq_row, s21_detrended, guess)
+                    residual = _fit_residual(freq_row, s21_detrended, result)
+                    # the neighbour was too far off, start from scratch
+                    if residual > 2. * best_residual:
+                        result = None
+                except Exception:  # pylint: disable=broad-except
+                    result = None
+            if result is None:
+                result, _, phase_fit = _fit_detrended(freq_row, s21_detrended)
+                residual = _fit_residual(freq_row, s21_detrended, result)
+
+            amplitude_complex_mag, amplitude_complex_arg, Qr, Qc, fr, phi0, delay = result
+            if fit_delay_init is not None:
+                delay -= (fit_delay_init.slope) / (2. * np.pi)
+            row.update(amplitude_complex=amplitude_complex_mag *
+                       np.exp(1.0j * amplitude_complex_arg),
+                       Qr=Qr,
+                       Qc=Qc,
+                       fr=fr,
+                       phi0=phi0,
+                       delay=delay,
+                       residual=residual)
+            guess = phase_fit
+            best_residual = min(residual, best_residual)
+        except Exception as ex:  # pylint: disable=broad-except
+            row['error'] = f'{type(ex).__name__}: {ex}'
+            guess = None
+        rows.append(row)
+    return rows
+
+
+def fit_transmission_batch(freq,
+                           s21,
+                           detrend=True,
+                           detrend_order=True,
+                           detrend_points_init=1,
+                           detrend_points_final=1,
+                           warm_start=True,
+                           workers=0):
+    """Fits many S21 traces, e.g. of a power or flux sweep, with the same
+    method as fit_transmission, without plotting.
+
+    Traces are fitted in order. With warm_start, the phase fit of a trace
+    starts from the phase fit of the previous trace rather than from the
+    rough guess; the circle fit and the Lorentzian fit run as usual. If the
+    residual of the result is more than twice the best residual of the
+    traces before it, the trace is fitted again without the warm start.
+
+    Args:
+        freq (array): The frequencies, either shared by all traces (1D) or
+            one row per trace (2D, same shape as s21)
+        s21 (complex array): The complex S21 to be fit, one trace per row (2D)
+        detrend (bool): If True, performs a linear detrending of each trace
+            before fitting it. (defaults to True)
+        detrend_order (int): The order of polynomial to use when detrending
+            the magnitude (As of now, only accepts value = 1) (defaults to 1)
+        detrend_points_init (int): Number of points from the beginning of
+            each trace to use for detrending (defaults to 1)
+        detrend_points_final (int): Number of points from the end of each
+            trace to use for detrending (defaults to 1)
+        warm_start (bool): If True, starts the phase fit of each trace from
+            the result of the previous trace (defaults to True)
+        workers (int): Number of processes. The traces are split in
+            contiguous blocks, one per process, warm-started within each
+            block. 0 or 1 to fit in this process (defaults to 0)
+
+    Returns:
+        pd.DataFrame: One row per trace, with the columns amplitude_complex,
+        Qr, Qc, fr, phi0, delay as in fit_transmission, the residual (root
+        mean square distance between the fit and the detrended data, relative
+        to the amplitude) and the error message if the fit failed (None
+        otherwise)
+    """
+    s21 = np.atleast_2d(s21)
+    freq = np.broadcast_to(freq, s21.shape)
+    options = dict(detrend=detrend,
+                   detrend_order=detrend_order,
+                   detrend_points_init=detrend_points_init,
+                   detrend_points_final=detrend_points_final)
+
+    chunks = np.array_split(np.arange(len(s21)), max(workers, 1))
+    chunks = [chunk for chunk in chunks if len(chunk)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_fit_transmission_chunk, freq[chunk],
+                                s21[chunk], options, warm_start)
+                for chunk in chunks
+            ]
+            rows = [row for future in futures for row in future.result()]
+    else:
+        rows = _fit_transmission_chunk(freq, s21, options, warm_start)
+
+    return pd.DataFrame(rows)
+
+
 # %%
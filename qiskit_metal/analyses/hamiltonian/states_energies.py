@@ -43,10 +43,58 @@ def basis_state_on(mode_size: List[int], excitations: Dict_[int, int]):
     ])
 
 
+def basis_state_index(mode_size: List[int], excitations: Dict_[int, int]):
+    """Index of the only non-zero entry of the state given by basis_state_on,
+    in the tensor product space.
+
+    Args:
+        mode_size (list): list of integers specifying number of fock states
+                           for each mode, respectively
+        excitations (dict): {mode index: # of photons}
+            give the value excitations[i] or 0 if index i not in excitations;
+            i.e., by default ground state.
+
+    Returns:
+        int: index of the basis state
+
+    Raises:
+        ValueError: more photons in a mode than its number of fock states
+    """
+    index = 0
+    for i, size in enumerate(mode_size):
+        photons = excitations.get(i, 0)
+        if not 0 <= photons < size:
+            raise ValueError(f'Mode {i} has {size} fock states, it can not '
+                             f'hold {photons} photons.')
+        index = index * size + photons
+    return index
+
+
+def closest_states_to(evecs: List[Qobj], indices: List[int]) -> np.ndarray:
+    """Find, for each basis state, the eigenvector with the largest overlap.
+
+    The eigenvectors are stacked as the columns of one matrix. As the
+    basis states have a single non-zero entry, the overlaps with all of them
+    are the rows of this matrix at their indices.
+
+    Args:
+        evecs (List[Qobj]): eigenstates of the diagonalized hamiltonian
+        indices (List[int]): indices of the basis states, see basis_state_index
+
+    Returns:
+        np.ndarray: for each basis state, the index of the closest eigenvector.
+        The first one, for equal overlaps.
+    """
+    stacked = np.hstack([evec.full() for evec in evecs])
+    overlaps = np.abs(stacked[np.asarray(indices)])
+    return np.argmax(overlaps, axis=1)
+
+
 def extract_energies(esys_array: np.ndarray,
                      mode_size: List[int],
                      zero_evals: bool = True,
-                     chi_prime: bool = False):
+                     chi_prime: bool = False,
+                     quiet: bool = False):
     """
     Returns the frequencies, anharmonicities, and dispersive shifts of the modes.
 
@@ -60,6 +108,7 @@ def extract_energies(esys_array: np.ndarray,
         zero_evals (bool, optional): If true, the "ground state" eigenvalue is substracted
             all eigenvalues. Defaults to True.
         chi_prime (bool, optional): Defaults to False.
+        quiet (bool, optional): If true, do not print the progress. Defaults to False.
 
     Returns:
         np.ndarray, np.ndarray: a tuple of arrays. The first array is the frequencies of
@@ -67,50 +116,45 @@ def extract_energies(esys_array: np.ndarray,
             anharmonicities of the modes and the off-diagonal entries are the dispersive
             shifts, i.e., the chi's between the modes
     """
-
-    print("Processing eigensystem...", end='')
+    if not quiet:
+        print("Processing eigensystem...", end='')
     evals, evecs = esys_array
-    print("\rFinished eigensystem.     ")
 
     if zero_evals:
         evals -= evals[0]  # zero out
 
-    # if use_1st_order:
-    def closest_state_to(s: Qobj):
-        # find the eigenvector among evecs that is closest
-        # to s (largest inner product)
-
-        def distance(s2: Qobj):
-            return (s.dag() * s2[1]).norm()
-
-        return max(zip(evals, evecs), key=distance)
-
     N = len(mode_size)
 
-    def state_on(excitations):
-        return basis_state_on(mode_size, excitations)  # eigenstate on
+    # All the states to look for: one photon in mode i, one photon in modes
+    # i and j (two in mode i if i == j) and, for chi_prime, one more in j.
+    singles = [{i: 1} for i in range(N)]
+    pairs = [(i, j) for i in range(N) for j in range(i, N)]
+    doubles = [{i: 1 + (i == j), j: 1 + (i == j)} for i, j in pairs]
+    triples = []
+    if chi_prime:
+        triples = [{i: 1 + (i == j), j: 2 + (i == j)} for i, j in pairs]
+
+    closest = closest_states_to(evecs, [
+        basis_state_index(mode_size, excitations)
+        for excitations in singles + doubles + triples
+    ])
+    closest_evals = np.asarray(evals)[closest]
+    if not quiet:
+        print("\rFinished eigensystem.     ")
 
-    f1s = [closest_state_to(state_on({i: 1}))[0] for i in range(N)]
+    f1s = list(closest_evals[:N])
     chis = [[0] * N for _ in range(N)]
     chips = [[0] * N for _ in range(N)]
-    for i in range(N):
-        for j in range(i, N):
-            d = {k: 0 for k in range(N)}  # put 0 photons in each mode (k)
-            d[i] += 1
-            d[j] += 1
-            # load ith mode and jth mode with 1 photon
-            fs = state_on(d)
-            ev, _evec = closest_state_to(fs)
-            chi = (ev - (f1s[i] + f1s[j]))
-            chis[i][j] = chi
-            chis[j][i] = chi
-
-            if chi_prime:
-                d[j] += 1
-                fs = state_on(d)
-                ev, _evec = closest_state_to(fs)
-                chip = (ev - (f1s[i] + 2 * f1s[j]) - 2 * chis[i][j])
-                chips[i][j] = chip
-                chips[j][i] = chip
+    for k, (i, j) in enumerate(pairs):
+        ev = closest_evals[N + k]
+        chi = (ev - (f1s[i] + f1s[j]))
+        chis[i][j] = chi
+        chis[j][i] = chi
+
+        if chi_prime:
+            ev = closest_evals[N + len(pairs) + k]
+            chip = (ev - (f1s[i] + 2 * f1s[j]) - 2 * chis[i][j])
+            chips[i][j] = chip
+            chips[j][i] = chip
 
     return np.array(f1s), np.array(chis)
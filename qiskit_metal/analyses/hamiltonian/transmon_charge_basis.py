@@ -20,6 +20,8 @@ get the Ej, Ec or use input Ej, Ec to find the spectrum of the Cooper Pair Box.
 """
 # pylint: disable=invalid-name
 
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import qutip as qt
 import scipy.linalg as linalg
@@ -362,3 +364,217 @@ class Hcpb:
         """Set ng and recompute properties."""
         self._ng = value
         self._calc_H()
+
+
+class HcpbBatch:
+    """Batched Hamiltonian-model Cooper pair box (Hcpb) class.
+
+    Same model as Hcpb, but for arrays of Ej, Ec and ng values, for example to
+    map a grid of qubit parameters. The tridiagonal Hamiltonians of all the
+    points are stacked and diagonalized together, by NumPy, in chunks of
+    chunk_size points. The chunks can be spread over a pool of processes.
+
+    All properties are arrays with the broadcast shape of Ej, Ec and ng.
+    """
+
+    def __init__(self,
+                 nlevels: int = 15,
+                 Ej: np.ndarray = None,
+                 Ec: np.ndarray = None,
+                 ng: np.ndarray = 0.5,
+                 evecs: bool = False,
+                 chunk_size: int = 4096,
+                 workers: int = 0):
+        """Generate the Cooper-pair box (CPB) models of a grid of parameters.
+
+        Args:
+            nlevels (int): Number of charge states of the CPB [-nlevels, nlevels+1]
+            Ej (np.ndarray): Josephson energies of the JJ
+            Ec (np.ndarray): Charging energies of the CPB
+            ng (np.ndarray): Offset charges of the CPB (ng=0.5 is the sweet spot).
+                        Ej, Ec and ng are broadcast together.
+            evecs (bool): True to compute the eigenvectors now, with the
+                        eigenvalues. Otherwise they are computed the first
+                        time they are needed, e.g. by n_ij. Defaults to False.
+            chunk_size (int): Number of points diagonalized together.
+                        Defaults to 4096.
+            workers (int): Number of processes used for the chunks. 0 or 1 to
+                        use the calling process only. Defaults to 0.
+
+        Example use:
+
+            .. code-block::
+
+                Ej = np.linspace(10000, 20000, 101)
+                Ec = np.linspace(200, 350, 51)
+                H = HcpbBatch(nlevels=15, Ej=Ej[:, None], Ec=Ec[None, :], ng=0.5)
+
+                f01 = H.fij(0, 1)  # shape (101, 51), in the units of Ej, Ec
+                alpha = H.anharm()
+
+        Raises:
+            ValueError: Ej or Ec is not given.
+        """
+        if Ej is None or Ec is None:
+            raise ValueError('HcpbBatch needs the Ej and Ec values, '
+                             f'but got Ej={Ej} and Ec={Ec}.')
+        self._nlevels = nlevels
+        self.chunk_size = chunk_size
+        self.workers = workers
+
+        self._Ej, self._Ec, self._ng = np.broadcast_arrays(
+            np.asarray(Ej, dtype=float), np.asarray(Ec, dtype=float),
+            np.asarray(ng, dtype=float))
+        self.evals, self._evecs = self._diagonalize_H(evecs=evecs)
+
+    def _diagonalize_H(self, evecs: bool) -> tuple:
+        """Diagonalize the CPB Hamiltonians of all the points, by chunks.
+
+        Args:
+            evecs (bool): True to also compute the eigenvectors.
+
+        Returns:
+            tuple: The eigenvalues, shape + (2*nlevels+1,), and the
+            eigenvectors, shape + (2*nlevels+1, 2*nlevels+1) or None.
+        """
+        Ej, Ec, ng = (value.ravel() for value in (self._Ej, self._Ec, self._ng))
+        starts = range(0, len(Ej), self.chunk_size)
+        chunks = [(self._nlevels, Ej[start:start + self.chunk_size],
+                   Ec[start:start + self.chunk_size],
+                   ng[start:start + self.chunk_size], evecs)
+                  for start in starts]
+
+        if self.workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(_diagonalize_cpb, *zip(*chunks)))
+        else:
+            results = [_diagonalize_cpb(*chunk) for chunk in chunks]
+
+        size = 2 * self._nlevels + 1
+        shape = self._Ej.shape
+        all_evals = np.concatenate([result[0] for result in results])
+        if not evecs:
+            return all_evals.reshape(shape + (size,)), None
+        all_evecs = np.concatenate([result[1] for result in results])
+        return (all_evals.reshape(shape + (size,)),
+                all_evecs.reshape(shape + (size, size)))
+
+    @property
+    def shape(self) -> tuple:
+        """Return the shape of the grid of points."""
+        return self._Ej.shape
+
+    @property
+    def evecs(self) -> np.ndarray:
+        """Return the eigenvectors, as columns, of all the points."""
+        if self._evecs is None:
+            self.evals, self._evecs = self._diagonalize_H(evecs=True)
+        return self._evecs
+
+    def evalue_k(self, k: int) -> np.ndarray:
+        """Return the eigenvalues of the Hamiltonians for level k.
+
+        Args:
+            k (int): Index of the eigenvalue
+
+        Returns:
+            np.ndarray: eigenvalues of the Hamiltonians
+        """
+        return self.evals[..., k]
+
+    def evec_k(self, k: int) -> np.ndarray:
+        """Return the eigenvectors of the CPB Hamiltonians for level k.
+
+        Args:
+            k (int): Index of eigenvector
+
+        Returns:
+            np.ndarray: Eigenvectors of the \\|k> level, shape + (2*nlevels+1,)
+        """
+        return self.evecs[..., k]
+
+    def fij(self, i: int, j: int) -> np.ndarray:
+        """Compute the transition energies (or frequencies) between states
+        \\|i> and \\|j>.
+
+        Args:
+            i (int): Index of state \\|i>
+            j (int): Index of state \\|j>
+
+        Returns:
+            np.ndarray: Eij, the transition energies
+        """
+        return np.abs(self.evalue_k(i) - self.evalue_k(j))
+
+    def anharm(self) -> np.ndarray:
+        """Compute the anharmonicities of the CPBs.
+
+        Returns:
+            np.ndarray: Anharmonicities defined as E12-E01
+        """
+        return self.fij(1, 2) - self.fij(0, 1)
+
+    def n_ij(self, i: int, j: int) -> np.ndarray:
+        """Compute the values of the number operator for coupling elements
+        together in the energy eigen-basis.
+
+        Args:
+            i (int): \\|i> Index of the transmon
+            j (int): \\|j> Index of the transmon
+
+        Returns:
+            np.ndarray: Matrix elements corresponding to the
+            number operator in the transmon basis
+            `n_ij = |<i|n|j>|`
+        """
+        n_op = np.arange(-self._nlevels, self._nlevels + 1)
+        return np.abs(
+            np.einsum('...n,n,...n->...', np.conj(self.evec_k(i)), n_op,
+                      self.evec_k(j)))
+
+    @property
+    def nlevels(self):
+        """Return the number of levels."""
+        return self._nlevels
+
+    @property
+    def Ej(self):
+        """Returns Ej."""
+        return self._Ej
+
+    @property
+    def Ec(self):
+        """Return Ec."""
+        return self._Ec
+
+    @property
+    def ng(self):
+        """Return ng."""
+        return self._ng
+
+
+def _diagonalize_cpb(nlevels: int, Ej: np.ndarray, Ec: np.ndarray,
+                     ng: np.ndarray, evecs: bool) -> tuple:
+    """Diagonalize a stack of CPB Hamiltonians in the charge basis. Module
+    level, to be run by a pool of processes.
+
+    Args:
+        nlevels (int): Number of charge states of the CPB [-nlevels, nlevels+1]
+        Ej (np.ndarray): 1D array of Josephson energies
+        Ec (np.ndarray): 1D array of charging energies
+        ng (np.ndarray): 1D array of offset charges
+        evecs (bool): True to also compute the eigenvectors.
+
+    Returns:
+        tuple: Eigenvalues, shape (len(Ej), 2*nlevels+1), and eigenvectors,
+        shape (len(Ej), 2*nlevels+1, 2*nlevels+1), or None.
+    """
+    charges = np.arange(-nlevels, nlevels + 1)
+    index = np.arange(len(charges))
+    ham = np.zeros((len(Ej), len(charges), len(charges)))
+    ham[:, index, index] = 4 * Ec[:, None] * (charges - ng[:, None])**2
+    ham[:, index[:-1], index[1:]] = -(Ej[:, None] / 2.0)
+    ham[:, index[1:], index[:-1]] = -(Ej[:, None] / 2.0)
+    if evecs:
+        return np.linalg.eigh(ham)
+    return np.linalg.eigvalsh(ham), None
@@ -152,12 +152,18 @@ class EPRanalysis(QAnalysis):
         """Executes sequentially the system capacitance simulation and lom extraction executing
         the methods EigenmodeSim.run_sim(`*args`, `**kwargs`) and EPRanalysis.run_epr().
         For input parameter, see documentation for EigenmodeSim.run_sim().
+        The result_cache of the simulation is not used, because the epr methods read the
+        eigenmodes from the renderer.
 
         Returns:
             (dict): Pass numbers (keys) and respective energy participation ratio (values).
         """
         if isinstance(self.sim, EigenmodeSim):
-            self.sim.run(*args, **kwargs)
+            result_cache, self.sim.result_cache = self.sim.result_cache, None
+            try:
+                self.sim.run(*args, **kwargs)
+            finally:
+                self.sim.result_cache = result_cache
         return self.run_epr()
 
     def run_epr(self, no_junctions=False):
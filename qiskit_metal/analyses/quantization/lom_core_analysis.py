@@ -32,14 +32,21 @@ class DummyH5py:
 sys.modules['h5py'] = DummyH5py
 
 from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import functools
+import itertools
 from typing import Any, List, Dict, Tuple, DefaultDict, Sequence, Mapping, Union
 import argparse
 
 import numpy as np
 import pandas as pd
+import qutip
 import scqubits as scq
 from sympy import Matrix
 from scipy import optimize, integrate
+import scipy.linalg
+import scipy.sparse
 
 from pyEPR.calcs.convert import Convert
 from pyEPR.calcs.constants import e_el as ele, hbar
@@ -181,6 +188,7 @@ def _extract_matrix_from_transform(transform: BasisTransform,
     https://arxiv.org/pdf/2103.10344.pdf
     """
     junctions = dict(zip(junctions.values(), junctions.keys()))
+    node_idx = {n: i for i, n in enumerate(index)}
 
     dim = len(transform.orig_node_basis)
     m = np.zeros((dim, dim))
@@ -190,7 +198,7 @@ def _extract_matrix_from_transform(transform: BasisTransform,
             m[ii, ii] = 1
         else:
             n1, n2 = junctions[n_new]
-            c1, c2 = index.get_indexer([n1, n2])
+            c1, c2 = node_idx[n1], node_idx[n2]
             m[ii, c1] = 1
             m[ii, c2] = -1
     return m
@@ -219,6 +227,15 @@ def _transform_to_junction_flux_basis(orig_nodes,
     # is the original node that is replaced by the ith junction; And an array of these arrays can
     # represent all possible mappings
 
+    positive_nodes = [n1 for n1, _ in junctions.values()]
+    if choose_least_num_neg and len(set(positive_nodes)) == len(positive_nodes):
+        # every junction can replace its own "positive" node: this is the first
+        # combination the product below would produce, and it has no negative
+        # nodes, so skip enumerating all 2^N combinations
+        _map = dict(zip(positive_nodes, j_list))
+        new_nodes = [_map.get(n, n) for n in orig_nodes]
+        return BasisTransform(orig_nodes, new_nodes, 0)
+
     all_combos = _product_no_duplicate(*tuple(junctions.values()))
     all_maps = [dict(zip(x, j_list)) for x in all_combos]
 
@@ -282,6 +299,15 @@ class LabeledNdarray(np.ndarray):
             self.labels = getattr(obj, 'labels',
                                   [str(x) for x in range(self.shape[0])])
 
+    def __reduce__(self):
+        # keep the labels when pickled, e.g., when sent to a worker process
+        reconstruct, args, state = super().__reduce__()
+        return reconstruct, args, (state, self.labels)
+
+    def __setstate__(self, state):
+        state, self.labels = state
+        super().__setstate__(state)
+
     def __repr__(self):
         if len(self.shape) == 1 or self.shape[0] != self.shape[1]:
             return f'{self.view(np.ndarray)}'
@@ -316,6 +342,20 @@ def _maybe_remove_grd_node_then_cache(f):
     return wrapper
 
 
+def _cache_until_invalidated(f):
+    """function decorator that caches the output of a function,
+    i.e., f(), until CircuitGraph.invalidate() is called
+    """
+
+    @functools.wraps(f)
+    def wrapper(self):
+        if f.__name__ not in self._cache:
+            self._cache[f.__name__] = f(self)
+        return self._cache[f.__name__]
+
+    return wrapper
+
+
 class CircuitGraph:
     """
     class implementing the lumped model circuit analysis.
@@ -371,9 +411,11 @@ class CircuitGraph:
 
         self.nodes = list(nodes)
         self.idx = pd.Index(self.nodes)
+        self._node_idx = {n: i for i, n in enumerate(self.nodes)}
         self._grd_node = grd_node
         self.ignore_grd_node = CircuitGraph._IGNORE_GRD_NODE
         self.grd_idx = self.idx.get_indexer([grd_node])[0]
+        self._cache = {}
         self.nodes_force_keep = nodes_force_keep
 
         self._c_graphs = [_df_cmat_to_adj_list(m) for m in cmats]
@@ -416,37 +458,90 @@ class CircuitGraph:
 
         return str_out
 
+    @property
+    def nodes_force_keep(self):
+        """Nodes that will not be eliminated during L and C matrices reduction
+        """
+        return self._nodes_force_keep
+
+    @nodes_force_keep.setter
+    def nodes_force_keep(self, nodes: Sequence):
+        self._nodes_force_keep = nodes
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop the cached transformed and reduced matrices so that they are
+        recomputed on next access
+        """
+        self._cache.clear()
+
+    # yapf: disable
+    def with_inductances(self,
+                         ind_lists: List[Dict[Tuple, float]]) -> 'CircuitGraph':
+        # yapf: enable
+        """Copy of the circuit graph with different inductances, which reuses the
+        junction basis and the transformed capacitance matrix. When the inductors
+        connect the same nodes as in this graph, the reduction (nodes kept, C_k and
+        C_inv_k) is reused as well and only L_inv_k is recomputed.
+
+        Args:
+            ind_lists (List[Dict[Tuple, float]]): list of dicts where each dict
+                specifies the inductances in each cell, as in the constructor
+
+        Returns:
+            CircuitGraph: the new circuit graph
+        """
+        cg = copy.copy(self)
+        cg._ind_lists = ind_lists
+        cg._L_n_inv = None
+        reused = ['C']
+        if [set(d or {}) for d in ind_lists
+           ] == [set(d or {}) for d in self._ind_lists]:
+            reused += ['_remove_idx', '_keep_idx', 'C_k', 'C_inv_k']
+        cg._cache = {k: v for k, v in self._cache.items() if k in reused}
+        return cg
+
     def _adj_list_to_mat(self, adj_list):
         """ convert adjacency list representation of capacitance graph to
         a matrix representation
         """
-        idx = self.idx
+        idx = self._node_idx
         dim = len(idx)
-        mat = np.zeros((dim, dim))
-        for n1 in adj_list:
-            for n2, w in adj_list[n1]:
-                r = idx.get_indexer([n1])[0]
-                c = idx.get_indexer([n2])[0]
-                mat[r, c] += w
-                if r != c:
-                    mat[c, r] += w
-        return mat
+        rows, cols, vals = [], [], []
+        for n1, edges in adj_list.items():
+            r = idx[n1]
+            for n2, w in edges:
+                rows.append(r)
+                cols.append(idx[n2])
+                vals.append(w)
+        rows, cols, vals = np.array(rows, dtype=int), np.array(
+            cols, dtype=int), np.array(vals, dtype=float)
+        off_diag = rows != cols
+        # duplicate entries are summed when converting from COO format
+        all_rows = np.concatenate([rows, cols[off_diag]])
+        all_cols = np.concatenate([cols, rows[off_diag]])
+        mat = scipy.sparse.coo_matrix(
+            (np.concatenate([vals, vals[off_diag]]), (all_rows, all_cols)),
+            shape=(dim, dim))
+        return mat.toarray()
 
     def _inductance_list_to_Linv_mat(self, ind_dict):
         """ convert inductance list to inductance inverse matrix
         """
-        idx = self.idx
+        idx = self._node_idx
         dim = len(idx)
         mat = np.zeros((dim, dim))
-        for (n1, n2), l in ind_dict.items():
-            if n1 == n2:
-                raise ValueError(
-                    'inductance needs to be specified between two different nodes'
-                )
-            idx1, idx2 = idx.get_indexer([n1, n2])
-            mat[idx1, idx2] = mat[idx2, idx1] = -1 / l
-        for ii in range(len(mat)):
-            mat[ii, ii] = -mat[ii].sum()
+        if not ind_dict:
+            return mat
+        if any(n1 == n2 for n1, n2 in ind_dict):
+            raise ValueError(
+                'inductance needs to be specified between two different nodes')
+        rows = np.array([(idx[n1], idx[n2]) for n1, n2 in ind_dict], dtype=int)
+        l_inv = -1 / np.array(list(ind_dict.values()), dtype=float)
+        # assign both (n1, n2) and (n2, n1) per inductor, in order, so that a
+        # later entry for the same pair overrides an earlier one
+        mat[rows.ravel(), rows[:, ::-1].ravel()] = np.repeat(l_inv, 2)
+        np.fill_diagonal(mat, -mat.sum(axis=1))
         return mat
 
     @property
@@ -495,6 +590,7 @@ class CircuitGraph:
         return S_n
 
     @property
+    @_cache_until_invalidated
     def C(self):
         """Transformed capacitance matrix of the composite system
         """
@@ -502,6 +598,7 @@ class CircuitGraph:
             self.S_n.T.dot(self.C_n).dot(self.S_n), self.node_jj_basis)
 
     @property
+    @_cache_until_invalidated
     def L_inv(self):
         """Transformed inductance inverse matrix of the composite system
         """
@@ -539,13 +636,9 @@ class CircuitGraph:
             ]
         return _node_jj_basis
 
-    @property
-    def S_remove(self):
-        """ Eliminate coupler constraints due to the singularity of
-        the inverse inductance matrix. Here we eliminate fluxes
-        in the kernel space of the transformed inverse inductance
-        matrix. These are nodes that are only touched by capacitors and are
-        considered non-dynamic nodes.
+    @_cache_until_invalidated
+    def _remove_idx(self):
+        """ indices in node_jj_basis of the nodes eliminated by S_remove
         """
         nodes_force_keep = self.nodes_force_keep if self.nodes_force_keep else []
         force_keep_idx = pd.Index(
@@ -558,24 +651,47 @@ class CircuitGraph:
                 f'nodes {bad_nodes_str} in input node_force_keep are not in the flux basis [self.node_jj_basis].'
             )
 
-        L_inv = self.L_inv
-        _s_r = []
-        null_space = Matrix(L_inv).nullspace()
-        for _v in null_space:
-            v = _v / _v.norm()
-            v = np.array(v).astype(np.float64)
-            if np.count_nonzero(v) != 1:
-                raise ValueError(
-                    f'Nullspace column vector {v} has more than one non-zero element. \
-                                 Only individual nodes in the current flux [see self.node_jj_basis] basis can be removed'
-                )
+        L_inv = np.asarray(self.L_inv)
+        touched = L_inv.any(axis=0)
+        L_inv_touched = L_inv[np.ix_(touched, touched)]
+        if not L_inv_touched.size or np.linalg.matrix_rank(
+                L_inv_touched) == L_inv_touched.shape[0]:
+            # the kernel is spanned by the nodes not touched by any inductor,
+            # no need for the (slow) symbolic nullspace
+            null_idx = np.where(~touched)[0].tolist()
+        else:
+            null_idx = []
+            for _v in Matrix(L_inv).nullspace():
+                v = _v / _v.norm()
+                v = np.array(v).astype(np.float64)
+                if np.count_nonzero(v) != 1:
+                    raise ValueError(
+                        f'Nullspace column vector {v} has more than one non-zero element. \
+                                     Only individual nodes in the current flux [see self.node_jj_basis] basis can be removed'
+                    )
+                null_idx.append(np.where(v)[0][0])
+
+        # if the node to be removed is in the list of nodes that are forced to be kept, don't remove
+        return [ii for ii in null_idx if ii not in force_keep_idx]
 
-            # if the node to be removed is in the list of nodes that are forced to be kept, don't remove
-            if np.where(force_keep_idx == np.where(v)[0][0])[0].size:
-                continue
-            _s_r.append(v)
+    @_cache_until_invalidated
+    def _keep_idx(self):
+        """ indices in node_jj_basis of the nodes kept by S_keep
+        """
+        remove_idx = set(self._remove_idx())
+        return [
+            ii for ii in range(len(self.node_jj_basis)) if ii not in remove_idx
+        ]
 
-        return np.concatenate(_s_r, axis=1)
+    @property
+    def S_remove(self):
+        """ Eliminate coupler constraints due to the singularity of
+        the inverse inductance matrix. Here we eliminate fluxes
+        in the kernel space of the transformed inverse inductance
+        matrix. These are nodes that are only touched by capacitors and are
+        considered non-dynamic nodes.
+        """
+        return np.eye(len(self.node_jj_basis))[:, self._remove_idx()]
 
     @property
     def S_keep(self):
@@ -583,56 +699,49 @@ class CircuitGraph:
         """
         # FIXME: currently assuming that S_keep can be solely constructed from
         # S_remove (which itself is constructed from the identity matrix) and the identity matrix
-        S_remove = self.S_remove
-        dim = S_remove.shape[0]
-        eye = np.eye(dim)
-        return eye[:, np.where(S_remove.T.sum(axis=0) == 0)[0]]
+        return np.eye(len(self.node_jj_basis))[:, self._keep_idx()]
 
     def get_nodes_keep(self):
-        s_keep = self.S_keep
-        dim = s_keep.shape[0]
-        keep_idx = s_keep.T.dot(np.arange(dim)[:, np.newaxis])[:, 0].astype(int)
-        return np.array(self.node_jj_basis)[keep_idx].tolist()
+        return [self.node_jj_basis[ii] for ii in self._keep_idx()]
 
     def get_nodes_remove(self):
-        s_remove = self.S_remove
-        dim = s_remove.shape[0]
-        remove_idx = s_remove.T.dot(np.arange(dim)[:,
-                                                   np.newaxis])[:,
-                                                                0].astype(int)
-        return np.array(self.node_jj_basis)[remove_idx].tolist()
+        return [self.node_jj_basis[ii] for ii in self._remove_idx()]
 
     @property
+    @_cache_until_invalidated
     def L_inv_k(self):
         """
         https://arxiv.org/pdf/2103.10344.pdf
         equation (7a)
         """
-        s_keep = self.S_keep
-        l_inv = self.L_inv
-        return LabeledNdarray(
-            s_keep.T.dot(l_inv).dot(s_keep), self.get_nodes_keep())
+        keep = self._keep_idx()
+        l_inv = np.asarray(self.L_inv)
+        return LabeledNdarray(l_inv[np.ix_(keep, keep)], self.get_nodes_keep())
 
     @property
+    @_cache_until_invalidated
     def C_k(self):
         """
         https://arxiv.org/pdf/2103.10344.pdf
         equation (7b)
         """
-        s_k = self.S_keep
-        s_r = self.S_remove
-        c = self.C
-        _inner = c.dot(s_r).dot(np.linalg.inv(s_r.T.dot(c.dot(s_r)))).dot(
-            s_r.T.dot(c))
-        return LabeledNdarray(
-            s_k.T.dot(c - _inner).dot(s_k), self.get_nodes_keep())
+        keep, remove = self._keep_idx(), self._remove_idx()
+        c = np.asarray(self.C)
+        c_k = c[np.ix_(keep, keep)]
+        if remove:
+            c_kr = c[np.ix_(keep, remove)]
+            c_rk = c[np.ix_(remove, keep)]
+            c_k = c_k - c_kr.dot(
+                np.linalg.solve(c[np.ix_(remove, remove)], c_rk))
+        return LabeledNdarray(c_k, self.get_nodes_keep())
 
     @property
+    @_cache_until_invalidated
     def C_inv_k(self):
         c_k = self.C_k
         if np.linalg.matrix_rank(c_k) < c_k.shape[0]:
             raise ValueError('C_k is rank deficient hence can\'t be inverted')
-        return LabeledNdarray(np.linalg.inv(self.C_k), self.get_nodes_keep())
+        return LabeledNdarray(np.linalg.inv(c_k), self.get_nodes_keep())
 
 
 #----------------------------------------------------------------------------------------------------
@@ -1125,7 +1234,22 @@ class Cell:
             self.cj_dict = _rename_nodes_in_dict(self._node_rename,
                                                  options['cj_dict'])
 
-        self.nodes = self.cap_mat.columns.values.tolist()
+    @property
+    def nodes(self) -> List[str]:
+        """Nodes of the cell, i.e., the columns of its capacitance matrix"""
+        return self.cap_mat.columns.values.tolist()
+
+    def fingerprint(self) -> Tuple:
+        """Summary of the circuit parameters of the cell, which changes whenever
+        the capacitance matrix, inductances, junctions or junction capacitances do
+
+        Returns:
+            Tuple: comparable summary of the cell
+        """
+        _items = lambda d: None if d is None else tuple(d.items())
+        return (tuple(self.cap_mat.index), tuple(self.cap_mat.columns),
+                self.cap_mat.values.tobytes(), _items(self.ind_dict),
+                _items(self.jj_dict), _items(self.cj_dict))
 
 
 class CompositeSystem:
@@ -1157,6 +1281,14 @@ class CompositeSystem:
         self.grd_node = grd_node
         self.nodes_force_keep = nodes_force_keep
 
+        self.quantum_subsystems = []
+
+        self._cg = None
+        self._cg_key = None
+        self._collect_cells()
+
+    def _collect_cells(self):
+        """gather the nodes and circuit parameters of all the cells"""
         self._jj = {k: j for c in self._cells for k, j in c.jj_dict.items()}
         _jj_to_node_map = dict(zip(self._jj.values(), self._jj.keys()))
 
@@ -1177,17 +1309,25 @@ class CompositeSystem:
         self._cj_dicts = [c.cj_dict for c in self._cells]
         self._l_list = [c.ind_dict for c in self._cells]
 
-        self.quantum_subsystems = []
-
-        self._cg = None
+    def _circuit_key(self) -> Tuple:
+        """everything the CircuitGraph object depends on"""
+        nodes_force_keep = self.nodes_force_keep
+        return (tuple(c.fingerprint() for c in self._cells), self.grd_node,
+                None if nodes_force_keep is None else tuple(nodes_force_keep))
 
     def circuitGraph(self) -> CircuitGraph:
         """create a CircuitGraph object with circuit parameters of the composite system
 
+        The object, along with its reduced matrices, is cached and only recreated
+        when one of the cells, the ground node or nodes_force_keep changes
+
         Returns:
             CircuitGraph: CircuitGraph object for LOM analysis
         """
-        if self._cg is None:
+        cg_key = self._circuit_key()
+        if self._cg is None or cg_key != self._cg_key:
+            self._collect_cells()
+            self._cg_key = cg_key
             nodes = self._nodes
             grd_node = self.grd_node
             c_list = self._c_list
@@ -1266,7 +1406,6 @@ class CompositeSystem:
             scq.HilbertSpace: Hilbertspace object for the Hamiltonian
                 of the composite system with interations added
         """
-        cg = self.circuitGraph()
         h = self.create_hilbertspace()
 
         if gs is None:
@@ -1274,6 +1413,20 @@ class CompositeSystem:
         else:
             gs = _process_input_gs(gs)
 
+        self._add_interaction_terms(h, gs, gscale)
+        return h
+
+    def _add_interaction_terms(self,
+                               h: scq.HilbertSpace,
+                               gs: np.ndarray,
+                               gscale: float,
+                               check_validity: bool = True):
+        """ add the interaction terms between the subsystems, already quantumfied
+        by create_hilbertspace(), to a hilbertspace. check_validity=False skips
+        scqubits' check of each term, which recomputes the whole interaction
+        Hamiltonian
+        """
+        cg = self.circuitGraph()
         c_inv_k = cg.C_inv_k
         l_inv_k = cg.L_inv_k
 
@@ -1305,8 +1458,8 @@ class CompositeSystem:
                     h.add_interaction(g=g * gscale,
                                       op1=(q1_op, q1),
                                       op2=(q2_op, q2),
-                                      add_hc=add_hc1 or add_hc2)
-        return h
+                                      add_hc=add_hc1 or add_hc2,
+                                      check_validity=check_validity)
 
     def hamiltonian_results(self,
                             hilbertspace: scq.HilbertSpace,
@@ -1328,13 +1481,11 @@ class CompositeSystem:
 
         names = self.names
 
-        evals, evecs = hilbertspace.eigensys(evals_count=evals_count)
-        esys_array = np.empty(shape=(2,), dtype=object)
-        esys_array[0] = evals
-        esys_array[1] = evecs
+        esys_array, mode_size = _diagonalize(hilbertspace, evals_count)
 
-        f01s, chi_mat = extract_energies(
-            esys_array, mode_size=hilbertspace.hamiltonian().dims[0])
+        f01s, chi_mat = extract_energies(esys_array,
+                                         mode_size=mode_size,
+                                         quiet=not print_info)
         f01s = f01s / 1000
         ham_res['fQ_in_Ghz'] = dict(zip(names, f01s))
         ham_res['chi_in_MHz'] = LabeledNdarray(chi_mat, names)
@@ -1349,3 +1500,223 @@ class CompositeSystem:
             print('--------------------------')
             print(ham_res['chi_in_MHz'])
         return ham_res
+
+    def _cells_with(self, values: Dict) -> List[Cell]:
+        """copies of the cells with some circuit parameters changed
+
+        Args:
+            values (Dict): maps the parameters, as in sweep(), to their new values
+
+        Returns:
+            List[Cell]: the cells, only the modified ones are copied
+        """
+        jj_to_node_map = dict(zip(self._jj.values(), self._jj.keys()))
+        cells = list(self._cells)
+        for param, value in values.items():
+            if not isinstance(param, tuple):
+                raise ValueError(f'Unknown sweep parameter {param}.')
+            if param[0] in ('L', 'Cj'):
+                if param[1] not in jj_to_node_map:
+                    raise ValueError(f'Junction {param[1]} is not in any cell.')
+                nodes = jj_to_node_map[param[1]]
+                attr = 'ind_dict' if param[0] == 'L' else 'cj_dict'
+                ii = next(ii for ii, c in enumerate(cells)
+                          if nodes in (c.jj_dict or {}))
+                cell = copy.copy(cells[ii])
+                new_values = {**(getattr(cell, attr) or {}), nodes: value}
+                setattr(cell, attr, new_values)
+            elif param[0] == 'C':
+                n1, n2 = param[1:]
+                found = [
+                    ii for ii, c in enumerate(cells)
+                    if n1 != n2 and {n1, n2} <= set(c.nodes)
+                ]
+                if len(found) != 1:
+                    raise ValueError(
+                        f'Nodes {n1} and {n2} should be in the capacitance matrix of one and ONLY one cell.'
+                    )
+                ii = found[0]
+                cell = copy.copy(cells[ii])
+                cap_mat = cell.cap_mat.copy()
+                # change the mutual capacitance, keeping the others the same
+                delta = value + cap_mat.loc[n1, n2]
+                cap_mat.loc[n1, n2] = cap_mat.loc[n2, n1] = -value
+                cap_mat.loc[n1, n1] += delta
+                cap_mat.loc[n2, n2] += delta
+                cell.cap_mat = cap_mat
+            else:
+                raise ValueError(f'Unknown sweep parameter {param}.')
+            cells[ii] = cell
+        return cells
+
+    def _with_cells(self, cells: List[Cell]) -> 'CompositeSystem':
+        """a copy of the composite system with other cells and new
+        subsystems which have not been quantumfied yet
+        """
+        subsystems = [
+            Subsystem(sub.name, sub.sys_type, sub.nodes, sub.q_opts)
+            for sub in self._subsystems
+        ]
+        return CompositeSystem(subsystems, cells, self.grd_node,
+                               self.nodes_force_keep)
+
+    def sweep(self,
+              params: Mapping[Union[str, Tuple], Sequence],
+              evals_count: int = 10,
+              workers: int = 0) -> pd.DataFrame:
+        """Compute the frequencies and chis of the composite system over a grid of
+        circuit parameters
+
+        The circuit reduction is done once per combination of capacitances and reused
+        for all the junction inductances and coupling scales. The quantum subsystems
+        are built once per combination of capacitances and inductances and reused for
+        all the coupling scales.
+
+        Args:
+            params (Mapping[Union[str, Tuple], Sequence]): maps each parameter to the
+                values it takes. The grid is the product of all the values. Parameters
+                can be
+                    ('L', junction): inductance of the junction, in nH
+                    ('Cj', junction): capacitance of the junction, in fF
+                    ('C', node1, node2): mutual capacitance between two nodes, in fF.
+                        Both nodes should be in the capacitance matrix of one cell
+                    'gscale': coupling strength scale, see add_interaction()
+            evals_count (int, optional): Number of eigenenergy levels to keep
+                after diagonalizing the Hamiltonian. Defaults to 10.
+            workers (int, optional): Number of processes evaluating the grid points.
+                0 or 1 to use the calling process only. Defaults to 0.
+
+        Returns:
+            pd.DataFrame: one row per grid point, with a column per parameter,
+            e.g., 'L_j1', the frequencies in GHz 'f_<subsystem>' and the chis in MHz
+            'chi_<subsystem1>_<subsystem2>'
+
+        Example use:
+
+            .. code-block::
+
+                results = composite_sys.sweep({
+                    ('L', 'j1'): np.linspace(9, 11, 21),
+                    ('C', 'coupling', 'pad_top_Q1'): [5, 6, 7],
+                })
+        """
+        params = {
+            param if isinstance(param, str) else tuple(param): list(values)
+            for param, values in params.items()
+        }
+        ind_params = [
+            param for param in params
+            if isinstance(param, tuple) and param[0] == 'L'
+        ]
+        cap_params = [
+            param for param in params
+            if param not in ind_params and param != 'gscale'
+        ]
+
+        # group the grid points by capacitances, then by inductances
+        grid = list(itertools.product(*params.values()))
+        groups = {}
+        for row, point in enumerate(grid):
+            values = dict(zip(params, point))
+            cap_values = tuple(values[param] for param in cap_params)
+            ind_values = tuple(values[param] for param in ind_params)
+            groups.setdefault(cap_values, {}).setdefault(ind_values, []).append(
+                (row, values.get('gscale', 1.)))
+
+        tasks, rows = [], []
+        for cap_values, ind_groups in groups.items():
+            system = self._with_cells(
+                self._cells_with(dict(zip(cap_params, cap_values))))
+            cg = system.circuitGraph()
+            _ = cg.C_inv_k  # reduce once for the whole group, in this process
+            for ind_values, points in ind_groups.items():
+                ind_system = system._with_cells(
+                    system._cells_with(dict(zip(ind_params, ind_values))))
+                ind_system._cg = cg.with_inductances(
+                    [c.ind_dict for c in ind_system._cells])
+                ind_system._cg_key = ind_system._circuit_key()
+                _ = ind_system._cg.L_inv_k, ind_system._cg.C_inv_k
+                tasks.append(
+                    (ind_system, [gscale for _, gscale in points], evals_count))
+                rows.extend(row for row, _ in points)
+
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_sweep_task, *zip(*tasks)))
+        else:
+            results = [_sweep_task(*task) for task in tasks]
+
+        results = pd.DataFrame([r for result in results for r in result],
+                               index=rows).sort_index()
+        columns = [
+            param if isinstance(param, str) else '_'.join(param)
+            for param in params
+        ]
+        return pd.concat([pd.DataFrame(grid, columns=columns), results], axis=1)
+
+
+def _bare_esys(hilbertspace: scq.HilbertSpace) -> Dict[int, Tuple]:
+    """ eigensystems of the subsystems of a hilbertspace, which scqubits
+    otherwise recomputes for every interaction term
+    """
+    return {
+        ii: sub.eigensys(evals_count=sub.truncated_dim)
+        for ii, sub in enumerate(hilbertspace)
+    }
+
+
+def _diagonalize(
+        hilbertspace: scq.HilbertSpace,
+        evals_count: int,
+        bare_esys: Dict[int, Tuple] = None) -> Tuple[np.ndarray, List[int]]:
+    """ lowest eigenvalues and eigenvectors of the Hamiltonian of a hilbertspace
+
+    Args:
+        hilbertspace (scq.HilbertSpace): Hilbertspace object for the Hamiltonian
+        evals_count (int): Number of eigenenergy levels to keep
+        bare_esys (Dict[int, Tuple], optional): eigensystems of the subsystems,
+            computed if not provided. Defaults to None.
+
+    Returns:
+        Tuple[np.ndarray, List[int]]: array of the eigenvalues and the eigenvectors,
+        as expected by extract_energies(), and the dimensions of the subsystems
+    """
+    if bare_esys is None:
+        bare_esys = _bare_esys(hilbertspace)
+    hamiltonian = hilbertspace.hamiltonian(bare_esys=bare_esys)
+    mode_size = hamiltonian.dims[0]
+    evals_count = min(evals_count, hamiltonian.shape[0])
+    # only compute the eigenvalues needed, unlike HilbertSpace.eigensys()
+    evals, evecs = scipy.linalg.eigh(hamiltonian.full(),
+                                     subset_by_index=[0, evals_count - 1])
+    esys_array = np.empty(shape=(2,), dtype=object)
+    esys_array[0] = evals
+    esys_array[1] = [
+        qutip.Qobj(evec[:, np.newaxis], dims=[mode_size, [1] * len(mode_size)])
+        for evec in evecs.T
+    ]
+    return esys_array, mode_size
+
+
+def _sweep_task(system: CompositeSystem, gscales: List[float],
+                evals_count: int) -> List[Dict]:
+    """ frequencies and chis of a composite system for several coupling scales,
+    see CompositeSystem.sweep()
+    """
+    bare_esys = _bare_esys(system.create_hilbertspace())
+    gs = system.compute_gs(coupling_type=CouplingType.CAPACITIVE)
+    names = system.names
+
+    results = []
+    for gscale in gscales:
+        h = scq.HilbertSpace(system.quantum_subsystems)
+        system._add_interaction_terms(h, gs, gscale, check_validity=False)
+        esys_array, mode_size = _diagonalize(h, evals_count, bare_esys)
+        f01s, chi_mat = extract_energies(esys_array,
+                                         mode_size=mode_size,
+                                         quiet=True)
+        result = {f'f_{name}': f01 / 1000 for name, f01 in zip(names, f01s)}
+        for ii, jj in zip(*np.triu_indices(len(names))):
+            result[f'chi_{names[ii]}_{names[jj]}'] = chi_mat[ii, jj]
+        results.append(result)
+    return results
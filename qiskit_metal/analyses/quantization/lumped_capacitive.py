@@ -22,6 +22,7 @@ Each function prints out the parameters and outputs a dictionary.
 
 import io
 import re
+from collections import OrderedDict
 from pathlib import Path
 from typing import List, Union
 
@@ -29,14 +30,16 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import scipy.optimize as opt
-from pint import UnitRegistry
+from scipy.linalg import eigvalsh_tridiagonal
 
 from pyEPR.calcs.convert import Convert
+from qiskit_metal.toolbox_metal.parsing import UREG
 from .constants import (e, h, hbar, phinot, phi0)
 
 __all__ = [
     'Ic_from_Lj', 'Ic_from_Ej', 'Cs_from_Ec', 'transmon_props', 'chi',
-    'extract_transmon_coupled_Noscillator', 'levels_vs_ng_real_units',
+    'extract_transmon_coupled_Noscillator',
+    'extract_transmon_coupled_Noscillator_batch', 'levels_vs_ng_real_units',
     'get_C_and_Ic', 'cos_to_mega_and_delta', 'chargeline_T1',
     'readin_q3d_matrix', 'readin_q3d_matrix_m', 'load_q3d_capacitance_matrix',
     'df_cmat_style_print', 'move_index_to', 'df_reorder_matrix_basis',
@@ -191,12 +194,107 @@ def extract_transmon_coupled_Noscillator(capMatrix,
         ValueError: If the capacitance matrix is the wrong size
     """
 
+    results = _extract_transmon_coupled_Noscillator_batch([capMatrix], Ic, CJ,
+                                                          N, fb, fr,
+                                                          res_L4_corr, g_scale)
+    ham_dict, info = results[0]
+
+    if print_info:
+        _print_transmon_coupled_Noscillator(ham_dict, info)
+
+    return ham_dict
+
+
+def extract_transmon_coupled_Noscillator_batch(
+        capMatrices,
+        Ic: float,
+        CJ: float,
+        N: int,
+        fb: List[float],
+        fr: float,
+        res_L4_corr: float = None,
+        g_scale: float = 1.0) -> List[dict]:
+    """Lumped-element mode (LOM) analysis of many capacitance matrices at
+    once, such as all the passes of a simulation or all the points of a
+    sweep. Same as `extract_transmon_coupled_Noscillator`, computed for all
+    the matrices together.
+
+    Results are memoized by the contents of each matrix and the other
+    arguments, so matrices already analyzed (e.g. the earlier passes of a
+    simulation that ran longer) are not analyzed again.
+
+    Args:
+        capMatrices (np.ndarray): Capacitance matrices stacked along the first
+          axis, or a list of them, each as in `extract_transmon_coupled_Noscillator`.
+        Ic (float): Junction Ic (in A)
+        Cj (float): Junction capacitance (in F)
+        N (int): Coupling pads (1 readout, N-1 bus)
+        fb (float): Coupling bus frequencies (in GHz).
+        fr (float): Readout frequency (in GHz).
+        res_L4_corr (list): Correction factor is the resonators are L/4.
+          Defaults to None.
+        g_scale (float): Scale factor
+
+    Returns:
+        list: The `ham_dict` of each matrix, in order
+
+    Raises:
+        ValueError: If N is not positive
+        ValueError: If the capacitance matrices are the wrong size
+    """
+    return [
+        ham_dict for ham_dict, _ in _extract_transmon_coupled_Noscillator_batch(
+            capMatrices, Ic, CJ, N, fb, fr, res_L4_corr, g_scale)
+    ]
+
+
+# Results of the LOM analysis, by matrix contents and arguments (see _lom_key)
+_LOM_CACHE = OrderedDict()
+_LOM_CACHE_SIZE = 4096
+
+
+def _lom_key(capMatrix: np.ndarray, args: tuple) -> tuple:
+    return (capMatrix.shape, capMatrix.tobytes()) + args
+
+
+def _extract_transmon_coupled_Noscillator_batch(capMatrices, Ic, CJ, N, fb, fr,
+                                                res_L4_corr, g_scale):
+    """Returns a list of (ham_dict, info), where info holds the intermediate
+    values printed by `_print_transmon_coupled_Noscillator`. The returned
+    dictionaries are copies, so callers can modify them."""
     # Error checks
     if N < 0:
         raise ValueError('N must positive')
-    if len(capMatrix) != (N + 3):
+    capMatrices = np.asarray(capMatrices, dtype=float)
+    if capMatrices.ndim != 3 or capMatrices.shape[1:] != (N + 3, N + 3):
         raise ValueError('Capacitance matrix is not the right size')
 
+    args = (Ic, CJ, N, repr(fb), fr, repr(res_L4_corr), g_scale)
+    keys = [_lom_key(cmat, args) for cmat in capMatrices]
+    missing = [ii for ii, key in enumerate(keys) if key not in _LOM_CACHE]
+    if missing:
+        results = _lom_vectorized(capMatrices[missing], Ic, CJ, N, fb, fr,
+                                  res_L4_corr, g_scale)
+        for ii, result in zip(missing, results):
+            _LOM_CACHE[keys[ii]] = result
+        while len(_LOM_CACHE) > _LOM_CACHE_SIZE:
+            _LOM_CACHE.popitem(last=False)
+
+    out = []
+    for key in keys:
+        _LOM_CACHE.move_to_end(key)
+        ham_dict, info = _LOM_CACHE[key]
+        ham_dict = {
+            k: np.copy(v) if isinstance(v, np.ndarray) else v
+            for k, v in ham_dict.items()
+        }
+        out.append((ham_dict, info))
+    return out
+
+
+def _lom_vectorized(capMatrix, Ic, CJ, N, fb, fr, res_L4_corr, g_scale):
+    """The LOM analysis of a stack of P capacitance matrices, shape (P, N+3, N+3).
+    Arrays below carry the matrix index first."""
     # make list of angular frequencies of resonators
     wr = np.zeros(N)  # angular freq of resonators (GHz-rad)
     for ii in range(N):
@@ -234,60 +332,49 @@ def extract_transmon_coupled_Noscillator(capMatrix,
     bus_index = np.zeros(N, dtype=int)
     for ii in range(N):
         if ii == 0:
-            bus_index[ii] = len(capMatrix) - 1
+            bus_index[ii] = capMatrix.shape[1] - 1
         else:
             bus_index[ii] = ii - 1
 
     # Cg list of qubit pads to ground
-    Cg = [
-        -capMatrix[qubit_index[0], ground_index],
-        -capMatrix[qubit_index[1], ground_index]
-    ]
+    Cg = -capMatrix[:, qubit_index, ground_index]
 
     # Cs qubit pads to each other
-    Cs = -capMatrix[qubit_index[0], qubit_index[1]]
+    Cs = -capMatrix[:, qubit_index[0], qubit_index[1]]
 
     # Cbus (qubit pads to coupling pads)
     # index is ordered as [readout,bus1,...]
-    Cbus = np.zeros([2, N])
-    for ii in range(2):
-        for jj in range(N):
-            Cbus[ii, jj] = -capMatrix[qubit_index[ii], bus_index[jj]]
+    Cbus = -capMatrix[:, qubit_index][:, :, bus_index]
 
     # crosspad capacitance
-    Cbusbus = np.zeros([N, N])
-    for ii in range(N):
-        for jj in range(N):
-            if ii != jj:
-                Cbusbus[ii, jj] = -capMatrix[bus_index[ii], bus_index[jj]]
+    Cbusbus = -capMatrix[:, bus_index][:, :, bus_index]
+    Cbusbus[:, np.arange(N), np.arange(N)] = 0
 
     # sum of capacitances from each pad to ground
     # this assumes the bus couplers are at "ground"
-    C1S = Cg[0] + np.sum(Cbus[0,])
-    C2S = Cg[1] + np.sum(Cbus[1,])
+    C1S = Cg[:, 0] + np.sum(Cbus[:, 0], axis=-1)
+    C2S = Cg[:, 1] + np.sum(Cbus[:, 1], axis=-1)
+    CSS = (C1S + C2S)[:, None]
 
     # total capacitance between pads
     tCSq = Cs + C1S * C2S / (C1S + C2S)  # Key equation
 
     # total capacitance of each pad to ground?
     # Note the + in the squared term below !!!
-    tCSbus = np.zeros(N)
-    for ii in range(N):
-        tCSbus[ii] = Cr[ii] - (Cbus[0, ii]+Cbus[1, ii])**2 / \
-            (C1S+C2S) + np.sum(Cbus[:, ii]) + np.sum(Cbusbus[ii, :])
+    tCSbus = Cr - (Cbus[:, 0] + Cbus[:, 1])**2 / CSS + np.sum(
+        Cbus, axis=1) + np.sum(Cbusbus, axis=2)
 
     # qubit to coupling pad capacitance
-    tCqbus = (C2S * Cbus[0,] - Cbus[1,] * C1S) / (C1S + C2S)
+    tCqbus = (C2S[:, None] * Cbus[:, 0] - Cbus[:, 1] * C1S[:, None]) / CSS
 
     # coupling pad to coupling pad capacitance
-    tCqbusbus = np.zeros([N, N])
-    for ii in range(N):
-        for jj in range(N):
-            tCqbusbus[ii, jj] = Cbusbus[ii, jj] + \
-                (Cbus[0, ii]+Cbus[1, ii])*(Cbus[0, jj]+Cbus[1, jj])/(C1S+C2S)
+    Cbus_sum = Cbus[:, 0] + Cbus[:, 1]
+    tCqbusbus = Cbusbus + \
+        Cbus_sum[:, :, None] * Cbus_sum[:, None, :] / CSS[:, :, None]
 
     # voltage division ratio
-    bbus = (C2S * Cbus[0,] - Cbus[1,] * C1S) / ((C1S + C2S) * Cs + C1S * C2S)
+    bbus = C2S[:, None] * Cbus[:, 0] - Cbus[:, 1] * C1S[:, None]
+    bbus /= CSS * Cs[:, None] + (C1S * C2S)[:, None]
 
     # total qubit capacitance (including junction capacitance)
     Cq = tCSq + CJ
@@ -299,38 +386,18 @@ def extract_transmon_coupled_Noscillator(capMatrix,
     LJ, EJ, Zqp, EC, wq, wq0, eps1 = transmon_props(Ic, Cq)
 
     # get numerical properties
-    fq, alpha, disp, tphi_ms = levels_vs_ng_real_units(Cq / 1e-15,
-                                                       Ic / 1e-9,
-                                                       N=51)
+    fq, alpha, disp = _transmon_levels_vs_ng(Cq, Ic, N=51)
     wq = 2 * np.pi * fq * 1e9
 
     # effective impedances of the coupling pads (?)
     Zbus = np.sqrt(Lr / tCSbus)
 
-    # matrix of the qubit and couplings with a single ground node
-    #    Cm = np.zeros([N+1,N+1])
-
-    #    Cm = np.array([[Cq, -tCqr1, -tCqr2],
-    #        [-tCqr1, tCSr1, -tCr1r2],
-    #        [-tCqr2, -tCr1r2, tCSr2]])
-    #
-    #    Cminv = np.linalg.inv(Cm)
-    #
-    #    #readout g
-    #    gr0 = 0.5*Cminv[0,1]/np.sqrt(Zqp*Zr1p)
-    #    print('gr0 = %f [MHz]'%(gr0/2/np.pi/1e6))
-
     # g's from the qubit
-    gqbus = 0.5 * wr * bbus * np.sqrt(Zbus / Zqp) * g_scale
-    #gbus = bbus*wr*np.sqrt(Zbus)*e*(EJ/8/EC)**(1/4)/np.sqrt(hbar)
+    gqbus = 0.5 * wr * bbus * np.sqrt(Zbus / Zqp[:, None]) * g_scale
     gbus_in_MHz = gqbus / 1e6 / 2 / np.pi
 
     # g's between pads
-    gbusbus = np.zeros([N, N])
-    for ii in range(N):
-        for jj in range(N):
-            gbusbus[ii,
-                    jj] = (0.01) * tCqbusbus[ii, jj] / (tCSbus[ii] * tCSbus[jj])
+    gbusbus = (0.01) * tCqbusbus / (tCSbus[:, :, None] * tCSbus[:, None, :])
 
     ########################################################
     ##### Purcell, Qs, dissipative
@@ -338,24 +405,21 @@ def extract_transmon_coupled_Noscillator(capMatrix,
     # guesses for the Q's
     Qreadout = 1e4
     Qcouplingbus = 1e5
-    Qbus = np.zeros(N)
-    for ii in range(N):
-        if ii == 0:
-            Qbus[ii] = Qreadout
-        else:
-            Qbus[ii] = Qcouplingbus
+    Qbus = np.full(N, Qcouplingbus)
+    Qbus[:1] = Qreadout
 
     # loss tangent
     kbus = wr / Qbus
 
     # purcell due to each coupling bus
-    T1bus = (wr**2 - wq**2)**2 / (4 * kbus * gqbus**2 * wq**2)
+    wq_ = wq[:, None]
+    T1bus = (wr**2 - wq_**2)**2 / (4 * kbus * gqbus**2 * wq_**2)
 
     # total T1
     if N > 0:
-        T1 = 1 / (np.sum(1 / T1bus))
+        T1 = 1 / (np.sum(1 / T1bus, axis=-1))
     else:
-        T1 = 100
+        T1 = np.full(len(capMatrix), 100.)
 
     ########################################################
     ##### Transmon properties and final summary
@@ -363,50 +427,109 @@ def extract_transmon_coupled_Noscillator(capMatrix,
     # chi's
     #d = -EC
     d = alpha * 2 * np.pi * 1e6
-    Chi_in_MHz = 2 * chi(gqbus, wr, wq,
-                         d + wq) / 2 / np.pi / 1e6  # Total chi in MHz
-
-    ham_dict = {}
-    ham_dict['fQ'] = wq / 2 / np.pi / 1E9
-    ham_dict['EC'] = EC / 2 / np.pi / 1E6
-    ham_dict['EJ'] = EJ / 2 / np.pi / 1E9
-    # correction to the anharmonicity (from eq 52 of solgun et al.)
-    #ham_dict['alpha'] = ((wq0/wq)**2*ham_dict['EC'])
-    ham_dict['alpha'] = alpha
-    ham_dict['dispersion'] = disp / 1e3
-    ham_dict['gbus'] = gbus_in_MHz
-    ham_dict['chi_in_MHz'] = Chi_in_MHz
+    Chi_in_MHz = 2 * chi(gqbus, wr, wq_,
+                         d[:, None] + wq_) / 2 / np.pi / 1e6  # Total chi in MHz
+
+    results = []
+    for kk in range(len(capMatrix)):
+        ham_dict = {}
+        ham_dict['fQ'] = wq[kk] / 2 / np.pi / 1E9
+        ham_dict['EC'] = EC[kk] / 2 / np.pi / 1E6
+        ham_dict['EJ'] = EJ / 2 / np.pi / 1E9
+        # correction to the anharmonicity (from eq 52 of solgun et al.)
+        #ham_dict['alpha'] = ((wq0/wq)**2*ham_dict['EC'])
+        ham_dict['alpha'] = alpha[kk]
+        ham_dict['dispersion'] = disp[kk] / 1e3
+        ham_dict['gbus'] = gbus_in_MHz[kk]
+        ham_dict['chi_in_MHz'] = Chi_in_MHz[kk]
+
+        info = dict(qubit_index=qubit_index,
+                    bus_index=bus_index,
+                    EJ=EJ,
+                    Cq=Cq[kk],
+                    T1=T1[kk],
+                    T1bus=T1bus[kk],
+                    tCqbus=tCqbus[kk],
+                    gbusbus=gbusbus[kk])
+        results.append((ham_dict, info))
+    return results
+
+
+def _print_transmon_coupled_Noscillator(ham_dict: dict, info: dict):
+    """Print the transmon and coupling properties of a LOM analysis."""
+    N = len(ham_dict['gbus'])
+    Chi_in_MHz = ham_dict['chi_in_MHz']
+    T1bus = info['T1bus']
+
+    print(info['qubit_index'], info['bus_index'])
+    print('Predicted Values')
+    print('')
+    print('Transmon Properties')
+    print('f_Q %f [GHz]' % ham_dict['fQ'])
+    print('EC %f [MHz]' % ham_dict['EC'])
+    print('EJ %f [GHz]' % ham_dict['EJ'])
+    print('alpha %f [MHz]' % ham_dict['alpha'])
+    print('dispersion %f [KHz]' % ham_dict['dispersion'])
+    print('Lq %f [nH]' % (phi0**2 / (hbar * info['EJ']) / 1e-9))
+    print('Cq %f [fF]' % (info['Cq'] / 1e-15))
+    print('T1 %f [us]' % (info['T1'] / (1e-6)))
+    print('')
+
+    print('**Coupling Properties**')
+    for ii in range(N):
+        print('\ntCqbus%d %f [fF]' % (ii + 1, info['tCqbus'][ii] / (1e-15)))
+        print('gbus%d_in_MHz %f [MHz]' % (ii + 1, ham_dict['gbus'][ii]))
+        print('χ_bus%d %f [MHz]' % (ii + 1, Chi_in_MHz[ii]))
+        print('1/T1bus%d %f [Hz]' % (ii + 1, 1 / T1bus[ii] / (2 * np.pi)))
+        print('T1bus%d %f [us]' % (ii + 1, T1bus[ii] / (1e-6)))
 
-    if print_info:
-        print(qubit_index, bus_index)
-        print('Predicted Values')
-        print('')
-        print('Transmon Properties')
-        print('f_Q %f [GHz]' % ham_dict['fQ'])
-        print('EC %f [MHz]' % ham_dict['EC'])
-        print('EJ %f [GHz]' % ham_dict['EJ'])
-        print('alpha %f [MHz]' % ham_dict['alpha'])
-        print('dispersion %f [KHz]' % ham_dict['dispersion'])
-        print('Lq %f [nH]' % (phi0**2 / (hbar * EJ) / 1e-9))
-        print('Cq %f [fF]' % (Cq / 1e-15))
-        print('T1 %f [us]' % (T1 / (1e-6)))
-        print('')
-
-        print('**Coupling Properties**')
-        for ii in range(N):
-            print('\ntCqbus%d %f [fF]' % (ii + 1, tCqbus[ii] / (1e-15)))
-            print('gbus%d_in_MHz %f [MHz]' % (ii + 1, ham_dict['gbus'][ii]))
-            print('χ_bus%d %f [MHz]' % (ii + 1, Chi_in_MHz[ii]))
-            print('1/T1bus%d %f [Hz]' % (ii + 1, 1 / T1bus[ii] / (2 * np.pi)))
-            print('T1bus%d %f [us]' % (ii + 1, T1bus[ii] / (1e-6)))
-
-        print('Bus-Bus Couplings')
-        for ii in range(N):
-            for jj in range(ii + 1, N):
-                print('gbus%d_%d %f [MHz]' % (ii + 1, jj + 1, gbusbus[ii, jj] /
-                                              (2 * np.pi * 1e6)))
+    print('Bus-Bus Couplings')
+    for ii in range(N):
+        for jj in range(ii + 1, N):
+            print('gbus%d_%d %f [MHz]' %
+                  (ii + 1, jj + 1, info['gbusbus'][ii, jj] / (2 * np.pi * 1e6)))
 
-    return ham_dict
+
+def _transmon_levels_vs_ng(Cq: np.ndarray, IC: float, N: int = 51):
+    """The transmon levels of `levels_vs_ng_real_units`, for an array of
+    capacitances. Only the three lowest levels of the tridiagonal charge-basis
+    Hamiltonian are computed, and only for ng >= 0, since the levels are
+    symmetric in ng.
+
+    Args:
+        Cq (np.ndarray): Qubit capacitances (in F)
+        IC (float): Junction Ic (in A)
+        N (int): Number of charge values to use
+
+    Returns:
+        tuple: fqubitGHz, anharMHz, disp (in Hz), one value per capacitance
+    """
+    Ec = e**2 / 2 / np.asarray(Cq)
+    nmax = 40
+    charge = np.linspace(-1., 1., N)
+    EJ = IC * hbar / 2 / e
+    offdiag = np.full(2 * nmax, -0.5 * EJ)
+    n_charge = np.arange(-nmax, nmax + 1)
+
+    # H(-ng) is H(ng) with the charge basis reversed
+    abs_charge, index = np.unique(np.round(np.abs(charge), 12),
+                                  return_inverse=True)
+    elvls = np.empty((len(Ec), len(abs_charge), 3))
+    for ii, Ec_ii in enumerate(Ec):
+        for jj, ng in enumerate(abs_charge):
+            elvls[ii, jj] = eigvalsh_tridiagonal(4 * Ec_ii * (n_charge - ng)**2,
+                                                 offdiag,
+                                                 select='i',
+                                                 select_range=(0, 2))
+    elvls = elvls[:, index]
+    elvls = elvls - elvls[:, :, :1]
+
+    fqubitGHz = np.mean(elvls[:, :, 1] / h / 1e9, axis=1)
+    anharMHz = np.mean(
+        1000 * (elvls[:, :, 2] / h / 1e9 - 2 * elvls[:, :, 1] / h / 1e9),
+        axis=1)
+    disp = np.max(-elvls[:, :, 1] / h + elvls[:, :1, 1] / h, axis=1)
+    return fqubitGHz, anharMHz, disp
 
 
 def levels_vs_ng_real_units(Cq, IC, N=301, do_disp=0, do_plots=0):
@@ -714,8 +837,7 @@ def load_q3d_capacitance_matrix(path, user_units='fF', _disp=True):
     df_cmat, Cunits, design_variation, df_cond = readin_q3d_matrix(path)
 
     # Unit convert
-    ureg = UnitRegistry()
-    q = ureg.parse_expression(Cunits).to(user_units)
+    q = UREG.parse_expression(Cunits).to(user_units)
     df_cmat = df_cmat * q.magnitude  # scale to user units
 
     # Report
@@ -749,14 +871,13 @@ def lumped_oscillator_from_path(path: str, Lj_nH: float, Cj_fF: float, N: int,
     Returns:
         dict: A single dataframe corresponding to a single capacitance matrix
     """
-    ureg = UnitRegistry()
     IC_Amps = Convert.Ic_from_Lj(Lj_nH, 'nH', 'A')
-    CJ = ureg(f'{Cj_fF} fF').to('farad').magnitude
-    fr = ureg(f'{fr} GHz').to('GHz').magnitude
-    fb = [ureg(f'{freq} GHz').to('GHz').magnitude for freq in fb]
+    CJ = UREG(f'{Cj_fF} fF').to('farad').magnitude
+    fr = UREG(f'{fr} GHz').to('GHz').magnitude
+    fb = [UREG(f'{freq} GHz').to('GHz').magnitude for freq in fb]
 
     df_cmat, user_units, _, _, = load_q3d_capacitance_matrix(path)
-    c_units = ureg(user_units).to('farads').magnitude
+    c_units = UREG(user_units).to('farads').magnitude
 
     RES = extract_transmon_coupled_Noscillator(df_cmat.values * c_units,
                                                IC_Amps,
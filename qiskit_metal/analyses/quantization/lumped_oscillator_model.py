@@ -13,7 +13,6 @@
 # that they have been altered from the originals.
 
 import pandas as pd
-from pint import UnitRegistry
 
 from pyEPR.calcs.convert import Convert
 
@@ -21,9 +20,11 @@ from qiskit_metal.designs import QDesign  # pylint: disable=unused-import
 from qiskit_metal.analyses.core import QAnalysis
 from qiskit_metal.analyses.simulation import LumpedElementsSim
 from qiskit_metal import Dict, config
+from qiskit_metal.toolbox_metal.parsing import UREG
 
 if not config.is_building_docs():
-    from .lumped_capacitive import extract_transmon_coupled_Noscillator
+    from .lumped_capacitive import (extract_transmon_coupled_Noscillator,
+                                    extract_transmon_coupled_Noscillator_batch)
 
 
 # TODO: eliminate every reference to "renderer" in this file
@@ -152,11 +153,10 @@ class LOManalysis(QAnalysis):
                 self.sim.capacitance_all_passes[
                     1] = self.sim.capacitance_matrix.values
 
-        ureg = UnitRegistry()
         ic_amps = Convert.Ic_from_Lj(s.junctions.Lj, 'nH', 'A')
-        cj = ureg(f'{s.junctions.Cj} fF').to('farad').magnitude
-        fread = ureg(f'{s.freq_readout} GHz').to('GHz').magnitude
-        fbus = [ureg(f'{freq} GHz').to('GHz').magnitude for freq in s.freq_bus]
+        cj = UREG(f'{s.junctions.Cj} fF').to('farad').magnitude
+        fread = UREG(f'{s.freq_readout} GHz').to('GHz').magnitude
+        fbus = [UREG(f'{freq} GHz').to('GHz').magnitude for freq in s.freq_bus]
 
         # derive number of coupling pads
         num_cpads = 2
@@ -165,20 +165,27 @@ class LOManalysis(QAnalysis):
         if isinstance(fbus, list):
             num_cpads += len(fbus) - 1
 
-        # get the LOM for every pass
-        all_res = {}
-        for idx_cmat, df_cmat in self.sim.capacitance_all_passes.items():
-            res = extract_transmon_coupled_Noscillator(
-                df_cmat,
-                ic_amps,
-                cj,
-                num_cpads,
-                fbus,
-                fread,
-                g_scale=1,
-                print_info=bool(
-                    idx_cmat == len(self.sim.capacitance_all_passes)))
-            all_res[idx_cmat] = res
+        # get the LOM for every pass, all at once
+        all_passes = self.sim.capacitance_all_passes
+        cap_passes = list(all_passes.values())
+        res_passes = extract_transmon_coupled_Noscillator_batch(cap_passes,
+                                                                ic_amps,
+                                                                cj,
+                                                                num_cpads,
+                                                                fbus,
+                                                                fread,
+                                                                g_scale=1)
+        all_res = dict(zip(all_passes, res_passes))
+        # print the summary of the last pass (already computed, so cached)
+        if len(all_passes) in all_passes:
+            extract_transmon_coupled_Noscillator(all_passes[len(all_passes)],
+                                                 ic_amps,
+                                                 cj,
+                                                 num_cpads,
+                                                 fbus,
+                                                 fread,
+                                                 g_scale=1,
+                                                 print_info=True)
         self.lumped_oscillator = all_res[len(self.sim.capacitance_all_passes)]
         all_res = pd.DataFrame(all_res).transpose()
         all_res['χr MHz'] = abs(all_res['chi_in_MHz'].apply(lambda x: x[0]))
@@ -95,6 +95,8 @@ class EigenmodeSim(QSimulation):
         Finally it runs the setup defined in this class. So you need to modify the setup ahead.
         You can modify the setup by using the methods defined in the QAnalysis super-class.
         After this method concludes you can inspect the output using this class properties.
+        If a result_cache is set and holds a run with the same inputs, its results are
+        returned instead.
 
         Args:
             name (str): reference name for the components selection. If None,
@@ -123,6 +125,17 @@ class EigenmodeSim(QSimulation):
         # wipe data from the previous run (if any)
         self.clear_data()
 
+        key = self._result_key('eigenmode',
+                               components,
+                               open_pins=open_terminations,
+                               port_list=port_list,
+                               jj_to_port=jj_to_port,
+                               ignored_jjs=ignored_jjs,
+                               box_plus_buffer=box_plus_buffer)
+        renderer_design_name = self._load_result(key)
+        if renderer_design_name is not None:
+            return renderer_design_name, self.sim_setup_name
+
         if not self.renderer_initialized:
             self._initialize_renderer()
 
@@ -139,6 +152,7 @@ class EigenmodeSim(QSimulation):
             vars_to_initialize=vars_to_initialize)
 
         self._analyze()
+        self._save_result(key, renderer_design_name)
         return renderer_design_name, self.sim_setup_name
 
     @property
@@ -69,7 +69,7 @@ class ScatteringImpedanceSim(QSimulation):
     """Default setup."""
 
     # supported labels for data generated from the simulation
-    data_labels = ['sweep_name', 'params_z', 'params_y', 'params_s']
+    data_labels = ['sweep_name', 'param_z', 'param_y', 'param_s']
     """Default data labels."""
 
     def __init__(self, design: 'QDesign' = None, renderer_name: str = 'hfss'):
@@ -83,16 +83,22 @@ class ScatteringImpedanceSim(QSimulation):
         # set design and renderer
         super().__init__(design, renderer_name)
 
-    def _analyze(self):
+    def _analyze(self, matrix_size: int = 0):
         """Executes the analysis step of the Run. First it initializes the renderer setup
         to prepare for drivenmodal analysis, then it executes it. Finally it recovers the
-        output of the analysis and stores it in self.params_z/params_y/params_s.
+        output of the analysis and stores it in self.param_z/param_y/param_s.
+
+        Args:
+            matrix_size (int): Number of ports, including the junctions replaced by ports.
+                Defaults to 0, for no impedance, admittance and scattering matrices.
         """
         self.sim_setup_name, self.sweep_name = self.renderer.initialize_drivenmodal(
             **self.setup)
 
         self.renderer.analyze_sweep(self.sweep_name, self.sim_setup_name)
-        # TODO: return the impedance, admittance and scattering matrices for later use
+        if matrix_size > 0:
+            self.param_s, self.param_y, self.param_z = \
+                self.renderer.get_all_Pparms_matrices(matrix_size)
 
     def get_impedance(self, param_name: list = ['Z11', 'Z21']):
         """Create the impedance plot.
@@ -138,6 +144,8 @@ class ScatteringImpedanceSim(QSimulation):
         Finally it runs the setup and sweep defined in this class. You need to modify the setup
         ahead. You can modify the setup by using the methods defined in the QAnalysis super-class.
         After this method concludes you can inspect the output using this class properties.
+        If a result_cache is set and holds a run with the same inputs, its results are
+        returned instead.
 
         Args:
             name (str): reference name for the components selection. If None,
@@ -168,6 +176,17 @@ class ScatteringImpedanceSim(QSimulation):
         # wipe data from the previous run (if any)
         self.clear_data()
 
+        key = self._result_key('drivenmodal',
+                               components,
+                               open_pins=open_terminations,
+                               port_list=port_list,
+                               jj_to_port=jj_to_port,
+                               ignored_jjs=ignored_jjs,
+                               box_plus_buffer=box_plus_buffer)
+        renderer_design_name = self._load_result(key)
+        if renderer_design_name is not None:
+            return renderer_design_name, self.sim_setup_name
+
         if not self.renderer_initialized:
             self._initialize_renderer()
 
@@ -183,7 +202,8 @@ class ScatteringImpedanceSim(QSimulation):
             box_plus_buffer=box_plus_buffer,
             vars_to_initialize=vars_to_initialize)
 
-        self._analyze()
+        self._analyze(len(port_list or []) + len(jj_to_port or []))
+        self._save_result(key, renderer_design_name)
         return renderer_design_name, self.sim_setup_name
 
     @property
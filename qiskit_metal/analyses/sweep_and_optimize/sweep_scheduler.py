@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2017, 2021.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+"""Sweep several qcomponent options at once, over a pool of worker processes,
+with the results checkpointed to disk."""
+
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from copy import deepcopy
+import itertools
+import os
+import pickle
+import tempfile
+import time
+from typing import Any, List, Mapping, Sequence, Union
+
+import pandas as pd
+
+from qiskit_metal import Dict, logger
+
+# State of a worker process of SweepScheduler: its copy of the design and
+# its backend, see _init_sweep_worker.
+_WORKER = {}
+
+
+class SweepBackend(ABC):
+    """Simulates the design at one point of a sweep.
+
+    SweepScheduler uses one backend per worker process, pickled from the
+    backend it is given, so the backend can keep a renderer or a solver open
+    from one point to the next.
+    """
+
+    @abstractmethod
+    def simulate(self, design: 'QDesign') -> Any:
+        """Simulate the design, already rebuilt with the options of the point.
+
+        Args:
+            design (QDesign): The design to simulate.
+
+        Returns:
+            Any: The results of the point. Must be picklable.
+        """
+
+
+class QAnalysisBackend(SweepBackend):
+    """Runs a QAnalysis, e.g. LOManalysis or EigenmodeSim, at each point.
+
+    In the calling process, the given analysis is used as is. A worker
+    process creates its own analysis of the same class, with the same
+    renderer name and setup, on its copy of the design.
+    """
+
+    def __init__(self, analysis: 'QAnalysis', **run_kwargs):
+        """
+        Args:
+            analysis (QAnalysis): The analysis to run at each point.
+            run_kwargs: Arguments of analysis.run().
+        """
+        self._analysis = analysis
+        self.run_kwargs = run_kwargs
+
+        sim = getattr(analysis, 'sim', analysis)
+        self._analysis_class = type(analysis)
+        self._renderer_name = getattr(sim, 'renderer_name', None)
+        self._setup = deepcopy(analysis.setup)
+        self._sim_setup = deepcopy(sim.setup) if sim is not analysis else None
+
+    def __getstate__(self):
+        # A worker creates its own analysis, see simulate.
+        state = self.__dict__.copy()
+        state['_analysis'] = None
+        return state
+
+    def _analysis_design(self) -> 'QDesign':
+        sim = getattr(self._analysis, 'sim', self._analysis)
+        return getattr(sim, 'design', None)
+
+    def simulate(self, design: 'QDesign') -> Dict:
+        """Run the analysis on the design.
+
+        Args:
+            design (QDesign): The design to simulate.
+
+        Returns:
+            Dict: The data of the analysis in 'variables' and, for analyses
+            using a simulation, the data of the simulation in 'sim_variables'.
+        """
+        # pylint: disable=protected-access
+        if self._analysis is None or self._analysis_design() is not design:
+            self._analysis = self._analysis_class(design, self._renderer_name)
+            self._analysis._setup = deepcopy(self._setup)
+            if self._sim_setup is not None:
+                self._analysis.sim._setup = deepcopy(self._sim_setup)
+
+        self._analysis.run(**self.run_kwargs)
+
+        result = Dict(variables=deepcopy(self._analysis._variables))
+        if hasattr(self._analysis, 'sim'):
+            result.sim_variables = deepcopy(self._analysis.sim._variables)
+        return result
+
+
+class MockSolverBackend(SweepBackend):
+    """Local stand-in for a solver, to try out a sweep without Ansys.
+
+    The results are computed from the qgeometry of the design: for each
+    component, the area of its metal and its bounds.
+    """
+
+    def __init__(self, components: Sequence[str] = None, delay: float = 0.):
+        """
+        Args:
+            components (Sequence[str]): Names of the components to "simulate".
+                Defaults to None, for all the components of the design.
+            delay (float): Seconds to wait at each point, to mimic the solver.
+                Defaults to 0.
+        """
+        self.components = components
+        self.delay = delay
+
+    def simulate(self, design: 'QDesign') -> Dict:
+        """Compute the metal area and the bounds of the components.
+
+        Args:
+            design (QDesign): The design to simulate.
+
+        Returns:
+            Dict: For each component name, its 'area' and 'bounds'.
+        """
+        if self.delay:
+            time.sleep(self.delay)
+
+        result = Dict()
+        names = self.components or list(design.components.keys())
+        for name in names:
+            area = 0.
+            tables = design.qgeometry.get_component(name)
+            for table_name, table in tables.items():
+                table = table[~table['subtract']]
+                if table_name == 'path':
+                    area += (table.geometry.length * table['width']).sum()
+                else:
+                    area += table.geometry.area.sum()
+            result[name] = Dict(
+                area=area,
+                bounds=tuple(design.qgeometry.get_component_bounds(name)))
+        return result
+
+
+class SweepScheduler():
+    """Sweep several qcomponent options at once.
+
+    Each point of the sweep sets some options of some components. The design
+    is rebuilt, which remakes only the components whose options changed, and
+    simulated by a SweepBackend.
+
+    With workers > 1, the points are simulated by a pool of processes. Each
+    process loads its own copy of the design and its own backend once, then
+    simulates points as they come. The design is left unchanged.
+
+    With workers = 0 or 1, the points are simulated one after the other, on
+    the design itself. The swept options are restored at the end.
+
+    If a checkpoint file is given, the result of each point is appended to it
+    as soon as the point is done. Running the sweep again with the same file
+    only simulates the points without a result in it, e.g. after a crash.
+
+    Example use:
+
+        .. code-block::
+
+            points = SweepScheduler.product({
+                'Q1.pad_gap': ['30um', '40um'],
+                'Q1.connection_pads.a.pad_width': ['80um', '100um', '120um'],
+            })
+            scheduler = SweepScheduler(design,
+                                       QAnalysisBackend(c1, **run_kwargs),
+                                       checkpoint='sweep.ckpt',
+                                       workers=4)
+            results = scheduler.run(points)
+    """
+
+    def __init__(self,
+                 design: 'QDesign',
+                 backend: SweepBackend,
+                 checkpoint: str = None,
+                 workers: int = 0):
+        """
+        Args:
+            design (QDesign): The design to sweep.
+            backend (SweepBackend): Simulates the design at each point.
+            checkpoint (str): File where the results are saved as they come.
+                Defaults to None, for no checkpoint.
+            workers (int): Number of processes simulating the points. 0 or 1
+                to simulate in the calling process only. Defaults to 0.
+        """
+        self.design = design
+        self.backend = backend
+        self.checkpoint = checkpoint
+        self.workers = workers
+
+    @staticmethod
+    def product(options: Mapping[str, Sequence]) -> List[dict]:
+        """Points of the Cartesian product of the values of options.
+
+        Args:
+            options (Mapping[str, Sequence]): For each option, as
+                'component_name.option_name', e.g.
+                'Q1.connection_pads.a.pad_width', the values it takes.
+
+        Returns:
+            List[dict]: The points, each mapping the options to one value.
+        """
+        return [
+            dict(zip(options, values))
+            for values in itertools.product(*options.values())
+        ]
+
+    def run(self, points: Union[Sequence[dict],
+                                Mapping[str, Sequence]]) -> pd.DataFrame:
+        """Simulate all the points which do not have a result in the
+        checkpoint yet.
+
+        Args:
+            points (Union[Sequence[dict], Mapping[str, Sequence]]): The points,
+                each mapping options, as 'component_name.option_name', to a
+                value. Or, for a Cartesian product, the values of each option.
+
+        Returns:
+            pd.DataFrame: One row per point, with a column per option, the
+            'result' of the backend and the 'error', if the point failed.
+            Failed points are not checkpointed, so they are retried by the
+            next run.
+        """
+        if isinstance(points, Mapping):
+            points = self.product(points)
+        points = [dict(point) for point in points]
+        for point in points:
+            for option in point:
+                self._option_parent(self.design, option)
+
+        done = self._read_checkpoint()
+        results = [done.get(_point_key(point)) for point in points]
+        todo = [ii for ii, result in enumerate(results) if result is None]
+        if len(todo) < len(points):
+            logger.info(
+                f'{len(points) - len(todo)} of the {len(points)} points are '
+                f'already in the checkpoint {self.checkpoint}.')
+
+        errors = [None] * len(points)
+        for ii, result, error in self._simulate(points, todo):
+            results[ii], errors[ii] = result, error
+            if error is None:
+                self._write_checkpoint(points[ii], result)
+            else:
+                logger.warning(
+                    f'The sweep point {points[ii]} did not run as expected: '
+                    f'{error}')
+
+        table = pd.DataFrame(points)
+        # element by element, as numpy would look into Dict results
+        table['result'] = None
+        for ii, result in enumerate(results):
+            table.at[ii, 'result'] = result
+        table['error'] = errors
+        return table
+
+    def _simulate(self, points: List[dict], todo: List[int]):
+        """Generate (index, result, error) for each point in todo, as they
+        complete."""
+        if self.workers > 1 and len(todo) > 1:
+            from qiskit_metal.toolbox_metal.import_export import save_metal
+            with tempfile.TemporaryDirectory() as folder:
+                design_file = os.path.join(folder, 'design.metal')
+                if not save_metal(design_file, self.design):
+                    raise RuntimeError(
+                        'Could not save the design for the sweep workers.')
+                with ProcessPoolExecutor(max_workers=self.workers,
+                                         initializer=_init_sweep_worker,
+                                         initargs=(design_file,
+                                                   self.backend)) as executor:
+                    futures = {
+                        executor.submit(_run_sweep_point, points[ii]): ii
+                        for ii in todo
+                    }
+                    for future in as_completed(futures):
+                        yield (futures[future],) + future.result()
+            return
+
+        original = {}
+        try:
+            for ii in todo:
+                yield (ii,) + _simulate_point(self.design, self.backend,
+                                              points[ii], original)
+        finally:
+            _restore_options(self.design, original)
+            self.design.rebuild()
+
+    @staticmethod
+    def _option_parent(design: 'QDesign', option: str) -> tuple:
+        """The Dict holding an option and the last key of the option.
+
+        Args:
+            design (QDesign): The design.
+            option (str): The option, as 'component_name.option_name'.
+
+        Returns:
+            tuple: The Dict and the key.
+
+        Raises:
+            ValueError: The component or the option do not exist.
+        """
+        component_name, _, option_name = option.partition('.')
+        if component_name not in design.components.keys():
+            raise ValueError(
+                f'Component {component_name} of the sweep option {option} '
+                'is not in the design.')
+        path = option_name.split('.')
+        value = design.components[component_name].options
+        for name in path:
+            if not isinstance(value, Mapping) or name not in value:
+                raise ValueError(
+                    f'Key="{name}" of the sweep option {option} is not in '
+                    'the options of the component.')
+            parent, value = value, value[name]
+        return parent, path[-1]
+
+    def _read_checkpoint(self) -> dict:
+        """Results in the checkpoint, by point.
+
+        A record cut short by a crash, at the end of the file, is ignored.
+        """
+        done = {}
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return done
+        with open(self.checkpoint, 'rb') as file:
+            while True:
+                try:
+                    record = pickle.load(file)
+                except EOFError:
+                    break
+                except (pickle.UnpicklingError, ValueError, AttributeError):
+                    logger.warning(
+                        f'Ignoring the end of the checkpoint {self.checkpoint}'
+                        ', which is corrupted.')
+                    break
+                done[_point_key(record['point'])] = record['result']
+        return done
+
+    def _write_checkpoint(self, point: dict, result: Any):
+        """Append the result of a point to the checkpoint."""
+        if not self.checkpoint:
+            return
+        with open(self.checkpoint, 'ab') as file:
+            pickle.dump(dict(point=point, result=result), file)
+            file.flush()
+            os.fsync(file.fileno())
+
+
+def _point_key(point: dict) -> str:
+    """Identify a point, whatever the order of its options."""
+    return repr(sorted(point.items()))
+
+
+def _restore_options(design: 'QDesign', original: dict):
+    """Set the options changed by _simulate_point back to their values."""
+    for option, value in original.items():
+        parent, key = SweepScheduler._option_parent(design, option)
+        parent[key] = value
+    original.clear()
+
+
+def _simulate_point(design: 'QDesign', backend: SweepBackend, point: dict,
+                    original: dict) -> tuple:
+    """Set the options of the point, rebuild the design and simulate it.
+
+    Args:
+        design (QDesign): The design.
+        backend (SweepBackend): Simulates the design.
+        point (dict): The options of the point and their values.
+        original (dict): Values of the options before the sweep, updated with
+            the options set for the first time.
+
+    Returns:
+        tuple: The result and the error message, None if there was no error.
+    """
+    # Options of the previous point that this one does not set go back to
+    # their values before the sweep.
+    _restore_options(design, {
+        option: value
+        for option, value in original.items()
+        if option not in point
+    })
+    for option, value in point.items():
+        parent, key = SweepScheduler._option_parent(design, option)
+        original.setdefault(option, parent[key])
+        parent[key] = value
+
+    try:
+        design.rebuild()
+        return backend.simulate(design), None
+    except Exception as ex:  # pylint: disable=broad-except
+        return None, f'{type(ex).__name__}: {ex}'
+
+
+def _init_sweep_worker(design_file: str, backend: SweepBackend):
+    """Load the copy of the design of a worker process."""
+    from qiskit_metal.toolbox_metal.import_export import load_metal_design
+    _WORKER['design'] = load_metal_design(design_file)
+    _WORKER['backend'] = backend
+    _WORKER['original'] = {}
+
+
+def _run_sweep_point(point: dict) -> tuple:
+    """Simulate a point in a worker process."""
+    return _simulate_point(_WORKER['design'], _WORKER['backend'], point,
+                           _WORKER['original'])
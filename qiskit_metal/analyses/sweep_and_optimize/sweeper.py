@@ -1,5 +1,11 @@
+import heapq
 from qiskit_metal import Dict
-from typing import Tuple, Union
+from typing import Callable, Mapping, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .sweep_scheduler import QAnalysisBackend, SweepScheduler
 
 
 class Sweeper():
@@ -125,6 +131,172 @@ class Sweeper():
 
         return all_sweep, check_result
 
+    def run_sweep_points(self,
+                         points: Union[Sequence[dict], Mapping[str, Sequence]],
+                         workers: int = 0,
+                         checkpoint: str = None,
+                         **run_kwargs) -> pd.DataFrame:
+        """Sweep several options at once, possibly over several processes,
+        with a SweepScheduler.
+
+        Args:
+            points (Union[Sequence[dict], Mapping[str, Sequence]]): The points,
+                each mapping options, as 'component_name.option_name', to a
+                value. Or, for a Cartesian product, the values of each option.
+            workers (int): Number of processes, each with its own copy of the
+                design and renderer. 0 or 1 to run the points one after the
+                other with the parent analysis. Defaults to 0.
+            checkpoint (str): File where the results are saved as they come,
+                so that running the sweep again resumes it. Defaults to None.
+            run_kwargs: Arguments of run() of the parent analysis. Defaults
+                to those of the previous run.
+
+        Returns:
+            pd.DataFrame: One row per point, with a column per option, the
+            'result' with the 'variables' (and 'sim_variables') of the
+            analysis, and the 'error', if the point failed.
+        """
+        if not run_kwargs:
+            if hasattr(self.parent, 'sim') and self.parent.sim.setup.run:
+                run_kwargs = self.parent.sim.setup.run
+            elif self.parent.setup.run:
+                run_kwargs = self.parent.setup.run
+
+        backend = QAnalysisBackend(self.parent, **run_kwargs)
+        scheduler = SweepScheduler(self.design,
+                                   backend,
+                                   checkpoint=checkpoint,
+                                   workers=workers)
+        return scheduler.run(points)
+
+    def run_adaptive_sweep(self,
+                           qcomp_name: str,
+                           option_name: str,
+                           start: float,
+                           stop: float,
+                           target: Callable,
+                           tolerance: float,
+                           units: str = 'um',
+                           initial_points: int = 5,
+                           max_points: int = 20,
+                           **run_kwargs) -> Tuple[Dict, int]:
+        """Sweep an option over a range, placing the points where a target
+        quantity changes fastest.
+
+        A coarse pass runs initial_points evenly spaced values. Then, while
+        the budget of max_points allows, the interval whose ends differ the
+        most in target is split in two, as long as that difference is larger
+        than tolerance. Intervals where target is flat are never refined.
+
+        Args:
+            qcomp_name (str): A component that contains the option to be swept.
+            option_name (str): The option within qcomp_name to sweep.
+            start (float): First value of the range, in units.
+            stop (float): Last value of the range, in units.
+            target (Callable): Called with the parent analysis after each run,
+                returns the quantity to resolve, e.g.
+                ``lambda a: a.capacitance_matrix.iloc[0, 1]``.
+            tolerance (float): Largest change of target allowed between
+                adjacent points, in the units of target.
+            units (str): Units appended to the values of the option.
+                Defaults to 'um'.
+            initial_points (int): Number of points of the coarse pass, at
+                least 2. Defaults to 5.
+            max_points (int): Total number of runs allowed. Defaults to 20.
+            run_kwargs: Arguments of run() of the parent analysis. Defaults
+                to those of the previous run.
+
+        Returns:
+            Tuple[Dict, int]: The dict key is each value of the option, ordered
+            by value, the value is the solution-data for each run, with its
+            'value' and 'target' added. The int is the observation of
+            searching for data from arguments, as in run_sweep().
+        """
+        all_sweep = Dict()
+        option_path, a_value, check_result = self.error_check_sweep_input(
+            qcomp_name, option_name, [start, stop])
+        if check_result != 0:
+            return all_sweep, check_result
+        if option_path[-1] not in a_value.keys():
+            self.design.logger.warning(
+                f'Key="{option_path[-1]}" is not in dict.')
+            return all_sweep, 5
+
+        if not run_kwargs:
+            if hasattr(self.parent, 'sim') and self.parent.sim.setup.run:
+                run_kwargs = self.parent.sim.setup.run
+            elif self.parent.setup.run:
+                run_kwargs = self.parent.setup.run
+        run_kwargs = {
+            'name': 'Sweep_default',
+            'box_plus_buffer': True,
+            **run_kwargs
+        }
+
+        results = {}
+
+        def run_point(value: float) -> float:
+            item = f'{value}{units}'
+            a_value[option_path[-1]] = item
+            self._run_parent(run_kwargs)
+            try:
+                result = float(target(self.parent))
+            except Exception as ex:  # pylint: disable=broad-except
+                self.design.logger.warning(
+                    f'For {option_name}={item}, the target could not be '
+                    f'evaluated: {type(ex).__name__}: {ex}')
+                result = np.nan
+            self.populate_all_sweep(all_sweep, item, option_name)
+            all_sweep[item].value = value
+            all_sweep[item].target = result
+            results[value] = result
+            return result
+
+        def push(heap: list, left: float, right: float):
+            change = abs(results[right] - results[left])
+            if change > tolerance:
+                heapq.heappush(heap, (-change, left, right))
+
+        values = np.linspace(start, stop, max(initial_points, 2))
+        for value in values:
+            run_point(float(value))
+
+        heap = []
+        for left, right in zip(values[:-1], values[1:]):
+            push(heap, float(left), float(right))
+        while heap and len(results) < max_points:
+            _, left, right = heapq.heappop(heap)
+            middle = (left + right) / 2
+            if middle in results:
+                continue
+            run_point(middle)
+            push(heap, left, middle)
+            push(heap, middle, right)
+
+        ordered = Dict()
+        for value in sorted(results, reverse=start > stop):
+            item = f'{value}{units}'
+            ordered[item] = all_sweep[item]
+        return ordered, 0
+
+    def _run_parent(self, all_dicts: Dict):
+        """Rebuild the design and run the parent analysis, logging instead of
+        raising if the run fails.
+
+        Args:
+            all_dicts (Dict): Arguments of run() of the parent analysis.
+        """
+        self.design.rebuild()
+
+        try:
+            self.parent.run(**all_dicts)
+        except Exception as ex:
+            template = "An exception of type {0} occurred. Arguments:\n{1!r}"
+            message = template.format(type(ex).__name__, ex.args)
+            self.design.logger.warning(
+                f'For class {self.parent.__class__.__name__}, run() did not execute as expected: {message}'
+            )
+
     def iterate_option_sweep(self, args: list, all_dicts: Dict,
                              option_path: list, a_value: Dict,
                              all_sweep: Dict) -> Tuple[Dict, int]:
@@ -156,16 +328,7 @@ class Sweeper():
                     f'Key="{option_path[-1]}" is not in dict.')
                 return all_sweep, 5
 
-            self.design.rebuild()
-
-            try:
-                self.parent.run(**all_dicts)
-            except Exception as ex:
-                template = "An exception of type {0} occurred. Arguments:\n{1!r}"
-                message = template.format(type(ex).__name__, ex.args)
-                self.design.logger.warning(
-                    f'For class {self.parent.__class__.__name__}, run() did not execute as expected: {message}'
-                )
+            self._run_parent(all_dicts)
 
             self.populate_all_sweep(all_sweep, item, args[1])
 
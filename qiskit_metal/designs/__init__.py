@@ -57,6 +57,14 @@ QNet
 
     QNet
 
+DesignEvents
+---------------
+
+.. autosummary::
+    :toctree: ../stubs/
+
+    DesignEvents
+
 
 InterfaceComponents
 -------------------
@@ -73,4 +81,5 @@ from .design_base import QDesign
 from .design_planar import DesignPlanar
 from .design_flipchip import DesignFlipChip
 from .net_info import QNet
+from .design_events import DesignEvents
 from .interface_components import Components
@@ -13,9 +13,13 @@
 # that they have been altered from the originals.
 """The base class of all QDesigns in Qiskit Metal."""
 
+import heapq
 import importlib
+import re
+import threading
 #import inspect
 #import os
+from collections.abc import Mapping
 from datetime import datetime
 from typing import Any, Dict as Dict_, Iterable, List, TYPE_CHECKING, Union
 
@@ -25,9 +29,11 @@ from qiskit_metal.qgeometries.qgeometries_handler import QGeometryTables
 from qiskit_metal.toolbox_metal.parsing import is_true, parse_options, parse_value
 from qiskit_metal.designs.interface_components import Components
 from qiskit_metal.designs.net_info import QNet
+from qiskit_metal.designs.design_events import DesignEvents
 from qiskit_metal import Dict, config, logger
 from qiskit_metal.config import DefaultMetalOptions, DefaultOptionsRenderer
 from qiskit_metal.toolbox_metal.exceptions import QiskitMetalDesignError
+from qiskit_metal.toolbox_python.utility_functions import dict_equal
 
 if not config.is_building_docs():
     from qiskit_metal.toolbox_metal.import_export import load_metal_design, save_metal
@@ -43,6 +49,10 @@ __all__ = ['QDesign']
 
 #:ivar var1: initial value: par2
 
+# Names in an option string that could refer to a design variable.
+# A superset of what parse_value resolves, such as 'cpw_width' or '2*cpw_width'.
+VARIABLE_NAME_PATTERN = re.compile(r'[A-Za-z_]\w*')
+
 
 class QDesign():
     """QDesign is the base class for Qiskit Metal Designs.
@@ -112,6 +122,18 @@ class QDesign():
         # Cache for component ids.  Hold the reverse of _components dict,
         self.name_to_id = Dict()
 
+        # Dependency graph of the components, used to rebuild only what changed.
+        # key=id of child component and value=set of ids of its parent components.
+        # Added by the user through add_dependency.
+        self._dependencies = dict()
+        # Added automatically from pin connections and pin_inputs of components.
+        # Reset every time the child component is rebuilt.
+        self._pin_dependencies = dict()
+
+        # Incremented every time a component is built. A component with a
+        # build id older than one of its parents needs to be rebuilt.
+        self._qcomponent_latest_build_id = 0
+
         self._variables = Dict()
         self._chips = Dict()
 
@@ -124,6 +146,9 @@ class QDesign():
         self.logger = logger  # type: logging.Logger
         self.build_logs = LogStore("Build Logs", 30)
 
+        # Publishes the changes of the components, qgeometry and nets.
+        self._events = DesignEvents()
+
         self._qgeometry = QGeometryTables(self)
 
         # Used for QComponents, and QRenderers
@@ -140,7 +165,7 @@ class QDesign():
         self._template_renderer_options = DefaultOptionsRenderer(
         )  # use for renderer
 
-        self._qnet = QNet()
+        self._qnet = QNet(self._events)
 
         # Dict used to populate the columns of QGeometry table i.e. path,
         # junction, poly etc.
@@ -223,6 +248,14 @@ class QDesign():
         the design."""
         return self._metadata
 
+    @property
+    def events(self) -> DesignEvents:
+        """Return the publisher of the changes of the design, see
+        `DesignEvents`."""
+        if getattr(self, '_events', None) is None:  # saved by older versions
+            self._events = DesignEvents()
+        return self._events
+
     @property
     def qgeometry(self) -> 'QGeometryTables':
         """Returns the QGeometryTables (Use for advanced users only)"""
@@ -306,6 +339,7 @@ class QDesign():
 
         keys[keys.index(old_key)] = new_key
         self._variables = Dict(zip(keys, values))
+        self.events.emit('variables_changed', names=[old_key, new_key])
 
     def delete_all_pins(self) -> 'QNet':
         """Clear all pins in the net_Info and update the pins in components.
@@ -319,7 +353,10 @@ class QDesign():
             self._components[comp_id].pins[pin_name].net_id = 0
 
         # remove rows, but save column names
+        net_ids = set(df_net_info['net_id'])
         self._qnet._net_info = self._qnet._net_info.iloc[0:0]
+        for net_id in net_ids:
+            self.events.emit('net_removed', net_id=net_id)
         return self._qnet
 
     def connect_pins(self, comp1_id: int, pin1_name: str, comp2_id: int,
@@ -348,6 +385,9 @@ class QDesign():
             # update the components to hold net_id
             self._components[comp1_id].pins[pin1_name].net_id = net_id
             self._components[comp2_id].pins[pin2_name].net_id = net_id
+
+            # comp2 connects to the pin of comp1, such as a route to a qubit
+            self._pin_dependencies.setdefault(comp2_id, set()).add(comp1_id)
         else:
             logger.warning(
                 f'NetId was not added for {comp1_id}, {pin1_name},'
@@ -430,10 +470,15 @@ class QDesign():
 
         # Need to remove pin connections before clearing the components.
         self.delete_all_pins()
+        component_ids = list(self._components)
         self.name_to_id.clear()
         self._components.clear()
+        self._dependencies.clear()
+        self._pin_dependencies.clear()
 
         self._qgeometry.clear_all_tables()
+        for component_id in component_ids:
+            self.events.emit('component_removed', component_id=component_id)
 
     def _get_new_qcomponent_id(self):
         """Give new id that QComponent can use.
@@ -458,10 +503,44 @@ class QDesign():
 
         return self._qcomponent_latest_name_id[prefix]
 
-    def rebuild(self):  # remake_all_components
-        """Remakes all components with their current parameters."""
-        for _, obj in self._components.items():  # pylint: disable=unused-variable
-            obj.rebuild()
+    def _get_new_qcomponent_build_id(self):
+        """Give new build id that a QComponent records when it is built.
+
+        Returns:
+            int: Build id of the qcomponent
+        """
+        self._qcomponent_latest_build_id += 1
+        return self._qcomponent_latest_build_id
+
+    def rebuild(self,
+                full: bool = False,
+                cancel: threading.Event = None):  # remake_all_components
+        """Remakes the components with their current parameters.
+
+        Only the components whose options or used variables changed since they
+        were last built, or which depend on a component that was rebuilt
+        since, are remade. Components are remade in dependency order;
+        see `add_dependency`.
+
+        Args:
+            full (bool): True to remake all the components, changed or not.
+                         Defaults to False.
+            cancel (threading.Event): When the rebuild runs in another thread,
+                set to stop it before the next component. Defaults to None.
+        """
+        # pylint: disable=protected-access
+        for component_id in self._get_rebuild_order(list(self._components)):
+            if cancel is not None and cancel.is_set():
+                break
+            component = self._components.get(component_id)
+            if component is None:  # deleted by another thread
+                continue
+            if full or component._needs_rebuild():
+                component.rebuild()
+                if cancel is not None and cancel.is_set():
+                    # The options may have been edited during make; the
+                    # next rebuild remakes the component.
+                    component._built_options = None
 
     def rename_component(self, component_id: int, new_component_name: str):
         """Rename component.  The component_id is expected.  However, if user
@@ -520,6 +599,7 @@ class QDesign():
             # do rename
             # pylint: disable=protected-access
             self._components[component_id]._name = new_component_name
+            self.events.emit('component_renamed', component_id=a_component_id)
 
             return True
         logger.warning(
@@ -612,12 +692,19 @@ class QDesign():
             # storing as an integer.
             self._qgeometry.delete_component_id(component_id)
 
+            # remove from the dependency graph, as child and as parent
+            for dependencies in (self._dependencies, self._pin_dependencies):
+                dependencies.pop(component_id, None)
+                for parents in dependencies.values():
+                    parents.discard(component_id)
+
             # Before poping component from design registry, remove name from cache
             component_name = self._components[component_id].name
             self.name_to_id.pop(component_name, None)
 
             # remove from design dict of components
             self._components.pop(component_id, None)
+            self.events.emit('component_removed', component_id=component_id)
         else:
             # if not in components dict
             logger.warning(
@@ -717,18 +804,22 @@ class QDesign():
 #########I/O###############################################################
 
     @classmethod
-    def load_design(cls, path: str):
+    def load_design(cls, path: str, rebuild: Union[bool, str] = False):
         """Load a Metal design from a saved Metal file. Will also update
         default dictionaries. (Class method).
 
         Args:
             path (str): Path to saved Metal design.
+            rebuild (Union[bool, str]): False to read the qgeometry from the
+                file, 'lazy' to read it but have the next rebuild() remake the
+                components, True to remake the components while loading.
+                Defaults to False.
 
         Returns:
             QDesign: Loaded metal design.
         """
         logger.warning("Loading is a beta feature.")
-        design = load_metal_design(path)
+        design = load_metal_design(path, rebuild=rebuild)
         return design
 
     def save_design(self, path: str = None):
@@ -857,21 +948,190 @@ class QDesign():
 ####################################################################################
 # Dependencies
 
-    def add_dependency(self, parent: str, child: str):
-        """Add a dependency between one component and another.
+    def _get_component_id(self, component: Union[str, int]) -> Union[int, None]:
+        """Get the id of a component given either its name or its id.
 
         Args:
-            parent (str): The component on which the child depends.
-            child (str): The child cannot live without the parent.
+            component (Union[str, int]): Name or id of the component.
+
+        Returns:
+            Union[int, None]: Id of the component, or None if not in the design.
         """
+        if isinstance(component, str):
+            return self.name_to_id.get(component)
+        if component in self._components:
+            return component
+        return None
+
+    def add_dependency(self, parent: Union[str, int], child: Union[str, int]):
+        """Add a dependency between one component and another.
 
-    def remove_dependency(self, parent: str, child: str):
+        When the parent is rebuilt, `rebuild` and `update_component` also
+        rebuild the child, after the parent. Dependencies on the components
+        whose pins are connected to, such as the pin_inputs of a QRoute,
+        are added automatically.
+
+        Args:
+            parent (Union[str, int]): The component on which the child depends.
+            child (Union[str, int]): The child cannot live without the parent.
+        """
+        parent_id = self._get_component_id(parent)
+        child_id = self._get_component_id(child)
+        if parent_id is None or child_id is None:
+            self.logger.warning(
+                f'Called add_dependency with parent={parent} and child={child}, '
+                'but both need to be components of the design.')
+            return
+        self._dependencies.setdefault(child_id, set()).add(parent_id)
+
+    def remove_dependency(self, parent: Union[str, int], child: Union[str,
+                                                                      int]):
         """Remove a dependency between one component and another.
 
         Args:
-            parent (str): The component on which the child depends.
-            child (str): The child cannot live without the parent.
+            parent (Union[str, int]): The component on which the child depends.
+            child (Union[str, int]): The child cannot live without the parent.
         """
+        parent_id = self._get_component_id(parent)
+        child_id = self._get_component_id(child)
+        self._dependencies.get(child_id, set()).discard(parent_id)
+
+    def _reset_pin_dependencies(self, component: 'QComponent'):
+        """Reset the dependencies of a component on the components whose pins
+        it uses to those given by its pin_inputs option. Called when the
+        component is rebuilt; its make adds the others through connect_pins.
+
+        Args:
+            component (QComponent): The child component.
+        """
+        parents = set()
+        pin_inputs = component.options.get('pin_inputs', {})
+        if isinstance(pin_inputs, Mapping):
+            for pin_input in pin_inputs.values():
+                if isinstance(pin_input, Mapping):
+                    parent_id = self._get_component_id(
+                        pin_input.get('component'))
+                    if parent_id is not None:
+                        parents.add(parent_id)
+        self._pin_dependencies[component.id] = parents
+
+    def get_dependencies(self, component: Union[str, int]) -> set:
+        """Get the ids of the components on which a component depends.
+
+        Args:
+            component (Union[str, int]): Name or id of the child component.
+
+        Returns:
+            set: Ids of the parent components.
+        """
+        component_id = self._get_component_id(component)
+        parents = self._dependencies.get(component_id, set()) | \
+            self._pin_dependencies.get(component_id, set())
+        parents.discard(component_id)
+        return {
+            parent_id for parent_id in parents if parent_id in self._components
+        }
+
+    def get_dependents(self, component: Union[str, int]) -> set:
+        """Get the ids of all the components that depend, directly or not, on
+        a component.
+
+        Args:
+            component (Union[str, int]): Name or id of the parent component.
+
+        Returns:
+            set: Ids of the child components, and of their children, etc.
+        """
+        children = dict()
+        for dependencies in (self._dependencies, self._pin_dependencies):
+            for child_id, parents in dependencies.items():
+                for parent_id in parents:
+                    children.setdefault(parent_id, set()).add(child_id)
+
+        component_id = self._get_component_id(component)
+        dependents = set()
+        to_visit = [component_id]
+        while to_visit:
+            for child_id in children.get(to_visit.pop(), ()):
+                if child_id not in dependents and child_id in self._components:
+                    dependents.add(child_id)
+                    to_visit.append(child_id)
+        dependents.discard(component_id)
+        return dependents
+
+    def _get_rebuild_order(self, component_ids: Iterable[int]) -> List[int]:
+        """Sort components so that each comes after the components it depends
+        on. Otherwise, keeps the order in which they were added to the design.
+
+        Args:
+            component_ids (Iterable[int]): Ids of the components to sort.
+
+        Returns:
+            List[int]: Sorted ids. Components in a dependency cycle are placed
+            last, in the order they were added to the design.
+        """
+        component_ids = set(component_ids)
+        position = {
+            cid: index
+            for index, cid in enumerate(self._components)
+            if cid in component_ids
+        }
+
+        # Kahn's algorithm, picking the earliest added component first
+        children = {cid: [] for cid in position}
+        num_parents = dict.fromkeys(position, 0)
+        for cid in position:
+            for parent_id in self.get_dependencies(cid):
+                if parent_id in position:
+                    children[parent_id].append(cid)
+                    num_parents[cid] += 1
+
+        ready = [
+            (position[cid], cid) for cid in position if not num_parents[cid]
+        ]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, cid = heapq.heappop(ready)
+            order.append(cid)
+            for child_id in children[cid]:
+                num_parents[child_id] -= 1
+                if not num_parents[child_id]:
+                    heapq.heappush(ready, (position[child_id], child_id))
+
+        if len(order) < len(position):
+            cycle = [cid for cid in position if num_parents[cid]]
+            self.logger.warning(
+                f'The components with ids {cycle} have cyclic dependencies. '
+                'They are rebuilt in the order they were added.')
+            order += cycle
+        return order
+
+    def _get_variables_used(self, value: Any) -> Dict_[str, Any]:
+        """Get the design variables that a value, such as the options of a
+        component, could refer to. Includes the variables referred to by the
+        values of those variables.
+
+        Args:
+            value (Any): String, mappable or iterable to search.
+
+        Returns:
+            Dict_[str, Any]: Names and current values of the variables.
+        """
+        used = dict()
+        to_search = [value]
+        while to_search:
+            item = to_search.pop()
+            if isinstance(item, str):
+                for name in VARIABLE_NAME_PATTERN.findall(item):
+                    if name in self._variables and name not in used:
+                        used[name] = self._variables[name]
+                        to_search.append(used[name])
+            elif isinstance(item, Mapping):
+                to_search.extend(item.values())
+            elif isinstance(item, (list, tuple)):
+                to_search.extend(item)
+        return used
 
     def update_component(self, component_name: str, dependencies: bool = True):
         """Update the component and any dependencies it may have. Mediator type
@@ -881,8 +1141,21 @@ class QDesign():
             component_name (str): Component name to update
             dependencies (bool): True to update all dependencies.  Defaults to True.
         """
+        component_id = self._get_component_id(component_name)
+        if component_id is None:
+            self.logger.warning(
+                f'Called update_component {component_name}, but such a '
+                'component is not in the design.')
+            return
+
         # Get dependency graph
+        to_update = {component_id}
+        if dependencies:
+            to_update |= self.get_dependents(component_id)
+
         # Remake components in order
+        for an_id in self._get_rebuild_order(to_update):
+            self._components[an_id].rebuild()
 
 
 ######### Renderers ###############################################################
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2017, 2021.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+"""Changes of a design published to whoever follows them, such as the GUI,
+instead of having them poll the design."""
+
+from typing import Callable, Dict, List
+
+__all__ = ['DesignEvents']
+
+
+class DesignEvents():
+    """Publish and subscribe hub of a QDesign, shared by its QGeometryTables
+    and QNet. Access with `design.events`.
+
+    Callbacks are called synchronously, in the thread making the change, with
+    the keyword arguments of the event. They should be quick; the GUI only
+    records what changed and updates its views later.
+
+    Events:
+        * component_added: component_id
+        * component_removed: component_id
+        * component_renamed: component_id
+        * component_rebuilt: component_id
+        * variables_changed: names
+        * rows_inserted: table_name, component_id
+        * rows_removed: table_name, component_id
+        * tables_cleared
+        * net_added: net_id
+        * net_removed: net_id
+
+    .. code-block:: python
+
+        def on_rebuilt(component_id):
+            print(design._components[component_id].name, 'was rebuilt')
+
+        design.events.subscribe('component_rebuilt', on_rebuilt)
+    """
+
+    def __init__(self):
+        self._subscribers = dict()  # type: Dict[str, List[Callable]]
+
+    def subscribe(self, event: str, callback: Callable):
+        """Call callback every time event is emitted.
+
+        Args:
+            event (str): Name of the event.
+            callback (Callable): Called with the keyword arguments of the
+                event.
+        """
+        callbacks = self._subscribers.setdefault(event, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    def unsubscribe(self, event: str, callback: Callable):
+        """Stop calling callback for event. Does nothing if it was not
+        subscribed.
+
+        Args:
+            event (str): Name of the event.
+            callback (Callable): The subscribed callback.
+        """
+        callbacks = self._subscribers.get(event, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def emit(self, event: str, **kwargs):
+        """Call the subscribers of event.
+
+        Args:
+            event (str): Name of the event.
+            **kwargs: Arguments of the event.
+        """
+        for callback in list(self._subscribers.get(event, ())):
+            callback(**kwargs)
+
+    def __getstate__(self):
+        # Subscribers belong to the session, e.g. the GUI; do not save them
+        # with the design.
+        return dict()
+
+    def __setstate__(self, state):
+        self._subscribers = dict()
@@ -24,13 +24,25 @@ class QNet():
     There is one unique net_id for each connected pin.
     """
 
-    def __init__(self):
-        """Hold the net information of all the USED pins within a design."""
+    def __init__(self, events: 'DesignEvents' = None):
+        """Hold the net information of all the USED pins within a design.
+
+        Args:
+            events (DesignEvents): Publisher of the design, for the nets
+                added and removed. Defaults to None.
+        """
         self.column_names = ['net_id', 'component_id', 'pin_name']
         self._net_info = pd.DataFrame(columns=self.column_names)
         self._qnet_latest_assigned_id = 0
+        self._events = events
         self.logger = logger  # type: logging.Logger
 
+    def _emit(self, event: str, **kwargs):
+        """Publish a change of the nets, if there is a publisher."""
+        events = getattr(self, '_events', None)  # saved by older versions
+        if events is not None:
+            events.emit(event, **kwargs)
+
     def _get_new_net_id(self) -> int:
         """Provide unique new qnet_id.
 
@@ -133,6 +145,7 @@ class QNet():
         temp_df = pd.DataFrame([entry1, entry2], columns=self.column_names)
 
         self._net_info = self._net_info.append(temp_df, ignore_index=True)
+        self._emit('net_added', net_id=net_id)
 
         return net_id
 
@@ -147,6 +160,7 @@ class QNet():
         self._net_info.drop(
             self._net_info.index[self._net_info['net_id'] == net_id_to_remove],
             inplace=True)
+        self._emit('net_removed', net_id=net_id_to_remove)
 
     def delete_all_pins_for_component(self, component_id_to_remove: int) -> set:
         """Delete all the pins for a given component id.
@@ -18,9 +18,14 @@ See the docstring of `QGeometryTables`
 
 import inspect
 import logging
+import threading
+import numpy as np
 import pandas as pd
 import shapely
+import geopandas as gpd
 
+from contextlib import contextmanager
+from functools import wraps
 from typing import TYPE_CHECKING
 from typing import Dict as Dict_
 from typing import List, Tuple, Union, Any, Iterable
@@ -30,10 +35,15 @@ from .. import Dict
 from ..draw import BaseGeometry
 from qiskit_metal.draw.utility import round_coordinate_sequence
 
+from shapely.geometry import CAP_STYLE, JOIN_STYLE, LineString, box
 from shapely.geometry.multipolygon import MultiPolygon  #to avoid MultiPolygons
+from shapely.ops import cascaded_union
+from shapely.strtree import STRtree
 from .. import config
 if not config.is_building_docs():
-    from qiskit_metal.toolbox_python.utility_functions import get_range_of_vertex_to_not_fillet, data_frame_empty_typed
+    from qiskit_metal.toolbox_python.utility_functions import (
+        get_range_of_vertex_to_not_fillet, data_frame_empty_typed,
+        fillet_path_coords)
 
 if TYPE_CHECKING:
     from ..qlibrary.core import QComponent
@@ -76,6 +86,17 @@ def is_qgeometry_table(obj):
     return hasattr(obj, '__i_am_qgeometry_table__')
 
 
+def _locked(method):
+    """Run a method of `QGeometryTables` holding the lock of the tables."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:  # pylint: disable=protected-access
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 #############################################################################
 #
 # Dictionary that specifies the column names of various element tables.
@@ -254,9 +275,55 @@ class QGeometryTables(object):
 
         self._tables = Dict()
 
+        # Rows added by `add_qgeometry` are staged here, as plain column lists
+        # per table, and only appended to the GeoDataFrames by `flush`.
+        # Appending one small frame per call is quadratic in the table size.
+        self._staged = dict()  # table name -> {column name: list of values}
+        self._staged_count = dict()  # table name -> number of staged rows
+
+        # Index of the rows of each component in the tables, so that deleting
+        # or fetching a component does not scan the whole table. Row labels are
+        # never reused. Deleted rows are only dropped from the tables by flush.
+        self._rows = dict()  # table name -> {component id: list of row labels}
+        self._dropped = dict()  # table name -> list of row labels to drop
+        self._next_row = dict()  # table name -> next unused row label
+
+        # Spatial index of the components, for the obstacle queries of the
+        # routes. The bounds and outline of a component are computed once and
+        # dropped whenever rows of that component are added or deleted. The
+        # tree is rebuilt from the cached bounds on the first query after any
+        # change.
+        self._bounds = dict()  # component id -> (minx, miny, maxx, maxy)
+        self._outlines = dict()  # component id -> list of outline coordinates
+        self._bounds_tree = None  # STRtree of the boxes of the components
+        self._bounds_tree_ids = dict()  # id of box in tree -> component id
+
+        # Rendered outlines of the paths and junctions, i.e. the LineString
+        # filleted and buffered by half its width, shared by the renderers.
+        # Keyed on the geometry and the outline settings rather than on the
+        # row, since renderers may pass modified copies of the rows. Dropped
+        # with the spatial index when the component changes.
+        self._rendered = dict()  # component id -> {key: Polygon}
+
+        # Components may be rebuilt by a worker thread while the GUI reads
+        # the tables, see `deferred`.
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
         # Need to call after columns are added by add_renderer_extension is run by all the renderers.
         # self.create_tables()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
     @property
     def design(self) -> 'QDesign':
         """Return a reference to the parent design object."""
@@ -271,12 +338,332 @@ class QGeometryTables(object):
     def tables(self) -> Dict_[str, GeoDataFrame]:
         """The dictionary of tables containing qgeometry.
 
+        Any rows staged by `add_qgeometry` are flushed into the tables first.
+
         Returns:
             Dict_[str, GeoDataFrame]: The keys of this dictionary are
             also obtained from `self.get_element_types()`
         """
+        self.flush()
         return self._tables
 
+    @contextmanager
+    def deferred(self):
+        """Hold back the rows added and deleted by this thread, and apply
+        them in one step on exit, so that other threads never see a component
+        with only part of its rows. Used by `QComponent.rebuild`.
+
+        .. code-block:: python
+
+            with design.qgeometry.deferred():
+                design.qgeometry.delete_component_id(component.id)
+                component.make()
+        """
+        if getattr(self._local, 'batch', None) is not None:  # nested
+            yield
+            return
+
+        batch = self._local.batch = []
+        try:
+            yield
+        finally:
+            self._local.batch = None
+            with self._lock:
+                for method, args in batch:
+                    method(*args)
+
+    def _defer(self, method, *args) -> bool:
+        """Record the call for the end of `deferred`, if active in this
+        thread.
+
+        Returns:
+            bool: True if the call was deferred.
+        """
+        batch = getattr(self._local, 'batch', None)
+        if batch is None:
+            return False
+        batch.append((method, args))
+        return True
+
+    @_locked
+    def flush(self):
+        """Drop the rows of deleted components from the tables and append all
+        the rows staged by `add_qgeometry`.
+
+        The rows of each table are converted to a single GeoDataFrame and
+        appended in one go. Called automatically whenever `tables` is read.
+        """
+        if not self._staged and not self._dropped:
+            return
+
+        dropped, self._dropped = self._dropped, dict()
+        for kind, labels in dropped.items():
+            self._tables[kind] = self._tables[kind].drop(index=labels)
+
+        staged, self._staged = self._staged, dict()
+        self._staged_count = dict()
+        for kind, columns in staged.items():
+            start = self._next_row.get(kind, 0)
+            index = pd.RangeIndex(start, start + len(columns['component']))
+            df = GeoDataFrame(columns, index=index, geometry='geometry')
+            self._tables[kind] = pd.concat([self._tables[kind], df], sort=False)
+
+            rows = self._rows.setdefault(kind, dict())
+            for label, component_id in zip(index, columns['component']):
+                rows.setdefault(component_id, []).append(label)
+            self._next_row[kind] = index.stop
+
+    @_locked
+    def append_table(self, table_name: str, table: GeoDataFrame):
+        """Append all the rows of a table at once, for example the table of a
+        saved design. The rows must belong to components of the design.
+
+        Args:
+            table_name (str): Element table name ('poly', 'path', etc.).
+            table (GeoDataFrame): Rows to append. The index is not kept.
+        """
+        if table.empty:
+            return
+        self.flush()
+
+        start = self._next_row.get(table_name, 0)
+        index = pd.RangeIndex(start, start + len(table))
+        table = table.set_index(index)
+        self._tables[table_name] = pd.concat([self._tables[table_name], table],
+                                             sort=False)
+
+        rows = self._rows.setdefault(table_name, dict())
+        for label, component_id in zip(index, table['component']):
+            rows.setdefault(component_id, []).append(label)
+            self._invalidate_component(component_id)
+        self._next_row[table_name] = index.stop
+
+        for component_id in table['component'].unique():
+            self.design.events.emit('rows_inserted',
+                                    table_name=table_name,
+                                    component_id=component_id)
+
+    @_locked
+    def _get_component_rows(self, table_name: str,
+                            component_id: int) -> GeoDataFrame:
+        """Return the rows of a component in a table, using the row index
+        rather than a scan of the whole table.
+
+        Args:
+            table_name (str): Element table name ('poly', 'path', etc.).
+            component_id (int): Unique number to describe the component.
+
+        Returns:
+            GeoDataFrame: The rows of the component, in the order added.
+        """
+        staged = self._staged.get(table_name)
+        if staged is not None and component_id in staged['component']:
+            self.flush()
+
+        table = self._tables[table_name]
+        labels = self._rows.get(table_name, {}).get(component_id)
+        if not labels:
+            return table.iloc[0:0]
+        return table.loc[labels]
+
+    @_locked
+    def _stage_rows(self, kind: str, geometry: dict, options: dict):
+        """Stage one row per geometry for the table `kind`. Columns that were
+        not given for some of the staged rows are padded with NaN, as an
+        append of the DataFrames would do.
+
+        Args:
+            kind (str): Name of table, i.e. 'path', 'poly', 'junction, etc
+            geometry (dict): Dict of shapely geometry, keyed by element name.
+            options (dict): Values of the other columns, shared by all rows.
+        """
+        num_new = len(geometry)
+        if num_new == 0 or self._defer(self._stage_rows, kind, geometry,
+                                       options):
+            return
+        self._invalidate_component(options['component'])
+
+        num_old = self._staged_count.get(kind, 0)
+        columns = self._staged.setdefault(kind, dict())
+
+        values = dict(name=list(geometry.keys()),
+                      geometry=list(geometry.values()))
+        for key, value in options.items():
+            values[key] = [value] * num_new
+
+        for key, new_values in values.items():
+            if key not in columns:
+                columns[key] = [np.nan] * num_old
+            columns[key].extend(new_values)
+        for key, old_values in columns.items():
+            if key not in values:
+                old_values.extend([np.nan] * num_new)
+
+        self._staged_count[kind] = num_old + num_new
+        self.design.events.emit('rows_inserted',
+                                table_name=kind,
+                                component_id=options['component'])
+
+    def _unstage_component(self, component_id: int) -> list:
+        """Drop the staged rows that belong to a component.
+
+        Args:
+            component_id (int): Unique number to describe the component.
+
+        Returns:
+            list: Names of the tables that had staged rows of the component.
+        """
+        kinds = []
+        for kind, columns in list(self._staged.items()):
+            keep = [comp != component_id for comp in columns['component']]
+            if all(keep):
+                continue
+            kinds.append(kind)
+            for key, values in columns.items():
+                columns[key] = [v for v, k in zip(values, keep) if k]
+            self._staged_count[kind] = sum(keep)
+            if self._staged_count[kind] == 0:
+                del self._staged[kind]
+                del self._staged_count[kind]
+        return kinds
+
+    def _invalidate_component(self, component_id: int):
+        """Drop what the spatial index cached about a component.
+
+        Args:
+            component_id (int): Unique number to describe the component.
+        """
+        self._bounds.pop(component_id, None)
+        self._outlines.pop(component_id, None)
+        self._rendered.pop(component_id, None)
+        self._bounds_tree = None
+
+    @_locked
+    def _get_component_bounds(self, component_id: int) -> Tuple:
+        """Return the cached bounds of a component, computing them if needed.
+
+        Args:
+            component_id (int): Unique number to describe the component.
+
+        Returns:
+            Tuple: minx, miny, maxx, maxy, or None if the component has no
+            qgeometry.
+        """
+        if component_id not in self._bounds:
+            geometry = []
+            for table_name in self.get_element_types():
+                geometry.extend(
+                    self._get_component_rows(table_name, component_id).geometry)
+            if geometry:
+                bounds = tuple(GeoSeries(geometry).total_bounds)
+            else:
+                bounds = None
+            self._bounds[component_id] = bounds
+        return self._bounds[component_id]
+
+    @_locked
+    def get_components_in_bounds(self, bounds: Tuple) -> List[int]:
+        """Return the components whose bounding box intersects or touches a
+        given box, using a spatial index rather than a scan of all the
+        components. Components without qgeometry are never returned.
+
+        Args:
+            bounds (Tuple): minx, miny, maxx, maxy of the box to query.
+
+        Returns:
+            List[int]: Sorted ids of the components.
+        """
+        if self._bounds_tree is None:
+            boxes = []
+            self._bounds_tree_ids = dict()
+            for component_id in self.design._components:
+                component_bounds = self._get_component_bounds(component_id)
+                if component_bounds is None:
+                    continue
+                component_box = box(*component_bounds)
+                boxes.append(component_box)
+                self._bounds_tree_ids[id(component_box)] = component_id
+            self._bounds_tree = STRtree(boxes)
+
+        hits = self._bounds_tree.query(box(*bounds))
+        return sorted(self._bounds_tree_ids[id(hit)] for hit in hits)
+
+    @_locked
+    def get_component_outline(self, name: str) -> List[Tuple[float, float]]:
+        """Return the exterior of the union of the polygons and of the paths
+        of the component, each path buffered by half its width with flat
+        caps. Cached until the component changes.
+
+        Args:
+            name (str): Component name
+
+        Returns:
+            List[Tuple[float, float]]: Coordinates of the outline.
+        """
+        component_id = self.design.components[name].id
+        if component_id not in self._outlines:
+            paths_converted = []
+            paths = self._get_component_rows('path', component_id)
+            for _, row in paths.iterrows():
+                paths_converted.append(row['geometry'].buffer(
+                    row['width'] / 2, cap_style=CAP_STYLE.flat))
+            polygons = list(
+                self._get_component_rows('poly', component_id).geometry)
+            boundary = gpd.GeoSeries(cascaded_union(polygons + paths_converted))
+            self._outlines[component_id] = list(
+                boundary.geometry.exterior[0].coords)
+        return self._outlines[component_id]
+
+    def get_rendered_outlines(self,
+                              table: pd.DataFrame,
+                              resolution: int = 16,
+                              fillet: bool = True,
+                              cap_style: int = CAP_STYLE.flat,
+                              join_style: int = JOIN_STYLE.mitre) -> list:
+        """Return the rendered outline of each row of a table of paths or
+        junctions: the LineString, filleted by the fillet column, buffered by
+        half of the width column.
+
+        Outlines are cached until the component of the row is rebuilt, so
+        the renderers and every refresh of the GUI share them.
+
+        Args:
+            table (pd.DataFrame): Rows of the path or junction table, or
+                copies of them. Needs the component, geometry and width
+                columns, and fillet when filleting.
+            resolution (int): Number of points in a quarter circle, for the
+                fillets and the buffer. Defaults to 16.
+            fillet (bool): Round the corners by the fillet column first.
+                Defaults to True.
+            cap_style (int): Cap style of the buffer. Defaults to flat.
+            join_style (int): Join style of the buffer. Defaults to mitre.
+
+        Returns:
+            list: The shapely Polygon of each row, in the order of the table.
+        """
+        precision = self.design.template_options.PRECISION
+        radii = table['fillet'] if fillet and 'fillet' in table else \
+            [np.nan] * len(table)
+        outlines = []
+        for component_id, geometry, width, radius in zip(
+                table['component'], table['geometry'], table['width'], radii):
+            if pd.isnull(radius):
+                radius = 0
+            key = (geometry.wkb, float(width), radius, resolution, cap_style,
+                   join_style)
+            cache = self._rendered.setdefault(component_id, dict())
+            if key not in cache:
+                if radius:
+                    geometry = LineString(
+                        fillet_path_coords(geometry.coords, radius, resolution,
+                                           precision))
+                cache[key] = geometry.buffer(float(width) / 2.,
+                                             cap_style=cap_style,
+                                             join_style=join_style,
+                                             resolution=resolution)
+            outlines.append(cache[key])
+        return outlines
+
     @classmethod
     def add_renderer_extension(cls, renderer_name: str, qgeometry: dict):
         """Add renderer element extension to ELEMENT_COLUMNS. Called when the
@@ -375,7 +762,7 @@ class QGeometryTables(object):
             table.name = table_name
 
             # Assign
-            self.tables[table_name] = table
+            self._tables[table_name] = table
 
     def _validate_column_dictionary(self, table_name: str, column_dict: dict):
         """Validate A possible error here is if the user did not pass a valid
@@ -511,23 +898,11 @@ class QGeometryTables(object):
         #        options[keyC] = ???[keyC] -> alternative manner to pass options to the add_qgeometry function?
         #                                       instead have the add_qeometry in baseComponent generate the dict?
 
-        #Could we just append rather than make a new table each time? This seems slow
-        table = self.tables[kind]
-
+        # Stage the rows rather than appending to the table on every call.
+        # The GeoDataFrame is only updated by flush(), when the table is read.
         # assert that all names in options are in table columns! TODO: New approach will not be wanting
         #to do this (maybe check that all columns are in options?)
-        df = GeoDataFrame.from_dict(geometry,
-                                    orient='index',
-                                    columns=['geometry'])
-        df.index.name = 'name'
-        df = df.reset_index()
-
-        df = df.assign(**options)
-
-        # Set new table. Unfortunately, this creates a new instance. Can just direct append
-        self.tables[kind] = table.append(df, sort=False, ignore_index=True)
-        # concat([table,df], axis=0, join='outer', ignore_index=True,sort=False,
-        #          verify_integrity=False, copy=False)
+        self._stage_rows(kind, geometry, options)
 
     def check_lengths(self, geometry: shapely.geometry.base.BaseGeometry,
                       kind: str, component_name: str, **other_options):
@@ -570,13 +945,24 @@ class QGeometryTables(object):
         """
         return self.design.parse_value(value)
 
+    @_locked
     def clear_all_tables(self):
         """Clear all the internal tables and all else.
 
         Use when clearing a design and starting from scratch.
         """
-        self.tables.clear()
+        self._staged.clear()
+        self._staged_count.clear()
+        self._rows.clear()
+        self._dropped.clear()
+        self._next_row.clear()
+        self._bounds.clear()
+        self._outlines.clear()
+        self._rendered.clear()
+        self._bounds_tree = None
+        self._tables.clear()
         self.create_tables()  # remake all tables
+        self.design.events.emit('tables_cleared')
 
     def delete_component(self, name: str):
         """Delete component by name.
@@ -588,21 +974,31 @@ class QGeometryTables(object):
         # TODO: is this the best way to do this, or is there a faster way?
         a_comp = self.design.components[name]
         if a_comp is not None:
-            for table_name in self.tables:
-                df = self.tables[table_name]
-                self.tables[table_name] = df[df['component'] != a_comp.id]
+            self.delete_component_id(a_comp.id)
 
+    @_locked
     def delete_component_id(self, component_id: int):
         """Drop the components within the qgeometry.tables.
 
         Args:
             component_id (int): Unique number to describe the component.
         """
-        for table_name in self.tables:
-            df_table_name = self.tables[table_name]
-            # self.tables[table_name] = df_table_name.drop(df_table_name[df_table_name['component'] == component_id].index)
-            self.tables[table_name] = df_table_name[
-                df_table_name['component'] != component_id]
+        if self._defer(self.delete_component_id, component_id):
+            return
+        # No need to flush the staged rows just to delete some of them.
+        changed = self._unstage_component(component_id)
+        self._invalidate_component(component_id)
+        # The rows are dropped from the tables on the next flush.
+        for table_name, rows in self._rows.items():
+            labels = rows.pop(component_id, None)
+            if labels:
+                self._dropped.setdefault(table_name, []).extend(labels)
+                if table_name not in changed:
+                    changed.append(table_name)
+        for table_name in changed:
+            self.design.events.emit('rows_removed',
+                                    table_name=table_name,
+                                    component_id=component_id)
 
     def get_component(
         self,
@@ -629,16 +1025,12 @@ class QGeometryTables(object):
                 tables[table_name] = self.get_component(name, table_name)
             return tables
         else:
-            df = self.tables[table_name]
             a_comp = self.design.components[name]
             if a_comp is None:
                 # Component not found.
                 return None
             else:
-                return df[df.component == a_comp.id]
-
-            # comp_id = self.design.components[name].id
-            # return df[df.component == comp_id]
+                return self._get_component_rows(table_name, a_comp.id)
 
     def get_component_bounds(self,
                              name: str) -> Tuple[float, float, float, float]:
@@ -651,11 +1043,13 @@ class QGeometryTables(object):
         Returns:
             Geometry: Bare element geometry
         """
-        gs = self.get_component_geometry(name)  # Pandas GeoSeries
-        if len(gs) == 0:
+        a_comp = self.design.components[name]
+        bounds = None if a_comp is None else self._get_component_bounds(
+            a_comp.id)
+        if bounds is None:
             return (0, 0, 0, 0)
         else:
-            return gs.total_bounds
+            return np.array(bounds)
 
     def rename_component(self, component_id: int, new_name: str):
         """Rename component by ID (integer) cast to string format.
@@ -671,10 +1065,13 @@ class QGeometryTables(object):
         if a_comp is None:
             return None
         else:
-            # TODO: is this the best way to do this, or is there a faster way?
+            self._invalidate_component(a_comp.id)
             for table_name in self.tables:
-                table = self.tables[table_name]
-                table.component[table.component == a_comp.id] = new_name
+                rows = self._rows.setdefault(table_name, dict())
+                labels = rows.pop(a_comp.id, None)
+                if labels:
+                    self._tables[table_name].loc[labels, 'component'] = new_name
+                    rows[new_name] = labels
 
     def get_component_geometry_list(self,
                                     name: str,
@@ -697,9 +1094,9 @@ class QGeometryTables(object):
                 qgeometry += self.get_component_geometry_list(name, table)
 
         else:
-            table = self.tables[table_name]
             comp_id = self.design.components[name].id
-            qgeometry = table.geometry[table.component == comp_id].to_list()
+            qgeometry = self._get_component_rows(table_name,
+                                                 comp_id).geometry.to_list()
 
         return qgeometry
 
@@ -715,8 +1112,8 @@ class QGeometryTables(object):
         comp_id = self.design.components[name].id
         qgeometry = {}
         for table_name in self.get_element_types():
-            table = self.tables[table_name]
-            qgeometry[table_name] = table.geometry[table.component == comp_id]
+            qgeometry[table_name] = self._get_component_rows(
+                table_name, comp_id).geometry
         qgeometry = pd.concat(qgeometry)
 
         # when concatenating empty GeoSeries, returns Series (ugly fix)
@@ -747,12 +1144,10 @@ class QGeometryTables(object):
             return qgeometry  # return pd.concat(qgeometry, axis=0)
 
         else:
-            table = self.tables[table_name]
-
-            # mask the rows nad get only 2 columns
+            # get the rows of the component and only 2 columns
             comp_id = self.design.components[name].id
-            df_comp_id = table.loc[table.component == comp_id,
-                                   ['name', 'geometry']]
+            df_comp_id = self._get_component_rows(table_name,
+                                                  comp_id)[['name', 'geometry']]
             df_geometry = df_comp_id.geometry
             df_geometry.index = df_comp_id.name
             return df_geometry.to_dict()
@@ -37,6 +37,7 @@ from qiskit_metal import config
 from qiskit_metal.draw import BaseGeometry
 from qiskit_metal.toolbox_python.attr_dict import Dict
 from qiskit_metal.toolbox_python.display import format_dict_ala_z
+from qiskit_metal.toolbox_python.utility_functions import dict_equal
 from qiskit_metal.qlibrary.core._parsed_dynamic_attrs import ParsedDynamicAttributes_Component
 
 if not config.is_building_docs():
@@ -185,6 +186,12 @@ class QComponent():
         self._id = None
         self._made = False
 
+        # Options, variables used and build id of the latest successful build.
+        # Used by the design to only rebuild components that changed.
+        self._built_options = None
+        self._built_variables = None
+        self._build_id = 0
+
         self._component_template = component_template
 
         # Status: used to handle building of a component and checking if it succeeded or failed.
@@ -433,6 +440,7 @@ class QComponent():
         # pylint: disable=protected-access
         self.design._components[self.id] = self
         self.design.name_to_id[self.name] = self._id
+        self.design.events.emit('component_added', component_id=self.id)
 
     @classmethod
     def get_template_options(cls,
@@ -701,16 +709,37 @@ name='{strname}'{other_args}
         """
         self.status = 'failed'
         try:
-            if self._made:  # already made, just remaking
-                self.design.qgeometry.delete_component_id(self.id)
+            # What make uses, before make, so that an edit while it runs (from
+            # the GUI, as the rebuild has its own thread) is seen as a change.
+            built_options = deepcopy(self.options)
+            built_variables = deepcopy(
+                self.design._get_variables_used(self.options))
+
+            # The old rows are replaced by the new ones in one step, after
+            # make, before the build id changes.
+            with self.design.qgeometry.deferred():
+                if self._made:  # already made, just remaking
+                    self.design.qgeometry.delete_component_id(self.id)
+
+                    # pylint: disable=protected-access
+                    self.design._delete_all_pins_for_component(self.id)
 
                 # pylint: disable=protected-access
-                self.design._delete_all_pins_for_component(self.id)
+                self.design._reset_pin_dependencies(self)
 
-            self.make()
+                self.make()
             self._made = True
             self.status = 'good'
 
+            # make writes its results in the private options, such as the
+            # _actual_length of a route
+            for key, value in self.options.items():
+                if key.startswith('_'):
+                    built_options[key] = deepcopy(value)
+            self._built_options = built_options
+            self._built_variables = built_variables
+            self._build_id = self.design._get_new_qcomponent_build_id()
+
             self.design.build_logs.add_success(
                 f"{str(datetime.now())} -- Component: {self.name} successfully built"
             )
@@ -723,6 +752,28 @@ name='{strname}'{other_args}
             )
             raise error
 
+        finally:
+            self.design.events.emit('component_rebuilt', component_id=self.id)
+
+    def _needs_rebuild(self) -> bool:
+        """Check if the component changed since it was last built.
+
+        Returns:
+            bool: True if the component was never built, if its options or the
+            design variables used by them changed, or if a component it depends
+            on was rebuilt since.
+        """
+        # pylint: disable=protected-access
+        if not self._made or self._built_options is None:
+            return True
+        if not dict_equal(self.options, self._built_options):
+            return True
+        if not dict_equal(self.design._get_variables_used(self.options),
+                          self._built_variables):
+            return True
+        return any(self.design._components[parent_id]._build_id > self._build_id
+                   for parent_id in self.design.get_dependencies(self.id))
+
     def delete(self):
         """Delete the QComponent.
 
@@ -1315,5 +1366,5 @@ name='{strname}'{other_args}
         add_qgeometry(). This dict is used to get a summary tables used
         for this component.
         """
-        for table_name in self.design.qgeometry.tables.keys():
+        for table_name in self.design.qgeometry.get_element_types():
             self.qgeometry_table_usage[table_name] = False
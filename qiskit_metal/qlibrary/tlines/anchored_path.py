@@ -21,9 +21,6 @@ from qiskit_metal.qlibrary.core import QRoute, QRoutePoint
 from qiskit_metal.toolbox_metal import math_and_overrides as mao
 from qiskit_metal.toolbox_metal.exceptions import QiskitMetalDesignError
 from collections.abc import Mapping
-from shapely.ops import cascaded_union
-from shapely.geometry import CAP_STYLE
-import geopandas as gpd
 
 
 def intersecting(a: np.array, b: np.array, c: np.array, d: np.array) -> bool:
@@ -153,16 +150,10 @@ class RouteAnchors(QRoute):
         Returns:
             bool: True is no obstacles
         """
-        # transform path to polygons
-        paths_converted = []
-        paths = self.design.components[component_name].qgeometry_table('path')
-        for _, row in paths.iterrows():
-            paths_converted.append(row['geometry'].buffer(
-                row['width'] / 2, cap_style=CAP_STYLE.flat))
-        # merge all the polygons
-        polygons = self.design.components[component_name].qgeometry_list('poly')
-        boundary = gpd.GeoSeries(cascaded_union(polygons + paths_converted))
-        boundary_coords = list(boundary.geometry.exterior[0].coords)
+        # exterior of the union of the polygons and the buffered paths, cached
+        # by the design until the component changes
+        boundary_coords = self.design.qgeometry.get_component_outline(
+            component_name)
         if any(
                 intersecting(segment[0], segment[1], boundary_coords[i],
                              boundary_coords[i + 1])
@@ -184,7 +175,13 @@ class RouteAnchors(QRoute):
         """
 
         # assumes rectangular bounding boxes
-        for component in self.design.components:
+        # only the components whose bounding box overlaps the bounding box of
+        # the segment can obstruct it; ask the spatial index of the design
+        (x0, y0), (x1, y1) = segment[0], segment[1]
+        candidates = self.design.qgeometry.get_components_in_bounds(
+            (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)))
+        for component_id in candidates:
+            component = self.design._components[component_id].name
             if component == self.name:
                 continue
             xmin, ymin, xmax, ymax = self.design.components[
@@ -57,6 +57,7 @@ class RouteMixed(RoutePathfinder, RouteMeander):
         * step_size: '0.25mm' -- Length of the step for the A* pathfinding algorithm
         * advanced: Dict
             * avoid_collision: 'true' -- true/false, defines if the route needs to avoid collisions.  Defaults to 'true'.
+            * engine: 'classic' -- classic/grid, A* engine used by the "PF" segments.  Defaults to 'classic'.
 
     RouteMeander Default Options:
         * meander: Dict
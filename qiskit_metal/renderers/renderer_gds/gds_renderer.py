@@ -14,6 +14,7 @@
 """ This module has a QRenderer to export QDesign to a GDS file."""
 # pylint: disable=too-many-lines
 
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
 from operator import itemgetter
 from typing import TYPE_CHECKING
@@ -51,6 +52,66 @@ if TYPE_CHECKING:
     from qiskit_metal.designs import QDesign
 
 
+def _boolean_not(polygons_1: list, polygons_2: list, layer: int,
+                 precision: float, max_points: int) -> gdspy.PolygonSet:
+    """Return polygons_1 minus polygons_2, as gdspy.boolean does.
+
+    Defined at module level so that it can run in a worker process.
+
+    Args:
+        polygons_1 (list): Polygons to subtract from.
+        polygons_2 (list): Polygons to subtract.
+        layer (int): Layer of the result.
+        precision (float): Used for gdspy.
+        max_points (int): Used for gdspy. GDSpy uses 199 as the default.
+
+    Returns:
+        gdspy.PolygonSet: The difference, or None if it is empty.
+    """
+    return gdspy.boolean(polygons_1,
+                         polygons_2,
+                         'not',
+                         max_points=max_points,
+                         precision=precision,
+                         layer=layer)
+
+
+def _no_cheese_union(
+        poly_sub_geo: list, path_sub_geo: list, no_cheese_buffer: float,
+        style_cap: int, style_join: int
+) -> Union[None, shapely.geometry.multipolygon.MultiPolygon]:
+    """Combine the polygons and the buffered LineStrings of a layer, then
+    buffer the result by no_cheese_buffer.
+
+    Defined at module level so that it can run in a worker process.
+
+    Args:
+        poly_sub_geo (list): The shapely Polygons.
+        path_sub_geo (list): The LineStrings buffered by half their width.
+        no_cheese_buffer (float): Size of the buffer.
+        style_cap (int): Cap style of the buffers.
+        style_join (int): Join style of the buffers.
+
+    Returns:
+        Union[None, shapely.geometry.multipolygon.MultiPolygon]: The
+        no-cheese region, or None if there is no geometry.
+    """
+    #  Need to add buffer_size, cap style, and join style to default options
+    combo_list = path_sub_geo + poly_sub_geo
+    combo_shapely = draw.union(combo_list)
+
+    if combo_shapely.is_empty:
+        return None
+
+    #Can return either Multipolygon or just one polygon.
+    combo_shapely = combo_shapely.buffer(no_cheese_buffer,
+                                         cap_style=style_cap,
+                                         join_style=style_join)
+    if isinstance(combo_shapely, shapely.geometry.polygon.Polygon):
+        combo_shapely = shapely.geometry.MultiPolygon([combo_shapely])
+    return combo_shapely
+
+
 class QGDSRenderer(QRenderer):
     """Extends QRenderer to export GDS formatted files. The methods which a
     user will need for GDS export should be found within this class.
@@ -257,6 +318,11 @@ class QGDSRenderer(QRenderer):
             view_in_file=Dict(main={1: True}),
         ),
 
+        # Compute the ground of each chip and layer, and its no-cheese region,
+        # in a pool of processes. The exported file is the same as serial.
+        # workers: number of processes, '0' uses the number of CPUs.
+        parallel=Dict(enable='False', workers='0'),
+
         # (float): Scale box of components to render.
         # Should be greater than 1.0.  For benefit of the GUI, keep this the
         # last entry in the dict.  GUI shows a note regarding bound_box.
@@ -686,17 +752,16 @@ class QGDSRenderer(QRenderer):
         all_layers = self.design.qgeometry.get_all_unique_layers(chip_name)
 
         for chip_layer in all_layers:
-            copy_subtract = []
-            copy_no_subtract = []
-            copy_subtract = deepcopy(all_table_subtracts)
-            copy_no_subtract = deepcopy(all_table_no_subtracts)
-
-            for item in copy_subtract:
-                item.drop(item.index[item['layer'] != chip_layer], inplace=True)
-
-            for item_no in copy_no_subtract:
-                item_no.drop(item_no.index[item_no['layer'] != chip_layer],
-                             inplace=True)
+            # Selecting the rows of the layer already makes new tables,
+            # no need to deepcopy all the tables for every layer.
+            copy_subtract = [
+                item[item['layer'] == chip_layer]
+                for item in all_table_subtracts
+            ]
+            copy_no_subtract = [
+                item_no[item_no['layer'] == chip_layer]
+                for item_no in all_table_no_subtracts
+            ]
 
             self.chip_info[chip_name][chip_layer][
                 'all_subtract_true'] = geopandas.GeoDataFrame(
@@ -718,12 +783,12 @@ class QGDSRenderer(QRenderer):
                                                       'all_subtract_false')
 
             self.chip_info[chip_name][chip_layer][
-                'q_subtract_true'] = self.chip_info[chip_name][chip_layer][
-                    'all_subtract_true'].apply(self._qgeometry_to_gds, axis=1)
+                'q_subtract_true'] = self._qgeometry_table_to_gds(
+                    self.chip_info[chip_name][chip_layer]['all_subtract_true'])
 
             self.chip_info[chip_name][chip_layer][
-                'q_subtract_false'] = self.chip_info[chip_name][chip_layer][
-                    'all_subtract_false'].apply(self._qgeometry_to_gds, axis=1)
+                'q_subtract_false'] = self._qgeometry_table_to_gds(
+                    self.chip_info[chip_name][chip_layer]['all_subtract_false'])
 
     # Handling Fillet issues.
 
@@ -760,24 +825,33 @@ class QGDSRenderer(QRenderer):
                 if status > 0:
                     edit_index[index] = all_shapelys
 
-            df_copy = self.chip_info[chip_name][chip_layer][
-                all_sub_true_or_false].copy(deep=True)
-            for del_key, the_shapes in edit_index.items():
-                # copy row "index" into a new data-frame "status" times.
-                # Then replace the LONG shapely with all_shapelys.
-                # For any entries in edit_index, edit table here.
-                orig_row = df_copy.loc[del_key].copy(deep=True)
-                df_copy = df_copy.drop(index=del_key)
-
-                for dummy_new_row, short_shape in the_shapes.items():
-                    orig_row['geometry'] = short_shape['line']
-                    orig_row['fillet'] = short_shape['fillet']
-                    # Keep ignore_index=False, otherwise,
-                    # the other del_key will not be found.
-                    df_copy = df_copy.append(orig_row, ignore_index=False)
+            if not edit_index:
+                return
+
+            # For any entries in edit_index, replace the row by one row for
+            # each shorter LineString, at the end of the table. Gather all
+            # the new rows and concat them once, rather than appending them
+            # one by one.
+            df_copy = data_frame.drop(index=list(edit_index))
+            new_index = [
+                del_key for del_key, the_shapes in edit_index.items()
+                for _ in the_shapes
+            ]
+            new_rows = data_frame.loc[new_index].copy(deep=True)
+            new_rows['geometry'] = [
+                short_shape['line']
+                for the_shapes in edit_index.values()
+                for short_shape in the_shapes.values()
+            ]
+            new_rows['fillet'] = [
+                short_shape['fillet']
+                for the_shapes in edit_index.values()
+                for short_shape in the_shapes.values()
+            ]
+            df_copy = pd.concat([df_copy, new_rows], ignore_index=False)
 
             self.chip_info[chip_name][chip_layer][
-                all_sub_true_or_false] = df_copy.copy(deep=True)
+                all_sub_true_or_false] = df_copy
 
     def _check_length(self, a_shapely: shapely.geometry.LineString,
                       a_fillet: float) -> Tuple[int, Dict]:
@@ -983,14 +1057,12 @@ class QGDSRenderer(QRenderer):
         all_idx_bad_fillet['reduced_idx'] = get_range_of_vertex_to_not_fillet(
             coords, a_fillet, qdesign_precision, add_endpoints=True)
 
-        midpoints = list()
-        midpoints = [
-            QGDSRenderer._midpoint_xy(coords[idx - 1][0], coords[idx - 1][1],
-                                      vertex2[0], vertex2[1])
-            for idx, vertex2 in enumerate(coords)
-            if idx > 0
+        # Midpoints of all the segments at once, same as _midpoint_xy.
+        coords_array = np.array(coords, dtype=float)
+        midpoints = (coords_array[:-1] + coords_array[1:]) / 2
+        all_idx_bad_fillet['midpoints'] = [
+            tuple(midpoint) for midpoint in midpoints.tolist()
         ]
-        all_idx_bad_fillet['midpoints'] = midpoints
 
     # Move data around to be useful for GDS
 
@@ -1366,7 +1438,7 @@ class QGDSRenderer(QRenderer):
                         sub_df = self.chip_info[chip_name][chip_layer][
                             'all_subtract_true']
                         no_cheese_multipolygon = self._cheese_buffer_maker(
-                            sub_df, chip_name, no_cheese_buffer)
+                            sub_df, chip_name, no_cheese_buffer, chip_layer)
 
                         if no_cheese_multipolygon is not None:
                             self.chip_info[chip_name][chip_layer][
@@ -1403,9 +1475,45 @@ class QGDSRenderer(QRenderer):
                                 else:
                                     lib.remove(no_cheese_cell)
 
+    def _get_no_cheese_operands(self, sub_df: geopandas.GeoDataFrame,
+                                no_cheese_buffer: float) -> tuple:
+        """Gather the arguments of _no_cheese_union() for a layer.
+
+        Args:
+            sub_df (geopandas.GeoDataFrame): The subset of QGeometry tables
+                for each chip, and layer, and only if the layer has a ground plane.
+            no_cheese_buffer (float): Will be used for fillet and
+                size of buffer.
+
+        Returns:
+            tuple: The Polygons, the buffered LineStrings, the buffer, the
+            cap style and the join style.
+        """
+        style_cap = int(self.parse_value(self.options.no_cheese.cap_style))
+        style_join = int(self.parse_value(self.options.no_cheese.join_style))
+
+        poly_sub_df = sub_df[sub_df.geometry.apply(
+            lambda x: isinstance(x, shapely.geometry.polygon.Polygon))]
+        poly_sub_geo = poly_sub_df['geometry'].tolist()
+
+        path_sub_df = sub_df[sub_df.geometry.apply(
+            lambda x: isinstance(x, shapely.geometry.linestring.LineString))]
+        # The buffered LineStrings are cached by the qgeometry tables
+        path_sub_geo = self.design.qgeometry.get_rendered_outlines(
+            path_sub_df,
+            fillet=False,
+            cap_style=style_cap,
+            join_style=style_join)
+
+        return (poly_sub_geo, path_sub_geo, no_cheese_buffer, style_cap,
+                style_join)
+
     def _cheese_buffer_maker(
-        self, sub_df: geopandas.GeoDataFrame, chip_name: str,
-        no_cheese_buffer: float
+        self,
+        sub_df: geopandas.GeoDataFrame,
+        chip_name: str,
+        no_cheese_buffer: float,
+        chip_layer: int = None
     ) -> Union[None, shapely.geometry.multipolygon.MultiPolygon]:
         """For each layer in each chip, and if it has a ground plane
         (subtract==True), determine the no-cheese buffer and return a shapely
@@ -1418,43 +1526,24 @@ class QGDSRenderer(QRenderer):
             chip_name (str): Name of chip.
             no_cheese_buffer (float): Will be used for fillet and
                 size of buffer.
+            chip_layer (int): Layer of sub_df. If given, use the result of
+                _compute_layers_in_parallel() when there is one.
+                Defaults to None.
 
         Returns:
             Union[None, shapely.geometry.multipolygon.MultiPolygon]: The
             shapely which combines the polygons and linestrings and creates
             buffer as specificed through default_options.
         """
-        # pylint: disable=too-many-locals
-        style_cap = int(self.parse_value(self.options.no_cheese.cap_style))
-        style_join = int(self.parse_value(self.options.no_cheese.join_style))
-
-        poly_sub_df = sub_df[sub_df.geometry.apply(
-            lambda x: isinstance(x, shapely.geometry.polygon.Polygon))]
-        poly_sub_geo = poly_sub_df['geometry'].tolist()
-
-        path_sub_df = sub_df[sub_df.geometry.apply(
-            lambda x: isinstance(x, shapely.geometry.linestring.LineString))]
-        path_sub_geo = path_sub_df['geometry'].tolist()
-        path_sub_width = path_sub_df['width'].tolist()
-        #for n in range(len(path_sub_geo)):
-        for index, _ in enumerate(path_sub_geo):
-            path_sub_geo[index] = path_sub_geo[index].buffer(
-                path_sub_width[index] / 2,
-                cap_style=style_cap,
-                join_style=style_join)
-
-        #  Need to add buffer_size, cap style, and join style to default options
-        combo_list = path_sub_geo + poly_sub_geo
-        combo_shapely = draw.union(combo_list)
-
-        if not combo_shapely.is_empty:
-            #Can return either Multipolygon or just one polygon.
-            combo_shapely = combo_shapely.buffer(no_cheese_buffer,
-                                                 cap_style=style_cap,
-                                                 join_style=style_join)
-            if isinstance(combo_shapely, shapely.geometry.polygon.Polygon):
-                combo_shapely = shapely.geometry.MultiPolygon([combo_shapely])
+        if chip_layer is not None and 'no_cheese_union' in self.chip_info[
+                chip_name][chip_layer]:
+            combo_shapely = self.chip_info[chip_name][chip_layer].pop(
+                'no_cheese_union')
+        else:
+            combo_shapely = _no_cheese_union(
+                *self._get_no_cheese_operands(sub_df, no_cheese_buffer))
 
+        if combo_shapely is not None:
             # Check if the buffer went past the chip size.
             chip_box, status = self.design.get_x_y_for_chip(chip_name)
             if status == 0:
@@ -1609,30 +1698,9 @@ class QGDSRenderer(QRenderer):
         """
         if len(self.chip_info[chip_name][chip_layer]['q_subtract_true']) != 0:
 
-            # When subtract==True for chip and layer.
-            subtract_true_cell_name = f'SUBTRACT_true_{chip_name}_{chip_layer}'
-            subtract_true_cell = lib.new_cell(subtract_true_cell_name,
-                                              overwrite_duplicate=True)
-            subtract_true_cell.add(
-                self.chip_info[chip_name][chip_layer]['q_subtract_true'])
-
-            #When subtract==False for chip and layer.
-            subtract_false_cell_name = f'SUBTRACT_false_{chip_name}_{chip_layer}'
-            subtract_false_cell = lib.new_cell(subtract_false_cell_name,
-                                               overwrite_duplicate=True)
-            subtract_false_cell.add(
-                self.chip_info[chip_name][chip_layer]['q_subtract_false'])
-
             # Difference for True-False.
-            diff_geometry = gdspy.boolean(subtract_true_cell.get_polygons(),
-                                          subtract_false_cell.get_polygons(),
-                                          'not',
-                                          max_points=max_points,
-                                          precision=precision,
-                                          layer=chip_layer)
-
-            lib.remove(subtract_true_cell)
-            lib.remove(subtract_false_cell)
+            diff_geometry = self._get_ground_difference(chip_name, chip_layer,
+                                                        precision, max_points)
 
             if diff_geometry is None:
                 self.design.logger.warning(
@@ -1659,27 +1727,8 @@ class QGDSRenderer(QRenderer):
             max_points (int): Used for gdspy. GDSpy uses 199 as the default.
         """
         if len(self.chip_info[chip_name][chip_layer]['q_subtract_true']) != 0:
-            subtract_cell_name = f'SUBTRACT_{chip_name}_{chip_layer}'
-            subtract_cell = lib.new_cell(subtract_cell_name,
-                                         overwrite_duplicate=True)
-            subtract_cell.add(
-                self.chip_info[chip_name][chip_layer]['q_subtract_true'])
-
-            # gdspy.boolean() is not documented clearly.  If there are multiple
-            # elements to subtract (both poly & path), the way I could
-            # make it work is to put them into a cell, within lib. I used
-            # the method cell_name.get_polygons(), which appears to convert
-            # all elements within the cell to poly. After the boolean(),
-            # I deleted the cell from lib. The memory is freed up then.
-            diff_geometry = gdspy.boolean(
-                self.chip_info[chip_name]['subtract_poly'],
-                subtract_cell.get_polygons(),
-                'not',
-                max_points=max_points,
-                precision=precision,
-                layer=chip_layer)
-
-            lib.remove(subtract_cell)
+            diff_geometry = self._get_ground_difference(chip_name, chip_layer,
+                                                        precision, max_points)
 
             if diff_geometry is None:
                 self.design.logger.warning(
@@ -1695,6 +1744,113 @@ class QGDSRenderer(QRenderer):
         QGDSRenderer._add_groundcell_to_chip_only_top(lib, chip_only_top,
                                                       ground_cell)
 
+    def _get_ground_operands(self, chip_name: str,
+                             chip_layer: int) -> Tuple[list, list]:
+        """Return the two operands of the boolean 'not' that gives the
+        ground of a layer.
+
+        For a negative mask, the subtract==True elements minus the
+        subtract==False elements. For a positive mask, the subtract-rectangle
+        of the chip minus the subtract==True elements.
+
+        Args:
+            chip_name (str): Name of chip to render.
+            chip_layer (int): Layer of the chip to render.
+
+        Returns:
+            Tuple[list, list]: The polygons to subtract from, and the
+            polygons to subtract.
+        """
+        # gdspy.boolean() is not documented clearly.  If there are multiple
+        # elements to subtract (both poly & path), the way I could
+        # make it work is to put them into a cell. I used
+        # the method cell_name.get_polygons(), which appears to convert
+        # all elements within the cell to poly. The cells are kept out of
+        # any library, so self.lib is not touched.
+        subtract_true_cell = gdspy.Cell(
+            f'SUBTRACT_true_{chip_name}_{chip_layer}',
+            exclude_from_current=True)
+        subtract_true_cell.add(
+            self.chip_info[chip_name][chip_layer]['q_subtract_true'])
+
+        if self._is_negative_mask(chip_name, chip_layer):
+            subtract_false_cell = gdspy.Cell(
+                f'SUBTRACT_false_{chip_name}_{chip_layer}',
+                exclude_from_current=True)
+            subtract_false_cell.add(
+                self.chip_info[chip_name][chip_layer]['q_subtract_false'])
+            return (subtract_true_cell.get_polygons(),
+                    subtract_false_cell.get_polygons())
+
+        _, rectangle_points = self._get_rectangle_points(chip_name)
+        ground = [gdspy.Polygon(rectangle_points, chip_layer)]
+        return ground, subtract_true_cell.get_polygons()
+
+    def _get_ground_difference(self, chip_name: str, chip_layer: int,
+                               precision: float,
+                               max_points: int) -> gdspy.PolygonSet:
+        """Return the ground of a layer, computed by
+        _compute_layers_in_parallel() if it was called, otherwise computed
+        here.
+
+        Args:
+            chip_name (str): Name of chip to render.
+            chip_layer (int): Layer of the chip to render.
+            precision (float): Used for gdspy.
+            max_points (int): Used for gdspy. GDSpy uses 199 as the default.
+
+        Returns:
+            gdspy.PolygonSet: The ground, or None if it is empty.
+        """
+        layer_info = self.chip_info[chip_name][chip_layer]
+        if 'ground_difference' in layer_info:
+            return layer_info.pop('ground_difference')
+
+        polygons_1, polygons_2 = self._get_ground_operands(
+            chip_name, chip_layer)
+        return _boolean_not(polygons_1, polygons_2, chip_layer, precision,
+                            max_points)
+
+    def _compute_layers_in_parallel(self):
+        """Compute the ground and the no-cheese region of every chip and
+        layer in a pool of processes.
+
+        The results are placed in self.chip_info[chip_name][chip_layer] and
+        picked up by _get_ground_difference() and _cheese_buffer_maker(),
+        in the usual serial order, so the output does not change.
+        """
+        precision = float(self.parse_value(self.options.precision))
+        max_points = int(self.parse_value(self.options.max_points))
+        no_cheese_buffer = float(self.parse_value(
+            self.options.no_cheese.buffer))
+        workers = int(self.parse_value(self.options.parallel.workers))
+
+        jobs = dict()
+        with ProcessPoolExecutor(max_workers=workers or None) as executor:
+            for chip_name in self.chip_info:
+                layers_in_chip = self.design.qgeometry.get_all_unique_layers(
+                    chip_name)
+                for chip_layer in layers_in_chip:
+                    layer_info = self.chip_info[chip_name][chip_layer]
+                    if len(layer_info['q_subtract_true']) == 0:
+                        continue
+
+                    polygons_1, polygons_2 = self._get_ground_operands(
+                        chip_name, chip_layer)
+                    job = executor.submit(_boolean_not, polygons_1, polygons_2,
+                                          chip_layer, precision, max_points)
+                    jobs[chip_name, chip_layer, 'ground_difference'] = job
+
+                    if self._check_either_cheese(chip_name,
+                                                 chip_layer) in (1, 2, 3):
+                        operands = self._get_no_cheese_operands(
+                            layer_info['all_subtract_true'], no_cheese_buffer)
+                        job = executor.submit(_no_cheese_union, *operands)
+                        jobs[chip_name, chip_layer, 'no_cheese_union'] = job
+
+            for (chip_name, chip_layer, key), job in jobs.items():
+                self.chip_info[chip_name][chip_layer][key] = job.result()
+
     def _handle_q_subtract_false(self, chip_name: str, chip_layer: int,
                                  ground_cell: gdspy.library.Cell):
         """For each layer, add the subtract=false components to ground.
@@ -2127,6 +2283,12 @@ class QGDSRenderer(QRenderer):
         self.chip_info.update(self._get_chip_names())
 
         if self._create_qgeometry_for_gds(highlight_qcomponents) == 0:
+            # Compute the boolean operations of every chip and layer
+            # up front, in a pool of processes, if requested.
+            if is_true(self.options.parallel.enable) and is_true(
+                    self.options.ground_plane):
+                self._compute_layers_in_parallel()
+
             # Create self.lib and populate path and poly.
             self._populate_poly_path_for_export()
 
@@ -2208,6 +2370,52 @@ class QGDSRenderer(QRenderer):
                 all_gds.append(exterior_poly)
         return all_gds
 
+    def _qgeometry_table_to_gds(self, table: geopandas.GeoDataFrame) -> list:
+        """Convert a whole table of QGeometry to the format used by the GDS
+        renderer.
+
+        The Polygons without holes are gathered in one pass and emitted as a
+        single fractured gdspy.PolygonSet per layer. The other rows, i.e.
+        LineStrings and Polygons with holes, are converted one by one with
+        _qgeometry_to_gds().
+
+        Args:
+            table (geopandas.GeoDataFrame): Rows of QGeometry to convert.
+
+        Returns:
+            list: The gdspy elements. Rows which can not be converted are
+            left out.
+        """
+        if len(table) == 0:
+            return []
+
+        precision = self.parse_value(self.options.precision)
+        max_points = int(self.parse_value(self.options.max_points))
+
+        is_simple_poly = np.array([
+            isinstance(geom, shapely.geometry.Polygon) and not geom.interiors
+            for geom in table.geometry
+        ],
+                                  dtype=bool)
+
+        all_gds = list()
+        simple_polys = table[is_simple_poly]
+        for layer, layer_polys in simple_polys.groupby('layer', sort=True):
+            all_exteriors = [
+                np.array(geom.exterior.coords) for geom in layer_polys.geometry
+            ]
+            a_poly_set = gdspy.PolygonSet(all_exteriors,
+                                          layer=layer,
+                                          datatype=10)
+            all_gds.append(
+                a_poly_set.fracture(max_points=max_points, precision=precision))
+
+        for _, row in table[~is_simple_poly].iterrows():
+            a_gds = self._qgeometry_to_gds(row)
+            if a_gds is not None:
+                all_gds.append(a_gds)
+        return all_gds
+
     def _qgeometry_to_gds(
         self, qgeometry_element: pd.Series
     ) -> Union['gdspy.polygon', 'gdspy.FlexPath', None]:
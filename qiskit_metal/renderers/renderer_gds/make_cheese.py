@@ -17,6 +17,7 @@ import logging
 from typing import Union
 import gdspy
 import shapely
+from shapely.strtree import STRtree
 import numpy as np
 
 
@@ -62,6 +63,9 @@ class Cheesing():
         # delta spacing for holes
         delta_x: float = 0.00010,
         delta_y: float = 0.00010,
+
+        # holes along each side of a tile of the grid of holes
+        holes_per_tile: int = 16,
     ):
         """Create the cheesing based on the no-cheese multi_poly.
 
@@ -109,6 +113,11 @@ class Cheesing():
                                     Defaults to 0.000025.
             delta_x (float, optional): The spacing between holes in x.
             delta_y (float, optional): The spacing between holes in y.
+            holes_per_tile (int, optional): The grid of holes is split in
+                                    tiles of holes_per_tile x holes_per_tile
+                                    holes. Only the tiles which intersect the
+                                    no-cheese region need boolean operations.
+                                    Defaults to 16.
         """
 
         # All the no-cheese locations.
@@ -165,6 +174,11 @@ class Cheesing():
         self.one_hole_cell = None
 
         self.hole = None
+        self.hole_gds = None
+
+        # Tiles of the grid of holes, see _get_tiles().
+        self.holes_per_tile = holes_per_tile
+        self.tiles = list()
 
     def apply_cheesing(self) -> gdspy.GdsLibrary:
         """Prototype, not complete.
@@ -266,6 +280,7 @@ class Cheesing():
             hole_type = type(self.hole)
             self.logger.warning(f'The self.hole was not converted to gdspy; '
                                 f'the type \'{hole_type}\' was not handled.')
+        self.hole_gds = a_poly
 
         #convert a_poly to cell, then use cell reference to add to all the cheese in chip_rect_gds
         chip_layer_only_top_name = f'TOP_{self.chip_name}_{self.layer}'
@@ -290,10 +305,7 @@ class Cheesing():
         geometry. The cells are added to the Top_<chip_name>.
         """
 
-        gather_holes_cell = self._get_all_holes()
-        diff_holes_cell = self._subtract_keepout_from_hole_grid(
-            gather_holes_cell)
-        self.lib.remove(gather_holes_cell)
+        diff_holes_cell = self._subtract_keepout_from_hole_grid()
 
         cell_name = f'TOP_{self.chip_name}_{self.layer}'
         cell_layer = self.lib.cells[cell_name]
@@ -357,69 +369,141 @@ class Cheesing():
             else:
                 self.lib.remove(diff_holes_cell)
 
-    def _subtract_keepout_from_hole_grid(
-            self, gather_holes_cell: gdspy.library.Cell) -> gdspy.library.Cell:
-        """Given a cell with all the holes, subtract the keepout region.
-        Then return a new cell with the result.
+    def _subtract_keepout_from_hole_grid(self) -> gdspy.library.Cell:
+        """Subtract the keepout region from the grid of holes. Then return a
+        new cell with the result.
 
-        Args:
-            gather_holes_cell (gdspy.library.Cell): Holds a grid of all
-                                                the holes for cheesing.
+        The grid is split into tiles, see _get_tiles(). A spatial index of
+        the keepout finds the tiles that intersect it; only those are
+        flattened and go through a boolean. The other tiles are added to the
+        cell as a gdspy.CellArray of the hole. Only the holes of the tiles
+        with keepout are kept in self.tiles; those of the other tiles are
+        only made when subtracting from the ground, see
+        _subtract_holes_from_ground().
 
         Returns:
             gdspy.library.Cell: Newly created cell that holds the difference
                                         of holes minus the keep=out region.
         """
-
-        # subtact the keepout, note, Based on user options,
-        # the keepout (no_cheese) cell may not be in self.lib.
-        temp_keepout_chip_layer_cell = f'temp_keepout_{self.chip_name}_{self.layer}'
-        temp_keepout_cell = self.lib.new_cell(temp_keepout_chip_layer_cell,
-                                              overwrite_duplicate=True)
-        temp_keepout_cell.add(self.nocheese_gds)
-        diff_holes = gdspy.boolean(gather_holes_cell.get_polygonsets(),
-                                   temp_keepout_cell.get_polygonsets(),
-                                   'not',
-                                   max_points=self.max_points,
-                                   precision=self.precision,
-                                   layer=self.layer,
-                                   datatype=self.datatype_cheese + 1)
         diff_holes_cell_name = f'TOP_{self.chip_name}_{self.layer}_Cheese_diff'
         diff_holes_cell = self.lib.new_cell(diff_holes_cell_name,
                                             overwrite_duplicate=True)
-        diff_holes_cell.add(diff_holes)
+        if self.hole_gds is None:
+            return diff_holes_cell
+
+        # The hole on the datatype of the difference, for the arrays.
+        hole_polygons = self.hole_gds.polygons
+        array_hole_cell_name = f'TOP_{self.chip_name}_{self.layer}_Cheese_hole'
+        array_hole_cell = self.lib.new_cell(array_hole_cell_name,
+                                            overwrite_duplicate=True)
+        array_hole_cell.add(
+            gdspy.PolygonSet(hole_polygons,
+                             layer=self.layer,
+                             datatype=self.datatype_cheese + 1))
+
+        # Spatial index of the keepout, note, Based on user options,
+        # the keepout (no_cheese) cell may not be in self.lib.
+        # The entries of self.nocheese_gds follow the polygons of
+        # self.multi_poly.
+        keepout_polys = list(self.multi_poly) if self.multi_poly else []
+        keepout_idx = {
+            id(poly): index for index, poly in enumerate(keepout_polys)
+        }
+        keepout_tree = STRtree(keepout_polys)
+
+        for tile in self._get_tiles():
+            tile_box = shapely.geometry.box(*tile['bounds'])
+            keepout = [
+                self.nocheese_gds[keepout_idx[id(poly)]]
+                for poly in keepout_tree.query(tile_box)
+                if poly.intersects(tile_box)
+            ]
+            if not keepout:
+                diff_holes_cell.add(
+                    gdspy.CellArray(array_hole_cell,
+                                    tile['columns'],
+                                    tile['rows'], (self.delta_x, self.delta_y),
+                                    origin=tile['origin']))
+                continue
+
+            tile_holes = self._get_tile_holes(tile, hole_polygons)
+            diff_holes = gdspy.boolean(tile_holes,
+                                       keepout,
+                                       'not',
+                                       max_points=self.max_points,
+                                       precision=self.precision,
+                                       layer=self.layer,
+                                       datatype=self.datatype_cheese + 1)
+            if diff_holes is not None:
+                diff_holes_cell.add(diff_holes)
+                tile['holes'] = diff_holes.polygons
+            else:
+                tile['holes'] = []
 
-        self.lib.remove(temp_keepout_chip_layer_cell)
+        if not diff_holes_cell.references:
+            self.lib.remove(array_hole_cell)
         return diff_holes_cell
 
-    def _get_all_holes(self) -> gdspy.library.Cell:
-        """Return a cell with a grid of holes. The keepout has not been
-        applied yet.
+    def _get_hole_locations(self) -> Union[np.ndarray, np.ndarray]:
+        """Return the centers of the holes of the grid, in x and in y.
 
         Returns:
-            gdspy.library.Cell: Cell containing all the holes.
+            Union[np.ndarray, np.ndarray]: x locations and y locations.
         """
-        gather_holes_cell_name = f'Gather_holes_{self.chip_name}_{self.layer}'
-        gather_holes_cell = self.lib.new_cell(gather_holes_cell_name,
-                                              overwrite_duplicate=True)
-
         x_holes = np.arange(self.grid_minx,
                             self.grid_maxx,
                             self.delta_x,
-                            dtype=float).tolist()
+                            dtype=float)
         y_holes = np.arange(self.grid_miny,
                             self.grid_maxy,
                             self.delta_y,
-                            dtype=float).tolist()
+                            dtype=float)
+        return x_holes, y_holes
+
+    def _get_tiles(self) -> list:
+        """Split the grid of holes into tiles of at most holes_per_tile x
+        holes_per_tile holes, and place them in self.tiles.
+
+        The bounds of a tile extend half a spacing beyond its outer holes, so
+        the tiles do not overlap and each hole is inside its tile.
+
+        Returns:
+            list: For each tile, a dict with the origin (first hole),
+            the columns and rows of holes, and the bounds.
+        """
+        x_holes, y_holes = self._get_hole_locations()
+        half_x, half_y = self.delta_x / 2, self.delta_y / 2
+
+        self.tiles = list()
+        for x_start in range(0, len(x_holes), self.holes_per_tile):
+            x_tile = x_holes[x_start:x_start + self.holes_per_tile]
+            for y_start in range(0, len(y_holes), self.holes_per_tile):
+                y_tile = y_holes[y_start:y_start + self.holes_per_tile]
+                self.tiles.append(
+                    dict(origin=(x_tile[0], y_tile[0]),
+                         columns=len(x_tile),
+                         rows=len(y_tile),
+                         bounds=(x_tile[0] - half_x, y_tile[0] - half_y,
+                                 x_tile[-1] + half_x, y_tile[-1] + half_y)))
+        return self.tiles
+
+    def _get_tile_holes(self, tile: dict, hole_polygons: list) -> list:
+        """Return the polygons of all the holes of a tile.
 
-        if self.one_hole_cell is not None:
-            for x_loc in x_holes:
-                for y_loc in y_holes:
-                    gather_holes_cell.add(
-                        gdspy.CellReference(self.one_hole_cell,
-                                            origin=(x_loc, y_loc)))
+        Args:
+            tile (dict): A tile from _get_tiles().
+            hole_polygons (list): The polygons of the hole at (x=0,y=0).
 
-        return gather_holes_cell
+        Returns:
+            list: The polygons of the holes of the tile.
+        """
+        x_0, y_0 = tile['origin']
+        offsets = [(x_0 + column * self.delta_x, y_0 + row * self.delta_y)
+                   for column in range(tile['columns'])
+                   for row in range(tile['rows'])]
+        return [
+            polygon + offset for offset in offsets for polygon in hole_polygons
+        ]
 
     def _subtract_holes_from_ground(
             self, diff_holes_cell) -> Union[gdspy.library.Cell, None]:
@@ -429,6 +513,9 @@ class Cheesing():
 
         Args:
             diff_holes_cell ([type]): Cell which contains all the holes.
+                                The holes are subtracted per tile, using
+                                the holes kept in self.tiles, or all the
+                                holes of the tile when it has no keepout.
 
         Returns:
             Union[gdspy.library.Cell, None]: If worked, the new cell with
@@ -442,24 +529,98 @@ class Cheesing():
             ground_cell = self.lib.cells[ground_cell_name]
             # Need to keep the depth at 0, otherwise all the
             # cell references (junctions) will be added for boolean.
-            ground_cheese = gdspy.boolean(ground_cell.get_polygons(depth=0),
-                                          diff_holes_cell.get_polygonsets(),
-                                          'not',
-                                          max_points=self.max_points,
-                                          precision=self.precision,
-                                          layer=self.layer,
-                                          datatype=self.datatype_cheese)
+            ground_polygons = ground_cell.get_polygons(depth=0)
             ground_cheese_cell_name = (f'TOP_{self.chip_name}_{self.layer}'
                                        f'_Cheese_{self.datatype_cheese}')
             ground_cheese_cell = self.lib.new_cell(ground_cheese_cell_name,
                                                    overwrite_duplicate=True)
-            return ground_cheese_cell.add(ground_cheese)
+
+            # Subtract the holes tile by tile, rather than all the holes from
+            # all the ground in one boolean. The ground outside of the tiles
+            # has no holes.
+            if self.tiles:
+                grid_rectangle = self._bounds_to_rectangle(
+                    self.tiles[0]['bounds'][:2] + self.tiles[-1]['bounds'][2:])
+            else:
+                grid_rectangle = []
+            ground_cheese_cell.add(
+                self._boolean_or_empty(ground_polygons, grid_rectangle, 'not',
+                                       self.max_points))
+
+            ground_boxes = [
+                shapely.geometry.box(*polygon.min(axis=0), *polygon.max(axis=0))
+                for polygon in ground_polygons
+            ]
+            ground_idx = {
+                id(box): index for index, box in enumerate(ground_boxes)
+            }
+            ground_tree = STRtree(ground_boxes)
+
+            for tile in self.tiles:
+                tile_box = shapely.geometry.box(*tile['bounds'])
+                tile_ground = [
+                    ground_polygons[ground_idx[id(box)]]
+                    for box in ground_tree.query(tile_box)
+                ]
+                if not tile_ground:
+                    continue
+                # max_points=0 to not fracture before the last boolean.
+                tile_ground = self._boolean_or_empty(
+                    tile_ground, self._bounds_to_rectangle(tile['bounds']),
+                    'and', 0)
+                holes = tile.get('holes')
+                if holes is None:  # no keepout in the tile
+                    holes = self._get_tile_holes(tile, self.hole_gds.polygons)
+                ground_cheese_cell.add(
+                    self._boolean_or_empty(tile_ground, holes, 'not',
+                                           self.max_points))
+
+            return ground_cheese_cell
 
         self.logger.warning(
             f'The cell:{top_chip_layer_name} was not found in self.lib. '
             f'Cheesing not implemented.')
         return None
 
+    @staticmethod
+    def _bounds_to_rectangle(bounds: tuple) -> list:
+        """Return a rectangle as a list with one polygon.
+
+        Args:
+            bounds (tuple): minx, miny, maxx, maxy of the rectangle.
+
+        Returns:
+            list: The polygon of the rectangle, for gdspy.boolean.
+        """
+        minx, miny, maxx, maxy = bounds
+        return [
+            np.array([(minx, miny), (maxx, miny), (maxx, maxy), (minx, maxy)])
+        ]
+
+    def _boolean_or_empty(self, operand1: list, operand2: list, operation: str,
+                          max_points: int) -> list:
+        """Run gdspy.boolean on the layer and datatype of the cheesed ground.
+
+        Args:
+            operand1 (list): Polygons of the first operand.
+            operand2 (list): Polygons of the second operand.
+            operation (str): 'or', 'and', 'xor' or 'not'.
+            max_points (int): Used in gdspy, 0 to not fracture.
+
+        Returns:
+            list: The polygons of the result, empty if there are none.
+        """
+        result = gdspy.boolean(operand1,
+                               operand2,
+                               operation,
+                               max_points=max_points,
+                               precision=self.precision,
+                               layer=self.layer,
+                               datatype=self.datatype_cheese)
+        if result is None:
+            return []
+        return [result]
+
     def _move_to_under_top_chip_layer_name(self, a_cell: gdspy.library.Cell):
         """Move the cell to under TOP_<chip name>_<layer number>.
 
@@ -480,6 +641,10 @@ class Cheesing():
         cell_name = f'TOP_{self.chip_name}_{self.layer}_Cheese_diff'
         if cell_name in self.lib.cells:
             self.lib.remove(cell_name)
+        # The hole used by the arrays of the Cheese_diff cell.
+        cell_name = f'TOP_{self.chip_name}_{self.layer}_Cheese_hole'
+        if cell_name in self.lib.cells:
+            self.lib.remove(cell_name)
 
     def _remove_ground_chip_layer(self):
         """[For a lib, chip and layer, remove the ground cell
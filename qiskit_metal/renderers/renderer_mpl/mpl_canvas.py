@@ -373,6 +373,12 @@ class PlotCanvas(FigureCanvas):
                                            design=self.design,
                                            logger=logger)
 
+        # Renders the visible window again once panning or zooming pauses
+        self._view_timer = QTimer(self)
+        self._view_timer.setSingleShot(True)
+        self._view_timer.setInterval(150)
+        self._view_timer.timeout.connect(self._update_view)
+
         # self.plot()
         # self.welcome_message()
 
@@ -476,7 +482,11 @@ class PlotCanvas(FigureCanvas):
             # for temporary style
             with mpl.rc_context(rc=self.mpl_context):
                 if clear:
+                    # Keep the limits, the renderer only draws what they show
+                    xlim, ylim = ax.get_xlim(), ax.get_ylim()
                     self.clear_axis(ax)
+                    ax.set_xlim(xlim)
+                    ax.set_ylim(ylim)
                 self._plot(ax)
                 self._watermark_axis(ax)
 
@@ -503,6 +513,40 @@ class PlotCanvas(FigureCanvas):
             main_plot()
             final()
 
+    def update_plot(self):
+        """Redraw only the components that were rebuilt, added or deleted
+        since the last plot, rather than clearing the axis and drawing the
+        whole design. See `QMplRenderer.update_components`.
+        """
+        if self.metal_renderer.ax is not self.get_axis():
+            # Nothing drawn on this axis yet
+            self.plot()
+            return
+
+        ax = self.get_axis()
+        try:
+            with mpl.rc_context(rc=self.mpl_context):
+                self.metal_renderer.update_components(ax)
+        except Exception as e:
+            log_error_easy(self.logger, post_text=f'Plotting error: {e}')
+        self.draw_idle()
+
+    def request_view_update(self):
+        """Ask for the visible window of the design to be rendered again.
+
+        Called by the renderer while panning or zooming; the render happens
+        once the limits have not changed for a short while.
+        """
+        self._view_timer.start()
+
+    def _update_view(self):
+        """Render the tables again for the current limits, without clearing
+        the axis."""
+        ax = self.get_axis()
+        with mpl.rc_context(rc=self.mpl_context):
+            self.metal_renderer.update_view(ax)
+        self.draw_idle()
+
     def _watermark_axis(self, ax: plt.Axes):
         """Add a watermark.
 
@@ -29,11 +29,12 @@ from matplotlib.axes import Axes
 from matplotlib.backends.backend_qt5agg import \
     FigureCanvasQTAgg as FigureCanvas
 from matplotlib.cbook import _OrderedSet
-from matplotlib.collections import LineCollection, PatchCollection
+from matplotlib.collections import (LineCollection, PatchCollection,
+                                    PolyCollection)
 from matplotlib.figure import Figure
 from matplotlib.transforms import Bbox
 
-from shapely.geometry import CAP_STYLE, JOIN_STYLE, LineString
+from shapely.geometry import LineString
 
 from ... import Dict
 from ...designs import QDesign
@@ -43,7 +44,7 @@ from .mpl_toolbox import _axis_set_watermark_img, clear_axis, get_prop_cycle
 from .. import config
 if not config.is_building_docs():
     from ...toolbox_python.utility_functions import log_error_easy
-    from qiskit_metal.toolbox_python.utility_functions import bad_fillet_idxs
+    from qiskit_metal.toolbox_python.utility_functions import fillet_corner, fillet_path_coords
 
 if TYPE_CHECKING:
     from ..._gui.main_window import MetalGUI
@@ -76,7 +77,26 @@ class QMplRenderer():
         self.canvas = canvas
         self.ax = None
         self.design = design
-        self.options = Dict(resolution='16',)
+        self.options = Dict(
+            resolution='16',
+            # Only render the qgeometry that intersects the axis window,
+            # grown by view_margin times its size on each side.
+            cull_to_view=True,
+            view_margin=0.5,
+            # Rows smaller than this many pixels are drawn as their bounding
+            # box, without fillet or buffer.
+            lod_pixels=1.0,
+        )
+
+        # Window and pixel size of the last render of the tables, see
+        # `view_is_stale`.
+        self._view = None
+        self._view_callbacks = (None, [])
+
+        # Collections on the axis for each component, and the build id of
+        # the component when they were drawn, see `update_components`.
+        self._component_artists = dict()  # component id -> list of artists
+        self._drawn_build_ids = dict()  # component id -> build id
 
         # Filter view options
         self.hidden_layers = set()
@@ -151,7 +171,224 @@ class QMplRenderer():
         """
 
         self.logger.debug('Rendering element tables to plot window.')
+        self.ax = ax
+        self._component_artists = dict()
+        self._drawn_build_ids = dict()
         self.render_tables(ax)
+        self._connect_view_callbacks(ax)
+
+    def update_view(self, ax: Axes = None):
+        """Render the tables again for the current axis window, replacing the
+        collections of the previous render. The rest of the axis is left
+        untouched.
+
+        Args:
+            ax (matplotlib.axes.Axes): mpl axis to draw on.
+                Defaults to the axis of the last render.
+        """
+        ax = ax or self.ax
+        self._remove_component_artists(list(self._component_artists))
+        self.render_tables(ax)
+
+    def update_components(self, ax: Axes = None) -> list:
+        """Redraw only the components that were rebuilt, added or deleted
+        since they were last drawn, leaving the collections of the others on
+        the axis. Components are compared by their build id.
+
+        Args:
+            ax (matplotlib.axes.Axes): mpl axis to draw on.
+                Defaults to the axis of the last render.
+
+        Returns:
+            list: Ids of the components that were removed or redrawn.
+        """
+        ax = ax or self.ax
+        components = self.design._components  # pylint: disable=protected-access
+        drawn = self._drawn_build_ids
+        changed = [
+            component_id for component_id in set(drawn).union(components)
+            if component_id not in components or
+            drawn.get(component_id) != components[component_id]._build_id
+        ]
+        self._remove_component_artists(changed)
+        redraw = [
+            component_id for component_id in changed
+            if component_id in components
+        ]
+        if redraw:
+            self.render_tables(ax, component_ids=redraw)
+        return changed
+
+    def _remove_component_artists(self, component_ids: list):
+        """Remove the collections of the given components from the axis."""
+        for component_id in component_ids:
+            for artist in self._component_artists.pop(component_id, []):
+                artist.remove()
+            self._drawn_build_ids.pop(component_id, None)
+
+    def _add_collections(self, ax: Axes, make_collection, items: list,
+                         components: pd.Series):
+        """Add one collection per component to the axis, so that a component
+        can be redrawn on its own.
+
+        Args:
+            ax (matplotlib.axes.Axes): Axis to render on
+            make_collection (callable): Makes the collection from a list of
+                items.
+            items (list): Patches, vertices or lines, one per row.
+            components (pd.Series): Component id of each row.
+        """
+        items = list(items)
+        components = np.asarray(components)
+        order = np.argsort(components, kind='stable')
+        component_ids, starts = np.unique(components[order], return_index=True)
+        groups = np.split(order, starts[1:])
+        for component_id, idx in zip(component_ids, groups):
+            collection = make_collection([items[i] for i in idx])
+            ax.add_collection(collection)
+            self._component_artists.setdefault(int(component_id),
+                                               []).append(collection)
+
+    def view_is_stale(self, ax: Axes) -> bool:
+        """Whether the last render does not cover the axis window, or was
+        made at less than half the current zoom.
+
+        Args:
+            ax (matplotlib.axes.Axes): mpl axis
+
+        Returns:
+            bool: True if `update_view` should be called.
+        """
+        if self._view is None:
+            return False
+        minx, miny, maxx, maxy = self._get_axis_window(ax)
+        if (minx < self._view.bounds[0] or miny < self._view.bounds[1] or
+                maxx > self._view.bounds[2] or maxy > self._view.bounds[3]):
+            return True
+        # Zoomed in: drop what went off screen and show the small rows
+        return self._get_pixel_size(ax) < self._view.pixel / 2
+
+    def _on_limits_changed(self, ax: Axes):
+        """Called by mpl when the limits of the axis change."""
+        if self.view_is_stale(ax):
+            if self.canvas is None:
+                self.update_view(ax)
+            else:
+                self.canvas.request_view_update()
+
+    def _connect_view_callbacks(self, ax: Axes):
+        """Follow the limits of the axis, so that panning or zooming out of
+        the rendered window renders it again. Clearing the axis drops the
+        callbacks, so this is done on each render.
+
+        Args:
+            ax (matplotlib.axes.Axes): mpl axis
+        """
+        registry, cids = self._view_callbacks
+        if registry is ax.callbacks:
+            for cid in cids:
+                registry.disconnect(cid)
+        cids = [
+            ax.callbacks.connect(signal, self._on_limits_changed)
+            for signal in ('xlim_changed', 'ylim_changed')
+        ]
+        self._view_callbacks = (ax.callbacks, cids)
+
+    @staticmethod
+    def _get_axis_window(ax: Axes) -> tuple:
+        """Return minx, miny, maxx, maxy of the axis limits."""
+        xlim = sorted(ax.get_xlim())
+        ylim = sorted(ax.get_ylim())
+        return xlim[0], ylim[0], xlim[1], ylim[1]
+
+    def _get_pixel_size(self, ax: Axes) -> float:
+        """Return the size of a screen pixel in design units, or 0 if the
+        axis has no extent on screen."""
+        minx, miny, maxx, maxy = self._get_axis_window(ax)
+        width, height = ax.bbox.width, ax.bbox.height
+        if width <= 0 or height <= 0:
+            return 0.
+        return max((maxx - minx) / width, (maxy - miny) / height)
+
+    def _get_design_bounds(self) -> tuple:
+        """Return minx, miny, maxx, maxy of all the qgeometry, or None."""
+        all_bounds = []
+        for component_id in self.design._components:
+            # pylint: disable=protected-access
+            bounds = self.qgeometry._get_component_bounds(component_id)
+            if bounds is not None:
+                all_bounds.append(bounds)
+        if not all_bounds:
+            return None
+        all_bounds = np.array(all_bounds)
+        return (*all_bounds[:, :2].min(axis=0), *all_bounds[:, 2:].max(axis=0))
+
+    def _cull_table(self, table: pd.DataFrame, window: tuple,
+                    pixel: float) -> tuple:
+        """Keep the rows of a table that intersect the window, and split off
+        those smaller than `lod_pixels` pixels.
+
+        The components in the window are found with the spatial index of the
+        qgeometry tables, then their rows are tested against the window.
+
+        Args:
+            table (DataFrame): Element table
+            window (tuple): minx, miny, maxx, maxy to render
+            pixel (float): Size of a pixel in design units
+
+        Returns:
+            tuple: The rows to render in full, and a DataFrame of the minx,
+            miny, maxx, maxy and subtract of the small rows.
+        """
+        components = self.qgeometry.get_components_in_bounds(window)
+        table = table[table.component.isin(components)]
+        if len(table) < 1:
+            return table, table
+
+        bounds = np.array([geom.bounds for geom in table.geometry])
+        bounds = bounds.reshape(-1, 4)
+        if 'width' in table:
+            half_width = table.width.fillna(0).to_numpy(dtype=float) / 2.
+            bounds = bounds + np.outer(half_width, [-1, -1, 1, 1])
+        visible = ((bounds[:, 0] <= window[2]) & (bounds[:, 2] >= window[0]) &
+                   (bounds[:, 1] <= window[3]) & (bounds[:, 3] >= window[1]))
+        size = np.maximum(bounds[:, 2] - bounds[:, 0],
+                          bounds[:, 3] - bounds[:, 1])
+        small = visible & (size < float(self.options.lod_pixels) * pixel)
+
+        boxes = pd.DataFrame(bounds[small],
+                             columns=['minx', 'miny', 'maxx', 'maxy'])
+        boxes['subtract'] = table['subtract'].to_numpy()[small]
+        boxes['component'] = table['component'].to_numpy()[small]
+        return table[visible & ~small], boxes
+
+    def _render_boxes(self,
+                      boxes: pd.DataFrame,
+                      ax: Axes,
+                      subtracted: bool = False):
+        """Render rectangles in the poly style. Faster than building a
+        patch per shapely geometry.
+
+        Args:
+            boxes (DataFrame): minx, miny, maxx, maxy and component of
+                each rectangle
+            ax (matplotlib.axes.Axes): Axis to render on
+            subtracted (bool): True for subtracted rows. Defaults to False.
+        """
+        if len(boxes) < 1:
+            return
+        minx, miny, maxx, maxy = boxes[['minx', 'miny', 'maxx',
+                                        'maxy']].to_numpy().T
+        verts = np.stack([
+            np.stack([minx, miny], axis=-1),
+            np.stack([maxx, miny], axis=-1),
+            np.stack([maxx, maxy], axis=-1),
+            np.stack([minx, maxy], axis=-1)
+        ],
+                         axis=1)
+        kw = self.get_style('poly', subtracted=subtracted)
+        self._add_collections(ax, lambda verts: PolyCollection(verts, **kw),
+                              verts, boxes['component'])
 
     def get_mask(self, table: pd.DataFrame) -> pd.Series:
         """Gets the mask.
@@ -170,16 +407,20 @@ class QMplRenderer():
 
         return ~mask  # not
 
-    def _render_poly_array(self, ax: Axes, poly_array: np.array, mpl_kw: dict):
+    def _render_poly_array(self, ax: Axes, poly_array: np.array, mpl_kw: dict,
+                           components: pd.Series):
         """Render the poly array.
         Args:
             ax (Axes): The axis
             poly_array (np.array): The poly
             mpl_kw (dict): The parameters dictionary
+            components (pd.Series): Component id of each poly
         """
         if len(poly_array) > 0:
             poly_array = to_poly_patch(poly_array)
-            ax.add_collection(PatchCollection(poly_array, **mpl_kw))
+            self._add_collections(
+                ax, lambda patches: PatchCollection(patches, **mpl_kw),
+                poly_array, components)
 
     @property
     def qgeometry(self) -> 'QGeometryTables':
@@ -237,14 +478,50 @@ class QMplRenderer():
 
         return kw
 
-    def render_tables(self, ax: Axes):
+    def render_tables(self, ax: Axes, component_ids: list = None):
         """Render the tables.
+        With `cull_to_view`, only the rows in the axis window (plus margin)
+        are rendered, and rows smaller than `lod_pixels` pixels are drawn as
+        their bounding box. The data limits of the axis still span the whole
+        design, so that autoscale shows all of it.
+
         Args:
             ax (Axes): The axes
+            component_ids (list): Only render the rows of these components,
+                in the window of the last render. Defaults to None for all
+                the components.
         """
+        components = self.design._components  # pylint: disable=protected-access
+        partial = component_ids is not None
+        if not partial:
+            component_ids = list(components)
+        self._drawn_build_ids.update(
+            (component_id, components[component_id]._build_id)
+            for component_id in component_ids)
+
+        if not (partial and self.options.cull_to_view):
+            self._view = None
+        if self.options.cull_to_view and self._view is None:
+            minx, miny, maxx, maxy = self._get_axis_window(ax)
+            margin = float(self.options.view_margin)
+            dx, dy = margin * (maxx - minx), margin * (maxy - miny)
+            self._view = Dict(bounds=(minx - dx, miny - dy, maxx + dx,
+                                      maxy + dy),
+                              pixel=self._get_pixel_size(ax))
+
         for element_type, table in self.qgeometry.tables.items():
             # Mask the table
             table = table[self.get_mask(table)]
+            if partial:
+                table = table[table.component.isin(component_ids)]
+
+            if self._view is not None:
+                table, boxes = self._cull_table(table, self._view.bounds,
+                                                self._view.pixel)
+                if len(boxes) > 0:
+                    mask = boxes['subtract'] == True
+                    self._render_boxes(boxes[mask], ax, subtracted=True)
+                    self._render_boxes(boxes[~mask], ax, subtracted=False)
 
             # subtracted
             mask = table['subtract'] == True
@@ -260,6 +537,11 @@ class QMplRenderer():
             render_func = getattr(self, f'render_{element_type}')
             render_func(table1, ax, subtracted=False)
 
+        if self._view is not None:
+            design_bounds = self._get_design_bounds()
+            if design_bounds is not None:
+                ax.update_datalim([design_bounds[:2], design_bounds[2:]])
+
     def render_junction(self,
                         table: pd.DataFrame,
                         ax: Axes,
@@ -276,13 +558,10 @@ class QMplRenderer():
             mask = (table.width == 0) | table.width.isna()
             table1 = table[~mask]
             if len(table1) > 0:
-                table1.geometry = table1[['geometry', 'width']].apply(
-                    lambda x: x[0].buffer(distance=float(x[1]) / 2.,
-                                          cap_style=CAP_STYLE.flat,
-                                          join_style=JOIN_STYLE.mitre,
-                                          resolution=int(self.options[
-                                              'resolution'])),
-                    axis=1)
+                table1.geometry = self.qgeometry.get_rendered_outlines(
+                    table1,
+                    resolution=int(self.options['resolution']),
+                    fillet=False)
                 kw = self.get_style('JJ', subtracted=subtracted, extra=extra_kw)
                 self.render_poly(table1, ax, subtracted=subtracted, extra_kw=kw)
             table1 = table[mask]
@@ -306,7 +585,7 @@ class QMplRenderer():
             return
 
         kw = self.get_style('poly', subtracted=subtracted, extra=extra_kw)
-        self._render_poly_array(ax, table.geometry, kw)
+        self._render_poly_array(ax, table.geometry, kw, table.component)
 
     def render_fillet(self, table):
         """Renders fillet path.
@@ -330,27 +609,10 @@ class QMplRenderer():
         path = row["geometry"].coords
         if len(path) <= 2:  # only start and end points, no need to fillet
             return row["geometry"]
-        newpath = np.array([path[0]])
-
-        # Get list of vertices that can't be filleted
-        no_fillet = bad_fillet_idxs(path, row["fillet"],
-                                    self.design.template_options.PRECISION)
-
-        # Iterate through every three-vertex corner
-        for (i, (start, corner, end)) in enumerate(zip(path, path[1:],
-                                                       path[2:])):
-            if i + 1 in no_fillet:  # don't fillet this corner
-                newpath = np.concatenate((newpath, np.array([corner])))
-            else:
-                fillet = self._calc_fillet(np.array(start), np.array(corner),
-                                           np.array(end), row["fillet"],
-                                           int(self.options['resolution']))
-                if fillet is not False:
-                    newpath = np.concatenate((newpath, fillet))
-                else:
-                    newpath = np.concatenate((newpath, np.array([corner])))
-        newpath = np.concatenate((newpath, np.array([end])))
-        return LineString(newpath)
+        return LineString(
+            fillet_path_coords(path, row["fillet"],
+                               int(self.options['resolution']),
+                               self.design.template_options.PRECISION))
 
     def _calc_fillet(self,
                      vertex_start,
@@ -359,7 +621,7 @@ class QMplRenderer():
                      radius,
                      points=16):
         """Returns the filleted path based on the start, corner, and end
-        vertices and the fillet radius.
+        vertices and the fillet radius. See `fillet_corner`.
         Args:
             vertex_start (np.ndarray): x-y coordinates of starting vertex.
             vertex_corner (np.ndarray): x-y coordinates of corner vertex.
@@ -367,73 +629,8 @@ class QMplRenderer():
             radius (float): Fillet radius.
             points (int): Number of points to draw in the fillet corner.
         """
-        # Start, corner, and end vertices must be distinct
-        if np.array_equal(vertex_start, vertex_corner) or np.array_equal(
-                vertex_end, vertex_corner):
-            return False
-
-        # Vectors pointing from corner to start and end vertices, respectively
-        # Also calculate their lengths and unit vectors
-        sc_vec = vertex_start - vertex_corner
-        ec_vec = vertex_end - vertex_corner
-        sc_norm = np.linalg.norm(sc_vec)
-        ec_norm = np.linalg.norm(ec_vec)
-        sc_uvec = sc_vec / sc_norm
-        ec_uvec = ec_vec / ec_norm
-
-        # Angle between previous unit vectors
-        end_angle = np.arccos(np.dot(sc_uvec, ec_uvec))
-
-        # Start, corner, and end vertices can't be collinear
-        if (end_angle == 0) or (end_angle == np.pi):
-            return False
-
-        # Fillet circle must be small enough to fit inside corner
-        if radius / np.tan(end_angle / 2) > min(sc_norm, ec_norm):
-            return False
-
-        # Unit vector pointing from corner vertex to center of fillet circle
-        net_uvec = (sc_uvec + ec_uvec) / np.linalg.norm(sc_uvec + ec_uvec)
-
-        # Coordinates of center of fillet circle
-        circle_center = vertex_corner + net_uvec * radius / np.sin(
-            end_angle / 2)
-
-        # Deltas represent displacement from corner vertex to circle center
-        # Midpoint angle from circle center to corner, wrt to horizontal extending from former
-        # Note: arctan is fine for angles in range (-pi / 2, pi / 2] but needs extra pi factor otherwise
-        delta_x = vertex_corner[0] - circle_center[0]
-        delta_y = vertex_corner[1] - circle_center[1]
-        if delta_x:
-            theta_mid = np.arctan(delta_y / delta_x) + np.pi * int(delta_x < 0)
-        else:
-            theta_mid = np.pi * ((1 - 2 * int(delta_y < 0)) + int(delta_y < 0))
-
-        # Start and end sweep angles determined relative to midpoint angle
-        # Swap them as needed to resolve ambiguity in arctan
-        theta_start = theta_mid - (np.pi - end_angle) / 2
-        theta_end = theta_mid + (np.pi - end_angle) / 2
-        p1 = circle_center + radius * np.array(
-            [np.cos(theta_start), np.sin(theta_start)])
-        p2 = circle_center + radius * np.array(
-            [np.cos(theta_end), np.sin(theta_end)])
-        if np.linalg.norm(vertex_start - p2) < np.linalg.norm(vertex_start -
-                                                              p1):
-            theta_start, theta_end = theta_end, theta_start
-
-        # Populate the fillet corner, skipping the start point since it's already added
-        path = np.array([
-            circle_center + radius * np.array(
-                [np.cos(theta_start), np.sin(theta_start)])
-        ])
-        for theta in np.linspace(theta_start, theta_end, points)[1:]:
-            path = np.concatenate(
-                (path,
-                 np.array([
-                     circle_center + radius *
-                     np.array([np.cos(theta), np.sin(theta)])
-                 ])))
-        return path
+        return fillet_corner(vertex_start, vertex_corner, vertex_end, radius,
+                             points)
 
     def render_path(self,
                     table: pd.DataFrame,
@@ -459,18 +656,10 @@ class QMplRenderer():
         # convert to polys - handle non zero width
         table1 = table[~mask]
 
-        # if any are fillet, alter the path separately
-        table1.loc[table1.fillet.notnull(),
-                   'geometry'] = table1[table1.fillet.notnull()].apply(
-                       self.fillet_path, axis=1)
-
         if len(table1) > 0:
-            table1.geometry = table1[['geometry', 'width']].apply(lambda x: x[
-                0].buffer(distance=float(x[1]) / 2.,
-                          cap_style=CAP_STYLE.flat,
-                          join_style=JOIN_STYLE.mitre,
-                          resolution=int(self.options['resolution'])),
-                                                                  axis=1)
+            # filleted and buffered, cached by the qgeometry tables
+            table1.geometry = self.qgeometry.get_rendered_outlines(
+                table1, resolution=int(self.options['resolution']))
 
             kw = self.get_style('poly', subtracted=subtracted, extra=extra_kw)
 
@@ -483,8 +672,8 @@ class QMplRenderer():
         # TODO: speed and vectorize?
         if len(table1) > 0:
             kw = self.get_style('path', subtracted=subtracted, extra=extra_kw)
-            line_segments = LineCollection(table1.geometry)
-            ax.add_collection(line_segments)
+            self._add_collections(ax, LineCollection, table1.geometry,
+                                  table1.component)
 
 
 # DEFAULT['renderer_mpl'] = Dict(
@@ -530,4 +719,4 @@ class QMplRenderer():
 
 #             self.ax.annotate(name, xy=conn.middle[:2], xytext=conn.middle +
 #                              np.array(DEFAULT.annot_conectors.ofst),
-#                              **DEFAULT.annot_conectors.annotate_kw)
\ No newline at end of file
+#                              **DEFAULT.annot_conectors.annotate_kw)
@@ -18,17 +18,31 @@
 # pylint: disable-msg=too-many-public-methods
 """Qiskit Metal unit tests analyses functionality."""
 
+from fractions import Fraction
 from pathlib import Path
+import os
+import tempfile
 import unittest
 
 import numpy as np
 import pandas as pd
+import qutip
 
 from qiskit_metal.analyses.quantization import lumped_capacitive
+from qiskit_metal.analyses.quantization.lom_core_analysis import (
+    Cell, CompositeSystem, Subsystem)
 from qiskit_metal.analyses.hamiltonian.transmon_charge_basis import Hcpb
+from qiskit_metal.analyses.hamiltonian.transmon_charge_basis import HcpbBatch
 from qiskit_metal.analyses.hamiltonian.HO_wavefunctions import wavefunction
+from qiskit_metal.analyses.hamiltonian import states_energies
 from qiskit_metal.analyses.em import cpw_calculations, kappa_calculation
+from qiskit_metal.analyses.em.transmission_fitting import fit_transmission_batch
+from qiskit_metal.analyses.quantization import EPRanalysis
+from qiskit_metal.analyses.simulation import LumpedElementsSim
 from qiskit_metal.analyses.sweep_and_optimize.sweeper import Sweeper
+from qiskit_metal.analyses.sweep_and_optimize.sweep_scheduler import (
+    MockSolverBackend, SweepScheduler)
+from qiskit_metal.qlibrary.qubits.transmon_pocket import TransmonPocket
 from qiskit_metal.tests.assertions import AssertionsMixin
 from qiskit_metal import designs
 
@@ -167,6 +181,27 @@ class TestAnalyses(unittest.TestCase, AssertionsMixin):
         with self.assertRaises(ZeroDivisionError):
             cpw_calculations.elliptic_int_constants(0, 0, 0)
 
+    def test_analyses_cpw_broadcasting(self):
+        """Test that lumped_cpw and guided_wavelength in cpw_calculations.py
+        broadcast array arguments like the scalar calls."""
+        freq = np.array([4e9, 6e9])[:, None]
+        width = [8e-6, 10e-6, 15e-6]
+        lumped = cpw_calculations.lumped_cpw(freq, width, 6e-6, 760e-6, 200e-9)
+        wavelength = cpw_calculations.guided_wavelength(freq, width, 6e-6,
+                                                        760e-6, 200e-9)
+        self.assertEqual(np.broadcast(*lumped).shape, (2, 3))
+        self.assertEqual(wavelength[0].shape, (2, 3))
+
+        for i, j in np.ndindex(2, 3):
+            expected = cpw_calculations.lumped_cpw(freq[i, 0], width[j], 6e-6,
+                                                   760e-6, 200e-9)
+            actual = [np.broadcast_to(x, (2, 3))[i, j] for x in lumped]
+            self.assertIterableAlmostEqual(actual, expected)
+            self.assertAlmostEqual(
+                wavelength[0][i, j],
+                cpw_calculations.guided_wavelength(freq[i, 0], width[j], 6e-6,
+                                                   760e-6, 200e-9)[0])
+
     def test_analysis_lumped_ic_from_lj(self):
         """Test the Ic_from_Lj function in lumped_capacitives.py."""
         self.assertAlmostEqualRel(lumped_capacitive.Ic_from_Lj(5e9),
@@ -269,6 +304,61 @@ class TestAnalyses(unittest.TestCase, AssertionsMixin):
         with self.assertRaises(ValueError):
             lumped_capacitive.levels_vs_ng_real_units(100, 100, N=-10)
 
+    def test_analyses_lumped_extract_transmon_batch(self):
+        """Test extract_transmon_coupled_Noscillator_batch in lumped_capacitive.py
+        and its use by LOManalysis.run_lom."""
+        from qiskit_metal.analyses.quantization import LOManalysis
+
+        # bus1, bus2, ground, pad1, pad2, readout
+        base = -np.array([[0, 1, 30, 2, 1, 0.5], [1, 0, 30, 1, 2, 0.5],
+                          [30, 30, 0, 60, 60, 30], [2, 1, 60, 0, 25, 3],
+                          [1, 2, 60, 25, 0, 1], [0.5, 0.5, 30, 3, 1, 0]])
+        cmats = []
+        for scale in [1., 1.02, 1.03]:
+            cmat = base * scale
+            np.fill_diagonal(cmat, -cmat.sum(axis=1))
+            cmats.append(cmat * 1e-15)
+
+        args = (20e-9, 2e-15, 3, [6.0, 6.2], 7.0)
+        batch = lumped_capacitive.extract_transmon_coupled_Noscillator_batch(
+            np.array(cmats), *args)
+        self.assertEqual(len(batch), 3)
+        for cmat, ham_dict in zip(cmats, batch):
+            single = lumped_capacitive.extract_transmon_coupled_Noscillator(
+                cmat, *args)
+            self.assertEqual(sorted(single), sorted(ham_dict))
+            for key, value in single.items():
+                self.assertTrue(np.allclose(value, ham_dict[key], rtol=1e-9))
+        # results are copies of the memoized ones
+        batch[0]['gbus'][0] = 0
+        self.assertNotEqual(
+            lumped_capacitive.extract_transmon_coupled_Noscillator(
+                cmats[0], *args)['gbus'][0], 0)
+
+        with self.assertRaises(ValueError):
+            lumped_capacitive.extract_transmon_coupled_Noscillator_batch(
+                np.array(cmats), 20e-9, 2e-15, 2, [6.0], 7.0)
+
+        # the levels of all the capacitances, against the reference. disp,
+        # in Hz, is a difference of levels of a few GHz, hence the atol.
+        levels = lumped_capacitive._transmon_levels_vs_ng(
+            np.array([70e-15, 90e-15]), 20e-9)
+        for ii, cq_value in enumerate([70., 90.]):
+            reference = lumped_capacitive.levels_vs_ng_real_units(cq_value,
+                                                                  20.,
+                                                                  N=51)
+            for value, expected in zip(levels, reference):
+                self.assertTrue(
+                    np.isclose(value[ii], expected, rtol=1e-9, atol=1e-3))
+
+        lom = LOManalysis()
+        lom.setup.junctions.Lj = 8.17
+        lom.sim.capacitance_matrix = pd.DataFrame(cmats[-1])
+        lom.sim.capacitance_all_passes = {1: cmats[0], 2: cmats[1], 3: cmats[2]}
+        lom_all = lom.run_lom()
+        self.assertEqual(list(lom_all.index), [1, 2, 3])
+        self.assertAlmostEqual(lom.lumped_oscillator['fQ'], lom_all['fQ'][3])
+
     def test_analyses_lumped_get_c_and_ic(self):
         """Test the functionality of get_C_and_Ic in lumped_capacitives.py."""
         # Setup expected test results
@@ -765,12 +855,178 @@ class TestAnalyses(unittest.TestCase, AssertionsMixin):
         hcpb = Hcpb(nlevels=15, Ej=13971.3, Ec=295.2, ng=0.001)
         self.assertAlmostEqual(hcpb.n_ij(1, 2), 1.4670047579229986)
 
+    def test_analysis_transmon_charge_basis_batch(self):
+        """Test the HcpbBatch class against the Hcpb class."""
+        ej_values = np.array([13971.3, 12000.0, 18000.0])
+        ec_values = np.array([295.2, 250.0])
+        batch = HcpbBatch(nlevels=15,
+                          Ej=ej_values[:, None],
+                          Ec=ec_values[None, :],
+                          ng=0.001,
+                          chunk_size=4)
+        self.assertEqual(batch.shape, (3, 2))
+        self.assertEqual(batch.evecs.shape, (3, 2, 31, 31))
+
+        for x, ej_value in enumerate(ej_values):
+            for y, ec_value in enumerate(ec_values):
+                hcpb = Hcpb(nlevels=15, Ej=ej_value, Ec=ec_value, ng=0.001)
+                self.assertAlmostEqual(
+                    batch.evalue_k(2)[x, y], hcpb.evalue_k(2))
+                self.assertAlmostEqual(batch.fij(0, 1)[x, y], hcpb.fij(0, 1))
+                self.assertAlmostEqual(batch.anharm()[x, y], hcpb.anharm())
+                self.assertAlmostEqual(batch.n_ij(1, 2)[x, y], hcpb.n_ij(1, 2))
+
+        with self.assertRaises(ValueError):
+            HcpbBatch(nlevels=15, Ec=ec_values)
+
+    def test_analysis_states_energies_extract_energies(self):
+        """Test extract_energies in states_energies.py."""
+        mode_size = [4, 3]
+        self.assertEqual(
+            states_energies.basis_state_index(mode_size, {
+                0: 2,
+                1: 1
+            }),
+            np.argmax(
+                states_energies.basis_state_on(mode_size, {
+                    0: 2,
+                    1: 1
+                }).full()))
+
+        a_op = qutip.tensor(qutip.destroy(4), qutip.qeye(3))
+        b_op = qutip.tensor(qutip.qeye(4), qutip.destroy(3))
+        hamiltonian = (4 * a_op.dag() * a_op + 5 * b_op.dag() * b_op -
+                       0.1 * a_op.dag() * a_op.dag() * a_op * a_op -
+                       0.2 * b_op.dag() * b_op.dag() * b_op * b_op -
+                       0.03 * a_op.dag() * a_op * b_op.dag() * b_op)
+        esys_array = np.empty(shape=(2,), dtype=object)
+        esys_array[0], esys_array[1] = hamiltonian.eigenstates()
+
+        f1s, chis = states_energies.extract_energies(esys_array,
+                                                     mode_size,
+                                                     quiet=True)
+        self.assertIterableAlmostEqual([4, 5], f1s)
+        self.assertIterableAlmostEqual([-0.2, -0.03, -0.03, -0.4], chis.ravel())
+
+    def test_analysis_lom_core_analysis_circuit_graph(self):
+        """Test the reduced matrices of CircuitGraph and their invalidation
+        when a Cell changes."""
+        nodes = ['n1', 'n2', 'coupler', 'ground']
+        cap_mat = pd.DataFrame(
+            [[100., -20., -5., -75.], [-20., 90., -3., -67.],
+             [-5., -3., 30., -22.], [-75., -67., -22., 164.]],
+            index=nodes,
+            columns=nodes)
+        cell = Cell(
+            dict(cap_mat=cap_mat,
+                 ind_dict={('n1', 'n2'): 10},
+                 jj_dict={('n1', 'n2'): 'j1'}))
+        system = CompositeSystem(
+            [Subsystem(name='transmon', sys_type='TRANSMON', nodes=['j1'])],
+            [cell], 'ground')
+
+        c_g = system.circuitGraph()
+        self.assertEqual(c_g.get_nodes_keep(), ['j1'])
+        self.assertEqual(c_g.get_nodes_remove(), ['n2', 'coupler'])
+        self.assertIterableAlmostEqual([[0.1]], np.asarray(c_g.L_inv_k))
+
+        # C_k is the Schur complement of the eliminated non-dynamic nodes
+        c = np.asarray(c_g.C)
+        expected = c[:1, :1] - c[:1, 1:].dot(np.linalg.inv(c[1:, 1:])).dot(
+            c[1:, :1])
+        self.assertIterableAlmostEqual(expected, np.asarray(c_g.C_k))
+        self.assertIs(c_g.C_k, c_g.C_k)
+        self.assertIs(system.circuitGraph(), c_g)
+
+        cell.cap_mat = cap_mat * 2
+        c_g_new = system.circuitGraph()
+        self.assertIsNot(c_g_new, c_g)
+        self.assertIterableAlmostEqual(2 * expected, np.asarray(c_g_new.C_k))
+
+    def test_analysis_lom_core_analysis_sweep(self):
+        """Test the sweep of the circuit parameters of a CompositeSystem."""
+        nodes = ['n1', 'n2', 'res', 'ground']
+        cap_mat = pd.DataFrame(
+            [[100., -20., -5., -75.], [-20., 90., -1., -69.],
+             [-5., -1., 110., -104.], [-75., -69., -104., 248.]],
+            index=nodes,
+            columns=nodes)
+
+        def make_system(l_j):
+            cell = Cell(
+                dict(cap_mat=cap_mat,
+                     ind_dict={
+                         ('n1', 'n2'): l_j,
+                         ('res', 'ground'): 5
+                     },
+                     jj_dict={('n1', 'n2'): 'j1'}))
+            return CompositeSystem([
+                Subsystem(name='qubit', sys_type='TRANSMON', nodes=['j1']),
+                Subsystem(
+                    name='res', sys_type='LUMPED_RESONATOR', nodes=['res'])
+            ], [cell], 'ground')
+
+        results = make_system(10).sweep({
+            ('L', 'j1'): [10, 12],
+            'gscale': [0, 1]
+        })
+        self.assertEqual(list(results.columns), [
+            'L_j1', 'gscale', 'f_qubit', 'f_res', 'chi_qubit_qubit',
+            'chi_qubit_res', 'chi_res_res'
+        ])
+        self.assertEqual(len(results), 4)
+
+        system = make_system(12)
+        expected = system.hamiltonian_results(system.add_interaction(),
+                                              print_info=False)
+        point = results[(results['L_j1'] == 12) & (results['gscale'] == 1)]
+        self.assertAlmostEqual(point['f_qubit'].iloc[0],
+                               expected['fQ_in_Ghz']['qubit'])
+        self.assertAlmostEqual(point['f_res'].iloc[0],
+                               expected['fQ_in_Ghz']['res'])
+        self.assertAlmostEqual(point['chi_qubit_res'].iloc[0],
+                               expected['chi_in_MHz'][0, 1])
+
+        uncoupled = results[results['gscale'] == 0]
+        self.assertIterableAlmostEqual([0, 0], uncoupled['chi_qubit_res'])
+
     def test_analysis_kappa_calculation_kappa_in(self):
         """Test the kappa_in function in kappa_calculation.py."""
         self.assertAlmostEqual(
             kappa_calculation.kappa_in(5.0E9, 30.0E-15, 4.5E9),
             161144.37988054403)
 
+    def test_analysis_fit_transmission_batch(self):
+        """Test fit_transmission_batch on a simulated sweep of the resonance"""
+        freq = np.linspace(6.99e9, 7.01e9, 401)
+        f_res = 7e9 + 4e5 * np.arange(5)
+        Qr, Qc, phi0 = 1e4, 2e4, 0.2
+        s21 = 0.8 * np.exp(0.3j) * (1 - (Qr / Qc) * np.exp(1.0j * phi0) /
+                                    (1 + 2.0j * Qr *
+                                     (freq - f_res[:, None]) / f_res[:, None]))
+        s21[2] = np.nan
+
+        fits = fit_transmission_batch(freq,
+                                      s21,
+                                      detrend_points_init=20,
+                                      detrend_points_final=20)
+        self.assertEqual(len(fits), 5)
+        self.assertTrue(fits['error'][2].startswith('ValueError'))
+        good = fits.drop(index=2)
+        self.assertTrue(good['error'].isna().all())
+        self.assertTrue(
+            np.allclose(good['fr'], f_res[[0, 1, 3, 4]], rtol=0.1 / Qr))
+        self.assertTrue(np.allclose(good['Qr'], Qr, rtol=0.1))
+        self.assertTrue(np.allclose(good['Qc'], Qc, rtol=0.1))
+
+        in_workers = fit_transmission_batch(freq,
+                                            s21,
+                                            detrend_points_init=20,
+                                            detrend_points_final=20,
+                                            workers=2)
+        self.assertTrue(
+            np.allclose(in_workers['fr'], fits['fr'], equal_nan=True))
+
     def test_analysis_sweeper_option_value(self):
         """Test the option_value function in the Sweeper class"""
         from abc import ABC
@@ -781,6 +1037,235 @@ class TestAnalyses(unittest.TestCase, AssertionsMixin):
         self.assertEqual(sweeper.option_value(in_dict, 'a'), 1)
         self.assertEqual(sweeper.option_value(in_dict, 'b'), 'bee')
 
+    def test_analysis_sweeper_run_adaptive_sweep(self):
+        """Test that the adaptive sweep refines only where the target changes"""
+        from qiskit_metal.analyses.core.base import QAnalysis
+        from qiskit_metal.toolbox_metal.parsing import parse_value
+
+        class PadWidth(QAnalysis):
+            """Reads the pad width of Q1, in place of a simulation."""
+            data_labels = ['width']
+
+            def __init__(self, design):
+                super().__init__()
+                self.design = design
+
+            def run(self, **kwargs):
+                self.save_run_args(**kwargs)
+                self.clear_data()
+                width = self.design.components['Q1'].options.pad_width
+                self.set_data('width', parse_value(width, {}) * 1000)
+
+        design = designs.DesignPlanar()
+        TransmonPocket(design, 'Q1')
+        analysis = PadWidth(design)
+        step = lambda a: np.tanh((a.get_data('width') - 455) / 10)
+
+        all_sweep, code = analysis.run_adaptive_sweep('Q1',
+                                                      'pad_width',
+                                                      300,
+                                                      600,
+                                                      step,
+                                                      0.2,
+                                                      initial_points=4,
+                                                      max_points=12)
+        self.assertEqual(code, 0)
+        values = [sweep.value for sweep in all_sweep.values()]
+        self.assertEqual(len(values), 12)
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(list(all_sweep)[0], '300.0um')
+        # every point past the coarse pass lies on the step
+        refined = set(values) - {300., 400., 500., 600.}
+        self.assertTrue(all(400 < value < 500 for value in refined))
+        for sweep in all_sweep.values():
+            self.assertAlmostEqual(sweep.target,
+                                   np.tanh((sweep.value - 455) / 10))
+
+        # a flat target needs no more than the coarse pass
+        all_sweep, _ = analysis.run_adaptive_sweep('Q1', 'pad_width', 300, 600,
+                                                   lambda a: 1., 0.2)
+        self.assertEqual(len(all_sweep), 5)
+
+        _, code = analysis.run_adaptive_sweep('Q1', 'no_option', 300, 600, step,
+                                              0.2)
+        self.assertEqual(code, 5)
+
+    def test_analysis_sweep_scheduler_run(self):
+        """Test the SweepScheduler with the mock solver, in worker processes
+        and resuming from the checkpoint."""
+        design = designs.DesignPlanar()
+        # the workers load a saved copy of the design, with an option that
+        # json can not write
+        TransmonPocket(design, 'Q1', options=dict(ratio=Fraction(1, 3)))
+        points = SweepScheduler.product({
+            'Q1.pad_width': ['400um', '500um'],
+            'Q1.pad_height': ['90um']
+        })
+
+        class FailingBackend(MockSolverBackend):
+
+            def simulate(self, design):
+                raise RuntimeError('no solver')
+
+        with tempfile.TemporaryDirectory() as folder:
+            checkpoint = os.path.join(folder, 'sweep.ckpt')
+            results = SweepScheduler(design,
+                                     MockSolverBackend(['Q1']),
+                                     checkpoint=checkpoint,
+                                     workers=2).run(points)
+            self.assertEqual(
+                list(results.columns),
+                ['Q1.pad_width', 'Q1.pad_height', 'result', 'error'])
+            self.assertEqual(list(results['error']), [None, None])
+            areas = [result.Q1.area for result in results['result']]
+            self.assertAlmostEqual(areas[1] / areas[0], 500 / 400)
+
+            # points in the checkpoint are not simulated again
+            more_points = points + [{'Q1.pad_width': '600um'}]
+            resumed = SweepScheduler(design,
+                                     FailingBackend(),
+                                     checkpoint=checkpoint).run(more_points)
+            self.assertEqual(
+                [result.Q1.area for result in resumed['result'][:2]], areas)
+            self.assertIsNone(resumed['result'][2])
+            self.assertEqual(resumed['error'][2], 'RuntimeError: no solver')
+
+        self.assertEqual(design.components['Q1'].options.pad_width, '455um')
+
+        with self.assertRaises(ValueError):
+            SweepScheduler(design, MockSolverBackend()).run([{'Q1.bad': 1}])
+
+    def test_analysis_simulation_result_cache(self):
+        """Test that run_sim returns cached results when the rendered geometry,
+        chips, renderer options and setup are unchanged."""
+        from qiskit_metal import Dict
+
+        class CountingRenderer():
+            """Stands in for the q3d renderer and counts the solves."""
+            options = Dict(buffer_width='0.5mm')
+            initialized = True
+            solves = 0
+
+            def execute_design(self, design_name, **kwargs):
+                return design_name
+
+            def initialize_cap_extract(self, **kwargs):
+                return kwargs['name']
+
+            def analyze_setup(self, setup_name):
+                self.solves += 1
+
+            def get_capacitance_matrix(self):
+                return pd.DataFrame([[float(self.solves)]]), 'fF'
+
+            def get_capacitance_all_passes(self):
+                return {1: pd.DataFrame([[float(self.solves)]])}, 'fF'
+
+        design = designs.DesignPlanar()
+        TransmonPocket(design, 'Q1')
+        TransmonPocket(design, 'Q2', options=dict(pos_x='2mm'))
+        renderer = CountingRenderer()
+
+        def new_sim(cache):
+            sim = LumpedElementsSim(design, 'q3d')
+            sim.renderer = renderer
+            sim.result_cache = cache
+            return sim
+
+        with tempfile.TemporaryDirectory() as folder:
+            sim = new_sim(folder)
+            sim.run(components=['Q1'])
+            sim.run(components=['Q1'])
+            self.assertEqual(renderer.solves, 1)
+            self.assertEqual(sim.capacitance_matrix.iloc[0, 0], 1.)
+            self.assertEqual(sim.units, 'fF')
+
+            # the cache is on disk, shared with new instances
+            other = new_sim(folder)
+            other.run(name='other', components=['Q1'])
+            self.assertEqual(renderer.solves, 1)
+            self.assertEqual(len(other.result_cache), 1)
+
+            # components outside the selection do not matter
+            design.components['Q2'].options.pad_gap = '40um'
+            design.rebuild()
+            sim.run(components=['Q1'])
+            self.assertEqual(renderer.solves, 1)
+
+            design.components['Q1'].options.pad_gap = '40um'
+            design.rebuild()
+            sim.run(components=['Q1'])
+            self.assertEqual(renderer.solves, 2)
+            self.assertEqual(sim.capacitance_matrix.iloc[0, 0], 2.)
+
+            sim.setup.max_passes = 20
+            sim.run(components=['Q1'])
+            renderer.options.buffer_width = '1mm'
+            sim.run(components=['Q1'])
+            self.assertEqual(renderer.solves, 4)
+
+            # no selection re-uses the renderer design, so it is never cached
+            sim.run()
+            self.assertEqual(renderer.solves, 5)
+
+            sim.result_cache.clear()
+            self.assertEqual(len(sim.result_cache), 0)
+
+    def test_analysis_epr_skips_result_cache(self):
+        """Test that EPRanalysis solves the eigenmodes again, even if they
+        are in the result cache, as it reads them from the renderer."""
+        from qiskit_metal import Dict
+
+        class CountingRenderer():
+            """Stands in for the hfss renderer and counts the solves."""
+            options = Dict(buffer_width='0.5mm')
+            initialized = True
+            solves = 0
+            solved_for_epr = 0
+
+            def execute_design(self, design_name, **kwargs):
+                return design_name
+
+            def initialize_eigenmode(self, **kwargs):
+                return kwargs['name']
+
+            def analyze_setup(self, setup_name):
+                self.solves += 1
+
+            def get_convergences(self, variation):
+                return pd.DataFrame(), pd.DataFrame(), None
+
+            def epr_start(self, **kwargs):
+                self.solved_for_epr = self.solves
+
+            def epr_get_stored_energy(self, **kwargs):
+                return 1., 0.5, 1.
+
+            def epr_run_analysis(self):
+                pass
+
+            def epr_spectrum_analysis(self, cos_trunc, fock_trunc):
+                pass
+
+            def epr_report_hamiltonian(self, sweep_variable, numeric):
+                pass
+
+        design = designs.DesignPlanar()
+        TransmonPocket(design, 'Q1')
+        renderer = CountingRenderer()
+        epr = EPRanalysis(design, 'hfss')
+        epr.sim.renderer = renderer
+        with tempfile.TemporaryDirectory() as folder:
+            epr.sim.result_cache = folder
+            epr.sim.run(components=['Q1'])
+            epr.sim.run(components=['Q1'])
+            self.assertEqual(renderer.solves, 1)
+
+            epr.run(components=['Q1'])
+            self.assertEqual(renderer.solves, 2)
+            self.assertEqual(renderer.solved_for_epr, 2)
+            self.assertEqual(epr.sim.result_cache.path, Path(folder))
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
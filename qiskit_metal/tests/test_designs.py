@@ -21,6 +21,12 @@
 # pylint: disable-msg=import-error
 """Qiskit Metal unit tests analyses functionality."""
 
+import os
+import pickle
+from fractions import Fraction
+from functools import partial
+import tempfile
+import threading
 import unittest
 import pandas as pd
 
@@ -30,7 +36,9 @@ from qiskit_metal.designs.interface_components import Components
 from qiskit_metal.designs.net_info import QNet
 from qiskit_metal.qlibrary.core import QComponent
 from qiskit_metal.qlibrary.qubits.transmon_pocket import TransmonPocket
+from qiskit_metal.qlibrary.tlines.straight_path import RouteStraight
 from qiskit_metal.tests.assertions import AssertionsMixin
+from qiskit_metal.toolbox_metal.import_export import load_metal_qgeometry
 
 from qiskit_metal.qlibrary.lumped.resonator_coil_rect import ResonatorCoilRect
 
@@ -465,6 +473,221 @@ class TestDesign(unittest.TestCase, AssertionsMixin):
         self.assertEqual(pf['pin_name'][0], 'p1')
         self.assertEqual(pf['pin_name'][1], 'p2')
 
+    def test_design_rebuild_incremental(self):
+        """Test that rebuild in design_base.py only remakes the components
+        that changed, and the components that depend on them."""
+        design = DesignPlanar()
+        design.variables['my_gap'] = '30um'
+        q_1 = TransmonPocket(design,
+                             'Q1',
+                             options=dict(connection_pads=dict(a=dict())))
+        q_2 = TransmonPocket(design,
+                             'Q2',
+                             options=dict(pos_x='2mm',
+                                          pad_gap='my_gap',
+                                          connection_pads=dict(a=dict())))
+        route = RouteStraight(
+            design,
+            'R',
+            options=dict(
+                pin_inputs=dict(start_pin=dict(component='Q1', pin='a'),
+                                end_pin=dict(component='Q2', pin='a'))))
+        self.assertEqual(design.get_dependencies('R'), {q_1.id, q_2.id})
+        self.assertEqual(design.get_dependents('Q1'), {route.id})
+
+        build_ids = [q_1._build_id, q_2._build_id, route._build_id]
+        design.rebuild()
+        self.assertEqual([q_1._build_id, q_2._build_id, route._build_id],
+                         build_ids)
+
+        q_1.options.pos_y = '0.5mm'
+        design.rebuild()
+        self.assertGreater(q_1._build_id, build_ids[0])
+        self.assertEqual(q_2._build_id, build_ids[1])
+        self.assertGreater(route._build_id, q_1._build_id)
+        self.assertEqual(len(design.net_info), 4)
+
+        build_ids = [q_1._build_id, q_2._build_id, route._build_id]
+        design.variables['my_gap'] = '40um'
+        design.rebuild()
+        self.assertEqual(q_1._build_id, build_ids[0])
+        self.assertGreater(q_2._build_id, build_ids[1])
+        self.assertGreater(route._build_id, q_2._build_id)
+
+        build_ids = [q_1._build_id, q_2._build_id, route._build_id]
+        design.update_component('Q1')
+        self.assertGreater(q_1._build_id, build_ids[2])
+        self.assertEqual(q_2._build_id, build_ids[1])
+        self.assertGreater(route._build_id, q_1._build_id)
+
+        # an edit while the component is made is not in the built options
+        class EditedWhileMade(QComponent):
+
+            def make(self):
+                self.options.pos_x = '1mm'
+
+        edited = EditedWhileMade(design, 'E')
+        self.assertTrue(edited._needs_rebuild())
+        design.rebuild()
+        self.assertFalse(edited._needs_rebuild())
+        self.assertFalse(route._needs_rebuild())
+        design.delete_component('E')
+
+        design.add_dependency('Q1', 'Q2')
+        self.assertEqual(design._get_rebuild_order([route.id, q_2.id, q_1.id]),
+                         [q_1.id, q_2.id, route.id])
+        design.remove_dependency('Q1', 'Q2')
+        self.assertEqual(design.get_dependencies('Q2'), set())
+
+    def test_design_rebuild_cancel(self):
+        """Test that a cancelled rebuild in design_base.py stops before the
+        next component, which the next rebuild makes."""
+        design = DesignPlanar()
+        q_1 = TransmonPocket(design, 'Q1')
+        q_1.options.pos_x = '1mm'
+
+        cancel = threading.Event()
+        cancel.set()
+        design.rebuild(cancel=cancel)
+        self.assertTrue(q_1._needs_rebuild())
+
+        design.rebuild()
+        self.assertFalse(q_1._needs_rebuild())
+
+    def test_design_events(self):
+        """Test that the design publishes the changes of its components,
+        qgeometry, variables and nets."""
+        design = DesignPlanar()
+        events = []
+
+        def record(name, **kwargs):
+            events.append((name, kwargs))
+
+        for name in [
+                'component_added', 'component_removed', 'component_renamed',
+                'component_rebuilt', 'variables_changed', 'rows_inserted',
+                'rows_removed', 'net_added', 'net_removed'
+        ]:
+            design.events.subscribe(name, partial(record, name))
+
+        q_1 = TransmonPocket(design,
+                             'Q1',
+                             options=dict(connection_pads=dict(a=dict())))
+        self.assertEqual(events[0], ('component_added', {'component_id': 1}))
+        self.assertIn(('rows_inserted', {
+            'table_name': 'poly',
+            'component_id': 1
+        }), events)
+        self.assertEqual(events[-1], ('component_rebuilt', {'component_id': 1}))
+
+        events.clear()
+        q_2 = TransmonPocket(design,
+                             'Q2',
+                             options=dict(pos_x='2mm',
+                                          connection_pads=dict(a=dict())))
+        RouteStraight(
+            design,
+            'R',
+            options=dict(
+                pin_inputs=dict(start_pin=dict(component='Q1', pin='a'),
+                                end_pin=dict(component='Q2', pin='a'))))
+        net_ids = [
+            kwargs['net_id'] for name, kwargs in events if name == 'net_added'
+        ]
+        self.assertEqual(net_ids, [1, 2])
+
+        events.clear()
+        q_1.options.pos_y = '0.5mm'
+        design.rebuild()
+        self.assertEqual(
+            [kwargs for name, kwargs in events if name == 'component_rebuilt'],
+            [{
+                'component_id': 1
+            }, {
+                'component_id': 3
+            }])
+        self.assertIn(('rows_removed', {
+            'table_name': 'poly',
+            'component_id': 1
+        }), events)
+
+        events.clear()
+        design.rename_component(q_2.id, 'Q3')
+        design.rename_variable('cpw_width', 'cpw_width_2')
+        design.delete_component('R')
+        self.assertEqual(events[0], ('component_renamed', {'component_id': 2}))
+        self.assertEqual(events[1], ('variables_changed', {
+            'names': ['cpw_width', 'cpw_width_2']
+        }))
+        self.assertEqual(
+            [name for name, kwargs in events][2:],
+            ['net_removed', 'net_removed', 'rows_removed', 'component_removed'])
+
+        # The subscribers are not saved with the design.
+        copied = pickle.loads(pickle.dumps(design.events))
+        self.assertEqual(copied._subscribers, dict())
+        self.assertEqual(len(design.events._subscribers['component_added']), 1)
+
+    def test_design_save_and_load_design(self):
+        """Test save_design and load_design in design_base.py."""
+        design = DesignPlanar()
+        design.variables['my_gap'] = '30um'
+        TransmonPocket(design, 'Q0')
+        TransmonPocket(design,
+                       'Q1',
+                       options=dict(pad_gap='my_gap',
+                                    connection_pads=dict(a=dict())))
+        # an option that json can not write
+        TransmonPocket(design,
+                       'Q2',
+                       options=dict(pos_x='2mm',
+                                    ratio=Fraction(1, 3),
+                                    connection_pads=dict(a=dict())))
+        RouteStraight(
+            design,
+            'R',
+            options=dict(
+                pin_inputs=dict(start_pin=dict(component='Q1', pin='a'),
+                                end_pin=dict(component='Q2', pin='a'))))
+        design.delete_component('Q0')
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'design.metal')
+            self.assertTrue(design.save_design(path))
+            loaded = [
+                DesignPlanar.load_design(path, rebuild=rebuild)
+                for rebuild in [False, 'lazy', True]
+            ]
+            tables = load_metal_qgeometry(path)
+
+        self.assertEqual(list(tables.keys()), ['path', 'poly', 'junction'])
+        self.assertEqual(len(tables['path']),
+                         len(design.qgeometry.tables['path']))
+        self.assertEqual(
+            [c._needs_rebuild() for c in loaded[0]._components.values()],
+            [False, False, False])
+        self.assertEqual(
+            [c._needs_rebuild() for c in loaded[1]._components.values()],
+            [True, True, True])
+        self.assertEqual(loaded[0].components['Q2'].options.ratio,
+                         Fraction(1, 3))
+
+        for other in loaded:
+            other.rebuild()
+            self.assertEqual(other.variables['my_gap'], '30um')
+            self.assertEqual(other.name_to_id, design.name_to_id)
+            self.assertEqual(other.get_dependencies('R'),
+                             design.get_dependencies('R'))
+            self.assertEqual(len(other.net_info), len(design.net_info))
+            self.assertEqual(other.components['R'].options,
+                             design.components['R'].options)
+            for name, table in design.qgeometry.tables.items():
+                other_table = other.qgeometry.tables[name]
+                self.assertEqual(list(other_table.columns), list(table.columns))
+                self.assertTrue(
+                    other_table.geometry.reset_index(drop=True).geom_equals(
+                        table.geometry.reset_index(drop=True)).all())
+
     def test_design_delete_all_pins(self):
         """Test delete_all_pins functionality in design_base.py."""
         design = DesignPlanar()
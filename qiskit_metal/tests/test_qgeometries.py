@@ -18,6 +18,7 @@
 # pylint: disable-msg=import-error
 """Qiskit Metal unit tests analyses functionality."""
 
+import threading
 import unittest
 import numpy as np
 
@@ -259,6 +260,103 @@ class TestElements(unittest.TestCase):
         self.assertEqual(len(qgt.tables['path']), 0)
         self.assertEqual(len(qgt.tables['poly']), 0)
 
+    def test_qgeometry_q_element_delete_component_id_row_index(self):
+        """Test that the component row index of QGeometryTables stays in sync
+        with the tables when components are deleted and rebuilt."""
+        design = designs.DesignPlanar()
+        q_1 = TransmonPocket(design, 'Q1')
+        q_2 = TransmonPocket(design, 'Q2', options=dict(pos_x='2mm'))
+        qgt = design.qgeometry
+        num_poly = len(qgt.tables['poly'])
+
+        q_1.options.pad_width = '300um'
+        q_1.rebuild()
+        q_2.rebuild()
+        qgt.delete_component_id(q_2.id)
+
+        table = qgt.tables['poly']
+        self.assertEqual(len(table), num_poly // 2)
+        self.assertEqual(set(table['component']), {q_1.id})
+        self.assertTrue(qgt.get_component('Q1', 'poly').equals(table))
+        self.assertEqual(len(qgt.get_component('Q2', 'poly')), 0)
+        self.assertEqual(qgt.get_component_geometry_list('Q1', 'poly'),
+                         table.geometry.to_list())
+
+    def test_qgeometry_q_element_get_components_in_bounds(self):
+        """Test that the spatial index of QGeometryTables follows the
+        components when they are moved or deleted."""
+        design = designs.DesignPlanar()
+        q_1 = TransmonPocket(design, 'Q1')
+        q_2 = TransmonPocket(design, 'Q2', options=dict(pos_x='2mm'))
+        qgt = design.qgeometry
+
+        self.assertEqual(qgt.get_components_in_bounds((-1, -1, 3, 1)),
+                         [q_1.id, q_2.id])
+        self.assertEqual(qgt.get_components_in_bounds((1.8, -1, 2.2, 1)),
+                         [q_2.id])
+        self.assertEqual(qgt.get_components_in_bounds((0.9, -1, 1.1, 1)), [])
+
+        q_2.options.pos_x = '1mm'
+        q_2.rebuild()
+        self.assertEqual(qgt.get_components_in_bounds((0.9, -1, 1.1, 1)),
+                         [q_2.id])
+        np.testing.assert_array_equal(qgt.get_component_bounds('Q2'),
+                                      q_2.qgeometry_table('poly').total_bounds)
+
+        qgt.delete_component_id(q_1.id)
+        self.assertEqual(qgt.get_components_in_bounds((-1, -1, 3, 1)), [q_2.id])
+
+    def test_qgeometry_get_rendered_outlines(self):
+        """Test that the rendered outlines of the paths are filleted,
+        buffered, and cached until the component is rebuilt."""
+        design = designs.DesignPlanar()
+        q_1 = TransmonPocket(design, 'Q1')
+        qgt = design.qgeometry
+        line = draw.LineString([[0, 0], [1, 0], [1, 1]])
+        qgt.add_qgeometry('path', q_1.id, dict(trace=line), width=0.1)
+        qgt.add_qgeometry('path',
+                          q_1.id,
+                          dict(trace_fillet=line),
+                          width=0.1,
+                          fillet=0.2)
+        table = q_1.qgeometry_table('path')
+        table = table[table.name.str.startswith('trace')]
+
+        outlines = qgt.get_rendered_outlines(table)
+        self.assertAlmostEqual(outlines[0].area, 0.2)
+        self.assertLess(outlines[1].area, outlines[0].area)
+        self.assertIs(qgt.get_rendered_outlines(table)[1], outlines[1])
+        self.assertIsNot(
+            qgt.get_rendered_outlines(table, resolution=4)[1], outlines[1])
+
+        q_1.rebuild()
+        self.assertNotIn(q_1.id, qgt._rendered)
+
+    def test_qgeometry_deferred(self):
+        """Test that the rows added and deleted by a thread in deferred are
+        only seen by the other threads once it exits."""
+        design = designs.DesignPlanar()
+        q_1 = TransmonPocket(design, 'Q1')
+        qgt = design.qgeometry
+        num_rows = len(q_1.qgeometry_table('poly'))
+        inside, done = threading.Event(), threading.Event()
+
+        def remake():
+            with qgt.deferred():
+                qgt.delete_component_id(q_1.id)
+                qgt.add_qgeometry('poly', q_1.id,
+                                  dict(pad=draw.rectangle(1, 1)))
+                inside.set()
+                done.wait()
+
+        thread = threading.Thread(target=remake)
+        thread.start()
+        inside.wait()
+        self.assertEqual(len(q_1.qgeometry_table('poly')), num_rows)
+        done.set()
+        thread.join()
+        self.assertEqual(list(q_1.qgeometry_table('poly').name), ['pad'])
+
     def test_qgeometry_get_all_unique_layers(self):
         """Test get_all_unique_layers functionality in elment_handler.py."""
         design = designs.DesignPlanar()
@@ -678,8 +678,9 @@ class TestComponentOptions(unittest.TestCase, AssertionsMixin):
         # Test all elements of the result data against expected data
         self.assertEqual(len(options), 2)
         self.assertEqual(options['step_size'], '0.25mm')
-        self.assertEqual(len(options['advanced']), 1)
+        self.assertEqual(len(options['advanced']), 2)
         self.assertEqual(options['advanced']['avoid_collision'], 'true')
+        self.assertEqual(options['advanced']['engine'], 'classic')
 
     def test_qlibrary_launch_v1_options(self):
         """Test that default options of LaunchpadWirebond in launchpad_wb.py
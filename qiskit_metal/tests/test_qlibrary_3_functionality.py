@@ -38,6 +38,8 @@ from qiskit_metal.qlibrary.tlines import anchored_path
 from qiskit_metal.qlibrary.tlines.anchored_path import RouteAnchors
 from qiskit_metal.qlibrary.tlines.framed_path import RouteFramed
 from qiskit_metal.qlibrary.tlines.meandered import RouteMeander
+from qiskit_metal.qlibrary.tlines.pathfinder import RoutePathfinder
+from qiskit_metal.qlibrary.sample_shapes.rectangle import Rectangle
 from qiskit_metal.qlibrary.tlines import straight_path
 from qiskit_metal import designs
 from qiskit_metal.qlibrary.qubits import star_qubit
@@ -548,6 +550,39 @@ class TestComponentFunctionality(unittest.TestCase, AssertionsMixin):
             anchored_path.intersecting(np.array([1, 1]), np.array([3, 3]),
                                        np.array([5, 5]), np.array([7, 7])))
 
+    def test_qlibrary_pathfinder_grid_engine(self):
+        """Test that the grid engine of RoutePathfinder routes around an
+        obstacle as the classic engine does."""
+        design = designs.DesignPlanar()
+        options = dict(connection_pads=dict(a=dict(loc_W=+1, loc_H=+1)))
+        transmon_pocket.TransmonPocket(design, 'Q1', options=options)
+        transmon_pocket.TransmonPocket(design,
+                                       'Q2',
+                                       options=dict(pos_x='3mm', **options))
+        Rectangle(design,
+                  'wall',
+                  options=dict(pos_x='1.5mm', width='0.1mm', height='3mm'))
+
+        lengths = []
+        for engine in ['classic', 'grid']:
+            route = RoutePathfinder(
+                design,
+                engine,
+                options=Dict(advanced=Dict(engine=engine),
+                             lead=Dict(start_straight='0.1mm',
+                                       end_straight='0.1mm'),
+                             pin_inputs=Dict(start_pin=Dict(component='Q1',
+                                                            pin='a'),
+                                             end_pin=Dict(component='Q2',
+                                                          pin='a'))))
+            points = route.get_points()
+            for i in range(1, len(points) - 2):
+                self.assertTrue(route.unobstructed([points[i], points[i + 1]]))
+            lengths.append(route.length)
+            design.delete_component(engine)
+
+        self.assertAlmostEqual(lengths[0], lengths[1])
+
     @staticmethod
     def generate_spiral_list(x: int, y: int):
         """Helper function to generate a sprital list.
@@ -20,9 +20,13 @@
 """Qiskit Metal unit tests analyses functionality."""
 
 import unittest
+import gdspy
+import shapely
 import matplotlib.pyplot as _plt
+from matplotlib.collections import PolyCollection
 
 from qiskit_metal import designs
+from qiskit_metal import logger
 from qiskit_metal.renderers import setup_default
 from qiskit_metal.renderers.renderer_ansys.ansys_renderer import QAnsysRenderer
 from qiskit_metal.renderers.renderer_ansys.q3d_renderer import QQ3DRenderer
@@ -30,12 +34,15 @@ from qiskit_metal.renderers.renderer_ansys.hfss_renderer import QHFSSRenderer
 from qiskit_metal.renderers.renderer_base.renderer_base import QRenderer
 from qiskit_metal.renderers.renderer_base.renderer_gui_base import QRendererGui
 from qiskit_metal.renderers.renderer_gds.gds_renderer import QGDSRenderer
+from qiskit_metal.renderers.renderer_gds.make_cheese import Cheesing
 from qiskit_metal.renderers.renderer_mpl.mpl_interaction import MplInteraction
+from qiskit_metal.renderers.renderer_mpl.mpl_renderer import QMplRenderer
 
 from qiskit_metal.renderers.renderer_ansys import ansys_renderer
 
 from qiskit_metal.qgeometries.qgeometries_handler import QGeometryTables
 from qiskit_metal.qlibrary.qubits.transmon_pocket import TransmonPocket
+from qiskit_metal.qlibrary.sample_shapes.rectangle import Rectangle
 from qiskit_metal import draw
 
 
@@ -228,7 +235,7 @@ class TestRenderers(unittest.TestCase):
         renderer = QGDSRenderer(design)
         options = renderer.default_options
 
-        self.assertEqual(len(options), 17)
+        self.assertEqual(len(options), 18)
         self.assertEqual(options['short_segments_to_not_fillet'], 'True')
         self.assertEqual(options['check_short_segments_by_scaling_fillet'],
                          '2.0')
@@ -245,6 +252,8 @@ class TestRenderers(unittest.TestCase):
         self.assertEqual(options['max_points'], '199')
         self.assertEqual(options['bounding_box_scale_x'], '1.2')
         self.assertEqual(options['bounding_box_scale_y'], '1.2')
+        self.assertEqual(options['parallel']['enable'], 'False')
+        self.assertEqual(options['parallel']['workers'], '0')
 
         self.assertEqual(options['fabricate'], 'False')
 
@@ -405,6 +414,112 @@ class TestRenderers(unittest.TestCase):
         self.assertEqual(actual[0], 15.0)
         self.assertEqual(actual[1], 22.5)
 
+    def test_renderer_gdsrenderer_qgeometry_table_to_gds(self):
+        """Test _qgeometry_table_to_gds in gds_renderer.py."""
+        design = designs.DesignPlanar()
+        renderer = QGDSRenderer(design)
+        TransmonPocket(design, 'Q1')
+
+        table = design.qgeometry.tables['poly']
+        actual = renderer._qgeometry_table_to_gds(table)
+        self.assertEqual(len(actual), 1)
+        self.assertEqual(actual[0].layers, [1] * len(table))
+        self.assertEqual(actual[0].datatypes, [10] * len(table))
+        self.assertEqual(renderer._qgeometry_table_to_gds(table.iloc[0:0]), [])
+
+    def test_renderer_gdsrenderer_compute_layers_in_parallel(self):
+        """Test that _compute_layers_in_parallel in gds_renderer.py gives the
+        same ground as the serial computation."""
+        design = designs.DesignPlanar()
+        renderer = QGDSRenderer(design)
+        TransmonPocket(design, 'Q1')
+        Rectangle(design,
+                  'R2',
+                  options=dict(pos_x='2mm', layer='2', subtract='True'))
+        renderer.options['parallel']['workers'] = '2'
+
+        renderer.chip_info.update(renderer._get_chip_names())
+        renderer._create_qgeometry_for_gds()
+        serial = [
+            renderer._get_ground_difference('main', layer, 1e-9, 199)
+            for layer in [1, 2]
+        ]
+
+        renderer._compute_layers_in_parallel()
+        for layer in [1, 2]:
+            self.assertTrue(
+                'ground_difference' in renderer.chip_info['main'][layer])
+        parallel = [
+            renderer._get_ground_difference('main', layer, 1e-9, 199)
+            for layer in [1, 2]
+        ]
+
+        for expected, actual in zip(serial, parallel):
+            self.assertEqual(actual.layers, expected.layers)
+            self.assertEqual(len(actual.polygons), len(expected.polygons))
+            for poly_1, poly_2 in zip(actual.polygons, expected.polygons):
+                self.assertTrue((poly_1 == poly_2).all())
+
+    def test_renderer_cheesing_tiles(self):
+        """Test the tiled grid of holes of Cheesing in make_cheese.py."""
+        lib = gdspy.GdsLibrary()
+        lib.new_cell('TOP_main_1')
+        lib.new_cell('ground_main_1').add(
+            gdspy.Rectangle((0, 0), (1, 1), layer=1, datatype=0))
+        keepout = shapely.geometry.box(0.36, 0.36, 0.51, 0.51)
+        keepout_gds = [
+            gdspy.Polygon(list(keepout.exterior.coords), layer=1, datatype=99)
+        ]
+        cheese = Cheesing(shapely.geometry.MultiPolygon([keepout]),
+                          keepout_gds,
+                          lib,
+                          0,
+                          0,
+                          1,
+                          1,
+                          'main',
+                          0.175,
+                          1,
+                          False,
+                          100,
+                          99,
+                          False,
+                          logger,
+                          199,
+                          1e-9,
+                          shape_0_x=0.05,
+                          shape_0_y=0.05,
+                          delta_x=0.1,
+                          delta_y=0.1,
+                          holes_per_tile=2)
+        cheese.apply_cheesing()
+
+        self.assertEqual(len(cheese.tiles), 16)
+        diff_cell = lib.cells['TOP_main_1_Cheese_diff']
+        self.assertEqual(len(diff_cell.references), 15)
+        self.assertTrue('TOP_main_1_Cheese_hole' in lib.cells)
+        # only the tile with keepout keeps its holes
+        self.assertEqual(sum('holes' in tile for tile in cheese.tiles), 1)
+
+        x_holes, y_holes = cheese._get_hole_locations()
+        holes = shapely.ops.unary_union([
+            shapely.geometry.box(x - 0.025, y - 0.025, x + 0.025, y + 0.025)
+            for x in x_holes
+            for y in y_holes
+        ]).difference(keepout)
+        diff_area = sum(
+            shapely.geometry.Polygon(poly).area
+            for poly in diff_cell.get_polygons())
+        ground_area = sum(
+            shapely.geometry.Polygon(poly).area
+            for poly in lib.cells['TOP_main_1_Cheese_100'].get_polygons())
+        self.assertAlmostEqual(diff_area, holes.area, places=9)
+        self.assertAlmostEqual(ground_area, 1 - holes.area, places=9)
+
+        cheese._remove_cheese_diff_cell()
+        self.assertFalse('TOP_main_1_Cheese_diff' in lib.cells)
+        self.assertFalse('TOP_main_1_Cheese_hole' in lib.cells)
+
     # pylint: disable-msg=unused-variable
     def test_renderer_gdsrenderer_check_qcomps(self):
         """Test check_qcomps in gds_renderer.py."""
@@ -435,6 +550,69 @@ class TestRenderers(unittest.TestCase):
         mpl.disconnect()
         self.assertEqual(mpl.figure, None)
 
+    def test_renderer_mpl_render_visible_window(self):
+        """Test that QMplRenderer only renders the rows in the axis window,
+        and draws rows smaller than a pixel as boxes."""
+        design = designs.DesignPlanar()
+        for i in range(3):
+            Rectangle(design, f'rect_{i}', options=dict(pos_x=f'{2 * i}mm'))
+        ax = _plt.figure().add_subplot(111)
+        renderer = QMplRenderer(None, design, logger)
+
+        def num_shapes():
+            return sum(len(coll.get_paths()) for coll in ax.collections)
+
+        ax.set_xlim(-0.5, 0.5)
+        ax.set_ylim(-0.5, 0.5)
+        renderer.render(ax)
+        self.assertEqual(num_shapes(), 1)
+
+        # Panning to the last rectangle renders it instead
+        ax.set_xlim(3.5, 4.5)
+        self.assertEqual(num_shapes(), 1)
+        self.assertEqual(renderer._view.bounds, (3.0, -1.0, 5.0, 1.0))
+
+        # Zoomed out, the rectangles are drawn as boxes
+        ax.set_xlim(-1000, 1000)
+        ax.set_ylim(-1000, 1000)
+        self.assertEqual(num_shapes(), 3)
+        self.assertTrue(
+            all(isinstance(coll, PolyCollection) for coll in ax.collections))
+
+        # Autoscale still sees the whole design
+        ax.autoscale()
+        self.assertLess(ax.get_xlim()[0], 0)
+        self.assertGreater(ax.get_xlim()[1], 4)
+        _plt.close(ax.figure)
+
+    def test_renderer_mpl_update_components(self):
+        """Test that QMplRenderer only redraws the components that were
+        rebuilt or deleted."""
+        design = designs.DesignPlanar()
+        rect_0 = Rectangle(design, 'rect_0')
+        rect_1 = Rectangle(design, 'rect_1', options=dict(pos_x='1mm'))
+        ax = _plt.figure().add_subplot(111)
+        renderer = QMplRenderer(None, design, logger)
+        ax.set_xlim(-2, 2)
+        ax.set_ylim(-2, 2)
+        renderer.render(ax)
+        kept = list(ax.collections)
+        self.assertEqual(renderer.update_components(ax), [])
+
+        rect_0.options.width = '0.2mm'
+        rect_0.rebuild()
+        self.assertEqual(renderer.update_components(ax), [rect_0.id])
+        self.assertEqual(len(ax.collections), 2)
+        self.assertIn(renderer._component_artists[rect_1.id][0], ax.collections)
+        self.assertNotIn(kept[0], ax.collections)
+        self.assertAlmostEqual(
+            ax.collections[-1].get_paths()[0].get_extents().width, 0.2)
+
+        design.delete_component('rect_1')
+        self.assertEqual(renderer.update_components(ax), [rect_1.id])
+        self.assertEqual(len(ax.collections), 1)
+        _plt.close(ax.figure)
+
     def test_renderer_gds_check_cheese(self):
         """Test check_cheese in gds_renderer.py."""
         design = designs.DesignPlanar()
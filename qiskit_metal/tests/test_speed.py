@@ -20,6 +20,8 @@
 
 import unittest
 import time
+from qiskit_metal import designs
+from qiskit_metal import draw
 from qiskit_metal.tests.custom_decorators import timeout
 
 
@@ -42,6 +44,45 @@ class TestSpeed(unittest.TestCase):
         time.sleep(4)
         self.assertEqual(4, 2 + 2)
 
+    @timeout(60)
+    def test_speed_qgeometry_add_qgeometry(self):
+        """Test that adding the qgeometry of 10k components scales linearly,
+        since the rows are staged and only appended once to the tables."""
+        design = designs.DesignPlanar()
+        qgt = design.qgeometry
+        num_components = 10000
+
+        for i in range(num_components):
+            qgt.add_qgeometry('poly', i, dict(pad=draw.rectangle(1, 1, i, 0)))
+            qgt.add_qgeometry('path',
+                              i,
+                              dict(trace=draw.LineString([[i, 0], [i, 1]])),
+                              width=0.01)
+
+        self.assertEqual(len(qgt.tables['poly']), num_components)
+        self.assertEqual(len(qgt.tables['path']), num_components)
+        self.assertEqual(qgt.tables['path']['component'].iloc[-1],
+                         num_components - 1)
+
+    @timeout(60)
+    def test_speed_qgeometry_delete_component_id(self):
+        """Test that replacing the qgeometry of one component does not scan
+        the whole table, by using the row index of each component."""
+        design = designs.DesignPlanar()
+        qgt = design.qgeometry
+        num_components = 10000
+
+        for i in range(num_components):
+            qgt.add_qgeometry('poly', i, dict(pad=draw.rectangle(1, 1, i, 0)))
+        qgt.flush()
+
+        for i in range(0, num_components, 10):
+            qgt.delete_component_id(i)
+            qgt.add_qgeometry('poly', i, dict(pad=draw.rectangle(2, 2, i, 0)))
+
+        self.assertEqual(len(qgt.tables['poly']), num_components)
+        self.assertEqual(qgt.tables['poly'].geometry.iloc[-1].area, 4)
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -153,6 +153,28 @@ class TestToolboxMetal(unittest.TestCase, AssertionsMixin):
         self.assertEqual(parsing._parse_string_to_float(12), 12)
         self.assertEqual(parsing._parse_string_to_float('12.2.3'), '12.2.3')
 
+    def test_toolbox_metal_parse_number_with_units(self):
+        """Test _parse_number_with_units in toolbox_metal.py gives the same
+        values as pint."""
+        for expr in [
+                '1mm', '1 millimeter', '1.mm', '-2mm', '1um', '+1um', '.1um',
+                '-1e6 nm', '.1e6 nm', '0.1  m', '1e3mm', '3 inch', '4km', '1',
+                ' 2.5 '
+        ]:
+            expected = parsing.UREG.Quantity(expr)
+            try:
+                expected = expected.to(parsing.units).magnitude
+            except Exception:
+                expected = float(expr)
+            actual = parsing._parse_number_with_units(expr, parsing.units)
+            self.assertEqual(actual, expected)
+            self.assertEqual(type(actual), type(expected))
+
+        self.assertIsNone(parsing._parse_number_with_units('2*10mm', 'mm'))
+        self.assertIsNone(parsing._parse_number_with_units('1 .', 'mm'))
+        self.assertIsNone(parsing._parse_number_with_units('1 foo', 'mm'))
+        self.assertIsNone(parsing._parse_number_with_units('1 ohm', 'mm'))
+
     def test_toolbox_metal_is_variable_name(self):
         """Test is_variable_name in toolbox_metal.py."""
         self.assertTrue(parsing.is_variable_name('ok'))
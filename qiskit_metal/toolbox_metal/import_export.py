@@ -15,13 +15,49 @@
 # pylint: disable=protected-access
 # pylint: disable-msg=relative-beyond-top-level
 # pylint: disable-msg=broad-except
-"""Saving and load metal data."""
+"""Saving and load metal data.
 
+A design is saved as a zip archive with:
+
+* ``design.json``: the format version, the design class, variables, chips,
+  metadata, renderer options, the net info and, for each component, its class
+  path, options and pins.
+* ``qgeometry/<table>.npz``: the geometry of each qgeometry table as WKB and
+  its numeric columns, as arrays. The other columns are in ``design.json``.
+
+Values that json can not represent, such as a pint quantity or a shapely
+geometry in the options, are pickled on their own and written in
+``design.json`` as base64 text. Files written by older versions of Metal, with
+pickle, can still be loaded.
+"""
+
+import base64
+import importlib
+import io
+import json
 import pickle
+import zipfile
+from collections.abc import Mapping
+from copy import deepcopy
+from typing import Union
+
+import numpy as np
+import pandas as pd
+import shapely.wkb
+from geopandas import GeoDataFrame
+
+from .. import Dict
+
 #from ..designs.base
 from ..toolbox_python.utility_functions import log_error_easy
 
-__all__ = ['save_metal', 'load_metal_design']
+__all__ = ['save_metal', 'load_metal_design', 'load_metal_qgeometry']
+
+FORMAT_NAME = 'qiskit-metal-design'
+"""Name of the format, written in design.json."""
+
+FORMAT_VERSION = 1
+"""Version of the format. Increase when the layout of the file changes."""
 
 
 def save_metal(filename: str, design):
@@ -39,40 +75,86 @@ def save_metal(filename: str, design):
     """
     result = False
 
-    # Do not pickle the following -- THis is issue with picking
-    self = design  # cludge for lazy tying
-    logger = self.logger
-    self.logger = None
-
-    # Pickle
-    # TODO: Right now just does pickle. Need to serialize object into JSON
-    # or similar. Then recreate components.
     try:
-        pickle.dump(self, open(filename, "wb"))
+        content = _design_to_json(design)
+        with zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for table_name, table in design.qgeometry.tables.items():
+                arrays, content['qgeometry'][table_name] = _table_to_columns(
+                    table)
+                archive.writestr(f'qgeometry/{table_name}.npz',
+                                 _arrays_to_bytes(arrays))
+            archive.writestr('design.json', json.dumps(content))
 
         result = True
     except Exception as e:
         # handle errors here? such as PermissionError
         text = f'ERROR WHILE SAVING: {e}'
-        log_error_easy(logger, post_text=text)
-        # print(text)
-        # logger.error(text)
+        log_error_easy(design.logger, post_text=text)
         result = False
 
-    # restore -- also need to do in the load function
-    self.logger = logger
     return result
 
 
 # pylint: disable-msg=import-outside-toplevel
-def load_metal_design(filename: str):
+def load_metal_design(filename: str, rebuild: Union[bool, str] = False):
     """Load metal design.
 
     Args:
         filename (str): File path
+        rebuild (Union[bool, str]): How to get the qgeometry of the components.
+            False to read it from the file, without remaking the components.
+            'lazy' to read it from the file, but the components are remade by
+            the next design.rebuild(). True to remake all the components while
+            loading. Not used for files saved with pickle.  Defaults to False.
 
     Returns:
-        picked QDesign: The pickled design object and updates if asked the param dicts for defaults
+        QDesign: The loaded design object
+    """
+    if not zipfile.is_zipfile(filename):
+        return _load_pickled_design(filename)
+
+    with zipfile.ZipFile(filename, 'r') as archive:
+        content = _read_design_json(archive)
+        design = _design_from_json(content, rebuild)
+
+        if rebuild is True:
+            design.rebuild(full=True)
+        else:
+            for table_name in content['qgeometry']:
+                design.qgeometry.append_table(
+                    table_name, _read_table(archive, content, table_name))
+
+    design.save_path = str(
+        filename)  # Set the place from where we loaded the design
+    return design
+
+
+def load_metal_qgeometry(filename: str) -> Dict:
+    """Load only the qgeometry tables of a saved design, for example to render
+    it, without creating the design or its components.
+
+    Args:
+        filename (str): File path of a design saved by save_metal.
+
+    Returns:
+        Dict: The GeoDataFrame of each table, keyed by table name.
+    """
+    with zipfile.ZipFile(filename, 'r') as archive:
+        content = _read_design_json(archive)
+        return Dict({
+            table_name: _read_table(archive, content, table_name)
+            for table_name in content['qgeometry']
+        })
+
+
+def _load_pickled_design(filename: str):
+    """Load a design saved with pickle by older versions of Metal.
+
+    Args:
+        filename (str): File path
+
+    Returns:
+        QDesign: The unpickled design object
     """
     design = pickle.load(open(filename, "rb"))
     design.save_path = str(
@@ -83,3 +165,322 @@ def load_metal_design(filename: str):
     design.logger = logger  #TODO: fix from save pikcle
 
     return design
+
+
+def _read_design_json(archive: zipfile.ZipFile) -> dict:
+    """Read design.json from a saved design and check its format.
+
+    Args:
+        archive (zipfile.ZipFile): The opened file.
+
+    Returns:
+        dict: The content of design.json.
+
+    Raises:
+        ValueError: Not a Metal design, or saved by a newer version of Metal.
+    """
+    content = json.loads(archive.read('design.json'))
+    if content.get('format') != FORMAT_NAME:
+        raise ValueError('The file is not a saved Metal design.')
+    if content['version'] > FORMAT_VERSION:
+        raise ValueError(
+            f'The design was saved with version {content["version"]} of the '
+            f'format, but this version of Metal reads up to {FORMAT_VERSION}.')
+    return content
+
+
+######################
+# Design and components
+
+
+def _design_to_json(design) -> dict:
+    """Return everything but the qgeometry tables of a design, as values that
+    json can write.
+
+    Args:
+        design (QDesign): Design to save.
+
+    Returns:
+        dict: Content of design.json. The 'qgeometry' entry is left empty.
+    """
+    from ..qlibrary.core.qroute import QRoute
+
+    components = []
+    for _, component in sorted(design._components.items()):
+        kwargs = dict()
+        if isinstance(component, QRoute):
+            kwargs['type'] = component.type
+        components.append(
+            dict(id=component.id,
+                 name=component.name,
+                 class_name=component.class_name,
+                 kwargs=kwargs,
+                 options=_to_json(component.options),
+                 metadata=_to_json(component.metadata),
+                 pins=_to_json(component.pins),
+                 status=component.status,
+                 made=component._made,
+                 build_id=component._build_id))
+
+    net_info = design.net_info
+    return dict(
+        format=FORMAT_NAME,
+        version=FORMAT_VERSION,
+        design=dict(
+            class_name=
+            f'{design.__class__.__module__}.{design.__class__.__name__}',
+            name=design.name,
+            overwrite_enabled=design.overwrite_enabled,
+            metadata=_to_json(design.metadata),
+            variables=_to_json(design.variables),
+            chips=_to_json(design.chips),
+            renderers=_to_json({
+                name: renderer.options
+                for name, renderer in design.renderers.items()
+            }),
+            latest_assigned_id=design._qcomponent_latest_assigned_id,
+            latest_name_id=_to_json(design._qcomponent_latest_name_id),
+            latest_build_id=design._qcomponent_latest_build_id,
+            dependencies=_to_json(design._dependencies),
+            pin_dependencies=_to_json(design._pin_dependencies)),
+        components=components,
+        net_info=dict(latest_assigned_id=design._qnet.qnet_latest_assigned_id,
+                      columns={
+                          column: _to_json(net_info[column].tolist())
+                          for column in net_info.columns
+                      }),
+        qgeometry=dict())
+
+
+def _design_from_json(content: dict, rebuild: Union[bool, str]):
+    """Create the design and its components from the content of design.json.
+    The components are not made and the qgeometry tables are left empty.
+
+    Args:
+        content (dict): Content of design.json.
+        rebuild (Union[bool, str]): See load_metal_design.
+
+    Returns:
+        QDesign: The design.
+    """
+    saved = content['design']
+    design = _import_class(
+        saved['class_name'])(overwrite_enabled=saved['overwrite_enabled'])
+    design.name = saved['name']
+    design._metadata = _from_json(saved['metadata'])
+    design._variables = _from_json(saved['variables'])
+    design._chips = _from_json(saved['chips'])
+    for name, options in _from_json(saved['renderers']).items():
+        if name in design.renderers:
+            design.renderers[name].options.update(options)
+
+    # The components are added in the order of their ids, so the components
+    # used by the pin_inputs of a route are in the design before the route.
+    # The pins are added without their net_id, otherwise the route would see
+    # them as already in use.
+    all_pins = dict()
+    for saved_component in content['components']:
+        design._qcomponent_latest_assigned_id = saved_component['id'] - 1
+        component = _import_class(saved_component['class_name'])(
+            design,
+            saved_component['name'],
+            options=_from_json(saved_component['options']),
+            make=False,
+            **saved_component['kwargs'])
+        pins = _from_json(saved_component['pins'])
+        all_pins[component.id] = pins
+        component.pins = deepcopy(pins)
+        for pin in component.pins.values():
+            pin.net_id = 0
+
+        component.metadata = _from_json(saved_component['metadata'])
+        component.status = saved_component['status']
+        component._made = saved_component['made']
+        if rebuild is False and component._made:
+            component._built_options = deepcopy(component.options)
+            component._built_variables = deepcopy(
+                design._get_variables_used(component.options))
+            component._build_id = saved_component['build_id']
+
+    for component_id, pins in all_pins.items():
+        design._components[component_id].pins = pins
+
+    design._qcomponent_latest_assigned_id = saved['latest_assigned_id']
+    design._qcomponent_latest_name_id = _from_json(saved['latest_name_id'])
+    design._qcomponent_latest_build_id = saved['latest_build_id']
+    design._dependencies = dict(_from_json(saved['dependencies']))
+    design._pin_dependencies = dict(_from_json(saved['pin_dependencies']))
+
+    net_info = content['net_info']
+    design._qnet._net_info = pd.DataFrame(_from_json(net_info['columns']),
+                                          columns=design._qnet.column_names)
+    design._qnet._qnet_latest_assigned_id = net_info['latest_assigned_id']
+
+    return design
+
+
+def _import_class(class_name: str) -> type:
+    """Import a class from its full name.
+
+    Args:
+        class_name (str): Example:
+                'qiskit_metal.qlibrary.qubits.transmon_pocket.TransmonPocket'
+
+    Returns:
+        type: The class.
+    """
+    module_path = class_name[:class_name.rfind('.')]
+    return getattr(importlib.import_module(module_path),
+                   class_name[class_name.rfind('.') + 1:])
+
+
+######################
+# QGeometry tables
+
+
+def _table_to_columns(table: GeoDataFrame) -> Union[dict, dict]:
+    """Split a qgeometry table in arrays, for the .npz file, and the columns
+    that are not numbers, for design.json.
+
+    Args:
+        table (GeoDataFrame): A qgeometry table.
+
+    Returns:
+        Union[dict, dict]: The arrays, and the description of the table,
+        with its other columns and the dtype of all its columns.
+    """
+    wkb = [shapely.wkb.dumps(geometry) for geometry in table.geometry]
+    arrays = dict(wkb=np.frombuffer(b''.join(wkb), dtype=np.uint8),
+                  wkb_offsets=np.cumsum([0] +
+                                        [len(geometry) for geometry in wkb]))
+
+    columns = dict()
+    for column in table.columns:
+        if column == table.geometry.name:
+            continue
+        if table[column].dtype.kind in 'biuf':
+            arrays[column] = table[column].to_numpy()
+        else:
+            columns[column] = _to_json(table[column].tolist())
+
+    dtypes = {column: str(dtype) for column, dtype in table.dtypes.items()}
+    return arrays, dict(columns=columns,
+                        dtypes=dtypes,
+                        geometry=table.geometry.name)
+
+
+def _read_table(archive: zipfile.ZipFile, content: dict,
+                table_name: str) -> GeoDataFrame:
+    """Read a qgeometry table of a saved design.
+
+    Args:
+        archive (zipfile.ZipFile): The opened file.
+        content (dict): Content of design.json.
+        table_name (str): Name of the table, e.g. 'poly'.
+
+    Returns:
+        GeoDataFrame: The table, with the columns in their saved order.
+    """
+    saved = content['qgeometry'][table_name]
+    with np.load(io.BytesIO(archive.read(f'qgeometry/{table_name}.npz')),
+                 allow_pickle=False) as arrays:
+        wkb, offsets = arrays['wkb'].tobytes(), arrays['wkb_offsets']
+        columns = {
+            key: arrays[key]
+            for key in arrays.files
+            if key not in ('wkb', 'wkb_offsets')
+        }
+    columns.update(_from_json(saved['columns']))
+    columns[saved['geometry']] = [
+        shapely.wkb.loads(wkb[start:stop])
+        for start, stop in zip(offsets[:-1], offsets[1:])
+    ]
+
+    in_order = {column: columns[column] for column in saved['dtypes']}
+    table = GeoDataFrame(in_order, geometry=saved['geometry'])
+    for column, dtype in saved['dtypes'].items():
+        if column != saved['geometry'] and str(table[column].dtype) != dtype:
+            table[column] = table[column].astype(dtype)
+    return table
+
+
+def _arrays_to_bytes(arrays: dict) -> bytes:
+    """Write arrays in the .npz format.
+
+    Args:
+        arrays (dict): Arrays keyed by name.
+
+    Returns:
+        bytes: Content of the .npz file.
+    """
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+######################
+# json
+
+
+def _to_json(value):
+    """Convert a value to one that json can write, and _from_json can convert
+    back. Dictionaries with keys that are not strings, tuples, sets and numpy
+    arrays are written as tagged dictionaries. Any other type of value is
+    pickled, and written as base64 text in a tagged dictionary.
+
+    Args:
+        value: Options, pins, etc.
+
+    Returns:
+        A value that json can write.
+    """
+    if isinstance(value, Mapping):
+        if all(isinstance(key, str) for key in value):
+            return {key: _to_json(item) for key, item in value.items()}
+        return {
+            '__items__':
+                [[_to_json(key), _to_json(item)] for key, item in value.items()]
+        }
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if isinstance(value, tuple):
+        return {'__tuple__': [_to_json(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {'__set__': [_to_json(item) for item in value]}
+    if isinstance(value, np.ndarray):
+        return {'__ndarray__': value.tolist(), 'dtype': str(value.dtype)}
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    return {'__pickle__': base64.b64encode(pickle.dumps(value)).decode('ascii')}
+
+
+def _from_json(value):
+    """Convert back a value written by _to_json. Dictionaries are returned as
+    Dict.
+
+    Args:
+        value: A value read by json.
+
+    Returns:
+        The original value.
+    """
+    if isinstance(value, dict):
+        if '__items__' in value:
+            return Dict({
+                _from_json(key): _from_json(item)
+                for key, item in value['__items__']
+            })
+        if '__tuple__' in value:
+            return tuple(_from_json(item) for item in value['__tuple__'])
+        if '__set__' in value:
+            return set(_from_json(item) for item in value['__set__'])
+        if '__ndarray__' in value:
+            return np.array(value['__ndarray__'], dtype=value['dtype'])
+        if '__pickle__' in value:
+            return pickle.loads(base64.b64decode(value['__pickle__']))
+        return Dict({key: _from_json(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    return value
@@ -172,9 +172,11 @@ Returns:
 from collections.abc import Iterable
 from collections.abc import Mapping
 from numbers import Number
-from typing import Union
+from typing import Tuple, Union
 
 import ast
+import functools
+import re
 import numpy as np
 import pint
 
@@ -219,6 +221,91 @@ UREG = pint.UnitRegistry()
 
 units = config.DefaultMetalOptions.default_generic.units
 
+# Maximum number of strings whose parsed value is kept by `_parse_string_to_float`.
+# Parsing with pint is slow, and components parse the same strings on every make.
+PARSE_CACHE_SIZE = 2**14
+
+# A single number with optional units, such as '1', '-0.1um' or '1e6 nm'.
+# These are converted without pint parsing the string; see `_parse_number_with_units`.
+NUMBER_WITH_UNITS = re.compile(
+    r'^\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)\s*([A-Za-z_]*)\s*$')
+INTEGER = re.compile(r'^[+-]?\d+$')
+
+
+@functools.lru_cache(maxsize=None)
+def _get_units_conversion(from_units: str, to_units: str) -> Tuple[bool, float]:
+    """Get the factor to convert values from one unit to another, using pint.
+
+    Args:
+        from_units (str): Units to convert from, such as 'um'.
+        to_units (str): Units to convert to, such as 'mm'.
+
+    Returns:
+        Tuple[bool, float]: Whether the units are the same, for which pint
+        does not convert the value, and the conversion factor.
+
+    Raises:
+        Exception: Errors in pint, such as undefined or incompatible units
+    """
+    quantity = UREG.Quantity(1, from_units)
+    return quantity.units == UREG.Unit(to_units), quantity.to(
+        to_units).magnitude
+
+
+def _parse_number_with_units(expr: str, to_units: str):
+    """Fast path of `_parse_string_to_float` for a single number with
+    optional units. Gives the same value as pint would.
+
+    Args:
+        expr (str): String expression such as '1nm'.
+        to_units (str): Units to convert the value to, such as 'mm'.
+
+    Returns:
+        float: Converted value, or None if `expr` is not of this simple form
+    """
+    match = NUMBER_WITH_UNITS.match(expr)
+    if match is None:
+        return None
+
+    number, from_units = match.groups()
+    if not from_units:
+        # pint fails to convert a dimensionless number to units
+        return float(number)
+
+    try:
+        same_units, factor = _get_units_conversion(from_units, to_units)
+    except Exception:
+        return None
+    magnitude = int(number) if INTEGER.match(number) else float(number)
+    return magnitude if same_units else magnitude * factor
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_string_to_float_in_units(expr: str, to_units: str):
+    """Cached implementation of `_parse_string_to_float`. Does not depend on
+    the design variables, so that the cache never needs to be cleared.
+
+    Args:
+        expr (str): String expression such as '1nm'.
+        to_units (str): Units to convert the value to, such as 'mm'.
+
+    Returns:
+        float: Converted value, such as float(1e-6)
+    """
+    value = _parse_number_with_units(expr, to_units)
+    if value is not None:
+        return value
+
+    try:
+        return UREG.Quantity(expr).to(to_units).magnitude
+
+    except Exception:
+        # DimensionalityError, UndefinedUnitError, TypeError
+        try:
+            return float(expr)
+        except Exception:
+            return expr
+
 
 def _parse_string_to_float(expr: str):
     """Extract the value of a string.
@@ -245,6 +332,9 @@ def _parse_string_to_float(expr: str):
     Raises:
         Exception: Errors in parsing
     """
+    if isinstance(expr, str):
+        return _parse_string_to_float_in_units(expr, units)
+
     try:
         return UREG.Quantity(expr).to(units).magnitude
 
@@ -20,9 +20,11 @@ import sys
 import traceback
 import warnings
 from copy import deepcopy
-from typing import Dict, List, TYPE_CHECKING, Tuple, Callable
+from typing import Dict, List, TYPE_CHECKING, Tuple, Callable, Union
 import inspect
+from collections.abc import Mapping
 
+import numpy as np
 import pandas as pd
 
 from qiskit_metal.draw import Vector
@@ -32,11 +34,12 @@ if TYPE_CHECKING:
     from qiskit_metal import logger
 
 __all__ = [
-    'copy_update', 'dict_start_with', 'data_frame_empty_typed', 'clean_name',
-    'enable_warning_traceback', 'get_traceback', 'print_traceback_easy',
-    'log_error_easy', 'monkey_patch', 'can_write_to_path',
-    'can_write_to_path_with_warning', 'toggle_numbers', 'bad_fillet_idxs',
-    'compress_vertex_list', 'get_range_of_vertex_to_not_fillet'
+    'copy_update', 'dict_start_with', 'dict_equal', 'data_frame_empty_typed',
+    'clean_name', 'enable_warning_traceback', 'get_traceback',
+    'print_traceback_easy', 'log_error_easy', 'monkey_patch',
+    'can_write_to_path', 'can_write_to_path_with_warning', 'toggle_numbers',
+    'bad_fillet_idxs', 'compress_vertex_list',
+    'get_range_of_vertex_to_not_fillet', 'fillet_corner', 'fillet_path_coords'
 ]
 
 ####################################################################################
@@ -87,6 +90,28 @@ def dict_start_with(my_dict, start_with, as_=list):
         return {k: v for k, v in my_dict.items() if k.startswith(start_with)}
 
 
+def dict_equal(value1, value2) -> bool:
+    """Compare two nested dictionaries, such as component options. Unlike
+    `==`, this does not fail on numpy arrays nested in the dictionaries.
+
+    Args:
+        value1 (object): Dictionary, list, numpy array or value to compare
+        value2 (object): Dictionary, list, numpy array or value to compare
+
+    Returns:
+        bool: True if the two values are equal
+    """
+    if isinstance(value1, Mapping) and isinstance(value2, Mapping):
+        return value1.keys() == value2.keys() and all(
+            dict_equal(value1[key], value2[key]) for key in value1)
+    if isinstance(value1, np.ndarray) or isinstance(value2, np.ndarray):
+        return np.array_equal(value1, value2)
+    if isinstance(value1, (list, tuple)) and isinstance(value2, (list, tuple)):
+        return type(value1) is type(value2) and len(value1) == len(
+            value2) and all(map(dict_equal, value1, value2))
+    return bool(value1 == value2)
+
+
 # def display_options(*ops_names, options=None, find_dot_keys=True, do_display=True):
 #     '''
 #     Print html display of options dictionary by default `DEFAULT_OPTIONS`
@@ -399,6 +424,124 @@ def bad_fillet_idxs(coords: list,
     return badlist
 
 
+def fillet_corner(vertex_start: np.ndarray,
+                  vertex_corner: np.ndarray,
+                  vertex_end: np.ndarray,
+                  radius: float,
+                  points: int = 16) -> Union[np.ndarray, bool]:
+    """Returns the filleted path based on the start, corner, and end
+    vertices and the fillet radius.
+
+    Args:
+        vertex_start (np.ndarray): x-y coordinates of starting vertex.
+        vertex_corner (np.ndarray): x-y coordinates of corner vertex.
+        vertex_end (np.ndarray): x-y coordinates of end vertex.
+        radius (float): Fillet radius.
+        points (int): Number of points to draw in the fillet corner.
+
+    Returns:
+        Union[np.ndarray, bool]: The points of the fillet corner, or False
+        if the corner cannot be filleted.
+    """
+    # Start, corner, and end vertices must be distinct
+    if np.array_equal(vertex_start, vertex_corner) or np.array_equal(
+            vertex_end, vertex_corner):
+        return False
+
+    # Vectors pointing from corner to start and end vertices, respectively
+    # Also calculate their lengths and unit vectors
+    sc_vec = vertex_start - vertex_corner
+    ec_vec = vertex_end - vertex_corner
+    sc_norm = np.linalg.norm(sc_vec)
+    ec_norm = np.linalg.norm(ec_vec)
+    sc_uvec = sc_vec / sc_norm
+    ec_uvec = ec_vec / ec_norm
+
+    # Angle between previous unit vectors
+    end_angle = np.arccos(np.dot(sc_uvec, ec_uvec))
+
+    # Start, corner, and end vertices can't be collinear
+    if (end_angle == 0) or (end_angle == np.pi):
+        return False
+
+    # Fillet circle must be small enough to fit inside corner
+    if radius / np.tan(end_angle / 2) > min(sc_norm, ec_norm):
+        return False
+
+    # Unit vector pointing from corner vertex to center of fillet circle
+    net_uvec = (sc_uvec + ec_uvec) / np.linalg.norm(sc_uvec + ec_uvec)
+
+    # Coordinates of center of fillet circle
+    circle_center = vertex_corner + net_uvec * radius / np.sin(end_angle / 2)
+
+    # Deltas represent displacement from corner vertex to circle center
+    # Midpoint angle from circle center to corner, wrt to horizontal extending from former
+    # Note: arctan is fine for angles in range (-pi / 2, pi / 2] but needs extra pi factor otherwise
+    delta_x = vertex_corner[0] - circle_center[0]
+    delta_y = vertex_corner[1] - circle_center[1]
+    if delta_x:
+        theta_mid = np.arctan(delta_y / delta_x) + np.pi * int(delta_x < 0)
+    else:
+        theta_mid = np.pi * ((1 - 2 * int(delta_y < 0)) + int(delta_y < 0))
+
+    # Start and end sweep angles determined relative to midpoint angle
+    # Swap them as needed to resolve ambiguity in arctan
+    theta_start = theta_mid - (np.pi - end_angle) / 2
+    theta_end = theta_mid + (np.pi - end_angle) / 2
+    p1 = circle_center + radius * np.array(
+        [np.cos(theta_start), np.sin(theta_start)])
+    p2 = circle_center + radius * np.array(
+        [np.cos(theta_end), np.sin(theta_end)])
+    if np.linalg.norm(vertex_start - p2) < np.linalg.norm(vertex_start - p1):
+        theta_start, theta_end = theta_end, theta_start
+
+    # Populate the fillet corner, skipping the start point since it's already added
+    thetas = np.linspace(theta_start, theta_end, points)
+    return circle_center + radius * np.stack(
+        [np.cos(thetas), np.sin(thetas)], axis=-1)
+
+
+def fillet_path_coords(coords: list,
+                       radius: float,
+                       points: int = 16,
+                       precision: int = 9) -> np.ndarray:
+    """Round the corners of a LineString with the given radius. Corners too
+    close to their neighbors to be filleted, see `bad_fillet_idxs`, are kept
+    as they are.
+
+    Args:
+        coords (list): Ordered list of tuples of vertex coordinates.
+        radius (float): Fillet radius.
+        points (int): Number of points to draw in each fillet corner.
+            Defaults to 16.
+        precision (int, optional): Digits of precision used for round().
+            Defaults to 9.
+
+    Returns:
+        np.ndarray: The vertices of the filleted path.
+    """
+    if len(coords) <= 2:  # only start and end points, no need to fillet
+        return np.array(coords)
+    newpath = [np.array([coords[0]])]
+
+    # Get list of vertices that can't be filleted
+    no_fillet = bad_fillet_idxs(coords, radius, precision)
+
+    # Iterate through every three-vertex corner
+    corners = zip(coords, coords[1:], coords[2:])
+    for (i, (start, corner, end)) in enumerate(corners):
+        fillet = False
+        if i + 1 not in no_fillet:
+            fillet = fillet_corner(np.array(start), np.array(corner),
+                                   np.array(end), radius, points)
+        if fillet is not False:
+            newpath.append(fillet)
+        else:
+            newpath.append(np.array([corner]))
+    newpath.append(np.array([coords[-1]]))
+    return np.concatenate(newpath)
+
+
 def get_range_of_vertex_to_not_fillet(coords: list,
                                       fradius: float,
                                       precision: int = 9,